@@ -0,0 +1,418 @@
+"""
+Benchmarks für den Runner (engine.ProfileRunner) gegen das Recording-Backend.
+
+    python bench.py                    # alle Fälle, Vergleich mit Baseline
+    python bench.py --quick            # kurze Laufzeit pro Fall
+    python bench.py --save-baseline    # aktuelle Werte als Baseline speichern
+    python bench.py --filter keys=8
+
+Gemessen pro Fall: erreichte vs. konfigurierte Rate, p50/p99/max-Fehler der
+Abstände zwischen Tasten-Events, CPU-Zeit pro Event. Zusätzlich maximaler
+Durchsatz, Stop-Latenz und Latenz der Start/Stop-Befehlsqueue unter Last
+sowie Drift und Verspätung der Makro-Wiedergabe und Zeichen/s von type("…").
+Exit-Code 1 bei Regression gegenüber der Baseline, 2 wenn der Rechner zu
+unruhig für eine Messung ist (dann kein Vergleich, keine Baseline; fällt ein
+Fall auf, wird der Jitter direkt danach nachgemessen).
+
+Vor und nach den Fällen läuft eine Kalibrierung (Python-Schleife, p99 der
+Verspätung von sleep(1 ms)). Sie steht mit in der Baseline; beim Vergleich
+werden die Grenzen auf den aktuellen Rechner umgerechnet (CPU-Werte mit dem
+Tempoverhältnis, Latenzen plus Jitter-Zuwachs, Rate minus zusätzlich
+verlorener Zeit), jeweils höchstens bis zu einer festen Obergrenze.
+"""
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+from engine import compile_set, Scheduler, ProfileRunner
+from inputs import RecordingBackend, EV_KEY, EV_MOVE
+from macro import MacroTrack, MOVE
+
+BASELINE_PATH = Path(__file__).with_name("bench_baseline.json")
+
+INNER_US = (1_000, 10_000)
+REPEAT_US = (1_000, 50_000)
+KEY_COUNTS = (1, 8)
+POSITION_COUNTS = (0, 4)
+SWITCH_MODES = ("none", "switch", "jump")
+
+# Regressionsgrenzen gegenüber der Baseline
+RATE_DROP = 0.05          # absolute Abweichung von achieved/configured
+P99_FACTOR = 2.0          # p99-Fehler darf sich höchstens verdoppeln …
+P99_SLACK_US = 500        # … oder um diesen Betrag steigen
+CPU_FACTOR = 1.5
+
+# Umrechnung auf den Rechner (siehe host_factors): nur lockern, und nur begrenzt
+SPEED_FLOOR = 0.67        # CPU-Grenzen höchstens um 1/0.67 lockerer
+JITTER_CAP_US = 1_000     # Latenz-Grenzen höchstens um 1 ms lockerer
+LOST_CAP = 0.03           # Rate darf höchstens 3 Prozentpunkte zusätzlich sinken
+NOISY_P99_US = 2_000      # darüber ist der Rechner zu unruhig für eine Messung
+
+CALIBRATION_LOOPS = 200_000
+CALIBRATION_SLEEPS = 500
+PROBE_SLEEPS = 200        # Nachmessung des Jitters, wenn ein Fall auffällt
+
+
+# -------------------------------
+# Cases
+# -------------------------------
+def set_data(inner_us: int, repeat_us: int, keys: int, positions: int, switch: str) -> dict:
+    # Wechsel immer auf sich selbst: Aktivierungspfad wird getestet,
+    # das erwartete Tasten-Timing bleibt trotzdem berechenbar
+    return {
+        "keys": ",".join("abcdefgh"[:keys]),
+        "inner_us": inner_us,
+        "repeat_us": repeat_us,
+        "switch": {"enabled": switch == "switch", "min": 0, "sec": 0, "target": 1},
+        "jump_back": {"enabled": switch == "jump", "target": 1},
+        "click": {
+            "enabled": positions > 0,
+            "interval_enabled": positions > 0,
+            "global_interval_us": 20_000,
+            "positions_enabled": positions > 0,
+            "positions": [{"x": 10 * i, "y": 10 * i} for i in range(positions)],
+        },
+    }
+
+
+def case_name(inner_us, repeat_us, keys, positions, switch) -> str:
+    return f"inner={inner_us}us repeat={repeat_us}us keys={keys} pos={positions} switch={switch}"
+
+
+def percentile(sorted_vals, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))
+    return sorted_vals[i]
+
+
+def run_profile(data: dict, duration_s: float):
+    backend = RecordingBackend()
+    plan = compile_set(data, resolve=backend.resolve_key)
+    runner = ProfileRunner(lambda: (plan,), Scheduler(name="bench"), backend)
+
+    cpu0 = time.process_time()
+    t0 = time.perf_counter_ns()
+    runner.start()
+    time.sleep(duration_s)
+    runner.stop()
+    elapsed_ns = time.perf_counter_ns() - t0
+    cpu_s = time.process_time() - cpu0
+    return backend, plan, runner, elapsed_ns, cpu_s
+
+
+def measure_case(params, duration_s: float) -> dict:
+    keys = params[2]
+    backend, plan, runner, elapsed_ns, cpu_s = run_profile(set_data(*params), duration_s)
+
+    key_t = [t for t, kind, _, _ in backend.events() if kind == EV_KEY]
+    errors = []
+    for j in range(1, len(key_t)):
+        expected = plan.inner_ns + (plan.repeat_ns if j % keys == 0 else 0)
+        errors.append(abs(key_t[j] - key_t[j - 1] - expected) / 1000.0)
+    errors.sort()
+
+    # Soll-Anzahl: Tasten-Slots des idealen Rasters innerhalb der Laufzeit
+    cycle_ns = keys * plan.inner_ns + plan.repeat_ns
+    full, rest = divmod(elapsed_ns, cycle_ns)
+    expected = full * keys + min(keys, rest // plan.inner_ns + 1)
+    configured = keys * 1e9 / cycle_ns
+    events = max(1, backend.count)
+    return {
+        "configured_eps": round(configured, 2),
+        "achieved_eps": round(len(key_t) * 1e9 / elapsed_ns, 2),
+        "rate_ratio": round(len(key_t) / expected, 4),
+        "p50_err_us": round(percentile(errors, 0.50), 1),
+        "p99_err_us": round(percentile(errors, 0.99), 1),
+        "max_err_us": round(errors[-1] if errors else 0.0, 1),
+        "cpu_s": round(cpu_s, 4),
+        "cpu_per_event_us": round(cpu_s * 1e6 / events, 2),
+        "events": backend.count,
+        "skipped": runner.skipped,
+    }
+
+
+def measure_throughput(duration_s: float) -> dict:
+    data = set_data(1, 1, 8, 0, "none")
+    backend, _, _, elapsed_ns, cpu_s = run_profile(data, duration_s)
+    return {
+        "events_per_s": round(backend.count * 1e9 / elapsed_ns),
+        "cpu_per_event_us": round(cpu_s * 1e6 / max(1, backend.count), 2),
+    }
+
+
+def measure_stop_latency(rounds: int = 50) -> dict:
+    # sehr lange Intervalle: stop() darf trotzdem nicht warten
+    data = set_data(9_999_999_000, 9_999_999_000, 1, 1, "none")
+    data["click"]["global_interval_us"] = 9_999_999_000
+    backend = RecordingBackend()
+    plan = compile_set(data, resolve=backend.resolve_key)
+    scheduler = Scheduler(name="bench-stop")
+    runner = ProfileRunner(lambda: (plan,), scheduler, backend)
+
+    worst = 0
+    for _ in range(rounds):
+        runner.start()
+        time.sleep(0.002)
+        t = time.perf_counter_ns()
+        runner.stop()
+        th = scheduler._thread
+        if th is not None:
+            th.join()
+        worst = max(worst, time.perf_counter_ns() - t)
+    return {"max_stop_latency_us": round(worst / 1000.0, 1)}
+
+
+def measure_control_latency(rounds: int = 100) -> dict:
+    # Start/Stop über die Befehlsqueue, während ein zweites Profil mit 1 ms Takt läuft
+    backend = RecordingBackend()
+    load = (compile_set(set_data(1_000, 1_000, 8, 0, "none"), resolve=backend.resolve_key),)
+    plan = (compile_set(set_data(1_000, 1_000, 1, 0, "none"), resolve=backend.resolve_key),)
+    scheduler = Scheduler(name="bench-control")
+    busy = ProfileRunner(lambda: load, scheduler, backend)
+    runner = ProfileRunner(lambda: plan, scheduler, backend)
+
+    busy.start()
+    for _ in range(rounds):
+        runner.request_start()
+        time.sleep(0.003)
+        runner.request_stop()
+        time.sleep(0.002)
+    busy.stop()
+    hist = scheduler.command_latency
+    return {
+        "control_p50_us": hist.percentile(0.50),
+        "control_p99_us": hist.percentile(0.99),
+    }
+
+
+def measure_macro_replay(duration_s: float, speed: float = 2.0) -> dict:
+    # 1 kHz Mausbewegungen, schneller abgespielt: Drift = Abweichung am Ende
+    track = MacroTrack()
+    n = max(10, int(duration_s * speed * 1000))
+    for i in range(n):
+        track.append(i * 1_000_000, MOVE, i, 0)
+    data = {"keys": "", "macro": track.to_text(), "macro_speed": speed, "macro_loop": False}
+    backend = RecordingBackend()
+    plan = compile_set(data, resolve=backend.resolve_key)
+    runner = ProfileRunner(lambda: (plan,), Scheduler(name="bench-macro"), backend)
+
+    t0 = time.perf_counter_ns()
+    runner.start()
+    while runner.running:
+        time.sleep(0.01)
+    moves = [t for t, kind, _, _ in backend.events() if kind == EV_MOVE]
+    errors = sorted(abs(t - t0 - int(track.t_ns[i] / speed)) / 1000.0 for i, t in enumerate(moves))
+    return {
+        "events": len(moves),
+        "drift_us": round((moves[-1] - t0 - int(track.t_ns[len(moves) - 1] / speed)) / 1000.0, 1) if moves else 0.0,
+        "p99_err_us": round(percentile(errors, 0.99), 1),
+        "max_err_us": round(errors[-1] if errors else 0.0, 1),
+    }
+
+
+def measure_typing(duration_s: float) -> dict:
+    # type("…") ohne Abstand pro Zeichen, 1 µs zwischen den Durchläufen
+    text = ("Hallo Welt, ÄÖÜ ß € ✓ – " * 40)[:1000].replace('"', "'")
+    data = {"keys": f'type("{text}")', "inner_us": 1, "repeat_us": 1}
+    backend = RecordingBackend()
+    plan = compile_set(data, resolve=backend.resolve_key)
+    runner = ProfileRunner(lambda: (plan,), Scheduler(name="bench-type"), backend)
+
+    cpu0 = time.process_time()
+    t0 = time.perf_counter_ns()
+    runner.start()
+    time.sleep(duration_s)
+    runner.stop()
+    elapsed = (time.perf_counter_ns() - t0) / 1e9
+    cpu = time.process_time() - cpu0
+    chars = sum(1 for _, kind, _, _ in backend.events() if kind == EV_KEY)
+    return {
+        "chars_per_s": int(chars / elapsed),
+        "cpu_per_char_us": round(cpu / max(1, chars) * 1e6, 3),
+    }
+
+
+# -------------------------------
+# Calibration
+# -------------------------------
+def calibrate(rounds: int = 5) -> dict:
+    # CPU-Tempo: bester von mehreren Durchläufen einer festen Schleife
+    best = None
+    for _ in range(rounds):
+        t = time.perf_counter_ns()
+        acc = 0
+        for i in range(CALIBRATION_LOOPS):
+            acc += i & 7
+        dt = time.perf_counter_ns() - t
+        best = dt if best is None else min(best, dt)
+    return {"loop_ops_per_s": round(CALIBRATION_LOOPS * 1e9 / best), **sleep_jitter(CALIBRATION_SLEEPS)}
+
+
+def sleep_jitter(n: int) -> dict:
+    # Scheduler-Jitter: Verspätung von sleep(1 ms); verlorene Zeit = Anteil der
+    # Verspätung über dem Median (der normale Überhang eines sleep zählt nicht)
+    late = []
+    t0 = time.perf_counter_ns()
+    for _ in range(n):
+        t = time.perf_counter_ns()
+        time.sleep(0.001)
+        late.append(max(0, time.perf_counter_ns() - t - 1_000_000))
+    elapsed = time.perf_counter_ns() - t0
+    late.sort()
+    median = percentile(late, 0.50)
+    return {
+        "sleep_p99_us": round(percentile(late, 0.99) / 1000.0, 1),
+        "lost_fraction": round(sum(x - median for x in late if x > median) / elapsed, 4),
+    }
+
+
+def host_factors(cur: dict, base: dict) -> tuple:
+    """
+    (Tempo, Jitter-Zuwachs in µs, Zuwachs verlorener Zeit) dieses Rechners
+    gegenüber der Baseline, begrenzt auf SPEED_FLOOR/JITTER_CAP_US/LOST_CAP;
+    ohne Kalibrierung (1.0, 0.0, 0.0).
+    """
+    if not cur or not base or not base.get("loop_ops_per_s") or "sleep_p99_us" not in base:
+        return 1.0, 0.0, 0.0
+    # nur lockern: ein scheinbar schnellerer Rechner verschärft die Grenzen nicht,
+    # sein Tempo schwankt sonst zwischen Kalibrierung und Messung durch
+    speed = max(SPEED_FLOOR, min(1.0, cur["loop_ops_per_s"] / base["loop_ops_per_s"]))
+    jitter_us = min(JITTER_CAP_US, max(0.0, cur["sleep_p99_us"] - base["sleep_p99_us"]))
+    lost = min(LOST_CAP, max(0.0, cur["lost_fraction"] - base["lost_fraction"]))
+    return speed, jitter_us, lost
+
+
+# -------------------------------
+# Baseline
+# -------------------------------
+def compare(name: str, cur: dict, base: dict, speed: float = 1.0, jitter_us: float = 0.0,
+            lost: float = 0.0) -> list:
+    # CPU-Werte skalieren mit dem Tempo, Latenz-Grenzen wachsen mit dem Jitter,
+    # die Rate darf um die zusätzlich verlorene Zeit sinken
+    problems = []
+    if "rate_ratio" in base and cur["rate_ratio"] < base["rate_ratio"] - RATE_DROP - lost:
+        problems.append(f"rate_ratio {cur['rate_ratio']} < {base['rate_ratio']}")
+    if "p99_err_us" in base and cur["p99_err_us"] > max(base["p99_err_us"] * P99_FACTOR,
+                                                       base["p99_err_us"] + P99_SLACK_US) + jitter_us:
+        problems.append(f"p99_err_us {cur['p99_err_us']} > {base['p99_err_us']}")
+    if "cpu_per_event_us" in base and cur["cpu_per_event_us"] > base["cpu_per_event_us"] / speed * CPU_FACTOR:
+        problems.append(f"cpu_per_event_us {cur['cpu_per_event_us']} > {base['cpu_per_event_us'] / speed:.2f}")
+    if "events_per_s" in base and cur["events_per_s"] < base["events_per_s"] * speed / CPU_FACTOR:
+        problems.append(f"events_per_s {cur['events_per_s']} < {base['events_per_s'] * speed:.0f}")
+    if "max_stop_latency_us" in base and cur["max_stop_latency_us"] > max(2000, base["max_stop_latency_us"] * 4) + jitter_us:
+        problems.append(f"max_stop_latency_us {cur['max_stop_latency_us']}")
+    if "control_p99_us" in base and cur["control_p99_us"] > max(2000, base["control_p99_us"] * 4) + jitter_us:
+        problems.append(f"control_p99_us {cur['control_p99_us']}")
+    if "chars_per_s" in base and cur["chars_per_s"] < base["chars_per_s"] * speed / CPU_FACTOR:
+        problems.append(f"chars_per_s {cur['chars_per_s']} < {base['chars_per_s'] * speed:.0f}")
+    if "drift_us" in base and abs(cur["drift_us"]) > max(2000, abs(base["drift_us"]) * 4) + jitter_us:
+        problems.append(f"drift_us {cur['drift_us']}")
+    return [f"{name}: {p}" for p in problems]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Button Masher Pro – Runner-Benchmarks")
+    ap.add_argument("--duration", type=float, default=1.0, help="Sekunden pro Fall")
+    ap.add_argument("--quick", action="store_true", help="0.2 s pro Fall")
+    ap.add_argument("--filter", default="", help="nur Fälle, deren Name diesen Text enthält")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--json", type=Path, help="Ergebnisse zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    duration = 0.2 if args.quick else args.duration
+    cal = calibrate()
+    results = {}
+    reruns = {}   # Name -> erneute Messung bei Regressionsverdacht
+
+    for params in itertools.product(INNER_US, REPEAT_US, KEY_COUNTS, POSITION_COUNTS, SWITCH_MODES):
+        name = case_name(*params)
+        if args.filter and args.filter not in name:
+            continue
+        r = measure_case(params, duration)
+        results[name] = r
+        reruns[name] = lambda params=params: measure_case(params, duration)
+        print(f"{name:<60} {r['achieved_eps']:>9.1f}/{r['configured_eps']:<9.1f} ev/s ({r['rate_ratio']:.3f})  "
+              f"err p50={r['p50_err_us']:>7.1f} p99={r['p99_err_us']:>7.1f} max={r['max_err_us']:>8.1f} us  "
+              f"cpu/ev={r['cpu_per_event_us']:>6.2f} us")
+
+    if not args.filter:
+        results["throughput"] = measure_throughput(duration)
+        print(f"{'throughput':<60} {results['throughput']['events_per_s']:>9} ev/s  "
+              f"cpu/ev={results['throughput']['cpu_per_event_us']} us")
+        results["stop_latency"] = measure_stop_latency()
+        print(f"{'stop_latency':<60} max={results['stop_latency']['max_stop_latency_us']} us")
+        results["control_latency"] = measure_control_latency()
+        print(f"{'control_latency':<60} p50={results['control_latency']['control_p50_us']} us  "
+              f"p99={results['control_latency']['control_p99_us']} us")
+        r = results["macro_replay"] = measure_macro_replay(duration)
+        reruns["macro_replay"] = lambda: measure_macro_replay(duration)
+        print(f"{'macro_replay (2x)':<60} {r['events']} ev  drift={r['drift_us']} us  "
+              f"err p99={r['p99_err_us']} max={r['max_err_us']} us")
+        r = results["typing"] = measure_typing(duration)
+        reruns["typing"] = lambda: measure_typing(duration)
+        print(f"{'typing':<60} {r['chars_per_s']:>9} chars/s  cpu/char={r['cpu_per_char_us']} us")
+
+    # Rechner-Zustand kann während des Laufs wechseln: für die Baseline zählt der
+    # günstigere Wert, für den Vergleich der ungünstigere (Grenzen werden nur lockerer)
+    after = calibrate()
+    noisy_p99 = max(cal["sleep_p99_us"], after["sleep_p99_us"])
+    pick_ops, pick_jitter = (max, min) if args.save_baseline else (min, max)
+    cal = {"loop_ops_per_s": pick_ops(cal["loop_ops_per_s"], after["loop_ops_per_s"]),
+           "sleep_p99_us": pick_jitter(cal["sleep_p99_us"], after["sleep_p99_us"]),
+           "lost_fraction": pick_jitter(cal["lost_fraction"], after["lost_fraction"])}
+    results["calibration"] = cal
+    print(f"{'calibration':<60} {cal['loop_ops_per_s']:>9} ops/s  sleep(1 ms) p99 late={cal['sleep_p99_us']} us  "
+          f"lost={cal['lost_fraction']:.2%}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if noisy_p99 > NOISY_P99_US:
+        # Grenzen nicht beliebig weiten: lieber gar nicht vergleichen
+        print(f"WARNUNG Rechner zu unruhig (sleep(1 ms) p99 {noisy_p99} us > {NOISY_P99_US} us): "
+              f"keine Baseline, kein Vergleich")
+        return 2
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Baseline gespeichert: {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        return 0
+
+    base = json.loads(args.baseline.read_text(encoding="utf-8"))
+    speed, jitter_us, lost = host_factors(cal, base.get("calibration"))
+    print(f"gegenüber Baseline: Tempo x{speed:.2f}, Jitter +{jitter_us:.0f} us, Rate -{lost:.3f}")
+    problems = []
+    noisy = []
+    for name, cur in results.items():
+        if name not in base or name == "calibration":
+            continue
+        found = compare(name, cur, base[name], speed, jitter_us, lost)
+        # einzelne Scheduler-Aussetzer des Systems: Fall einmal wiederholen
+        if found and name in reruns:
+            found = compare(name, reruns[name](), base[name], speed, jitter_us, lost)
+        # der Rechner kann mitten im Lauf unruhig werden: dann nicht bewerten
+        if found:
+            probe = sleep_jitter(PROBE_SLEEPS)["sleep_p99_us"]
+            if probe > NOISY_P99_US:
+                noisy.append(f"{name}: sleep(1 ms) p99 {probe} us")
+                continue
+        problems += found
+    for p in problems:
+        print("REGRESSION", p)
+    for p in noisy:
+        print("WARNUNG Rechner zu unruhig, nicht bewertet:", p)
+    if problems:
+        return 1
+    return 2 if noisy else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1050 @@
+"""
+Qt-freie Runner-Logik von Button Masher Pro.
+
+Ein Set wird aus seinem JSON-Dict (SetWidget.to_dict()) einmalig in einen
+unveränderlichen SetPlan kompiliert. Der Runner liest ausschließlich diese
+Pläne und fasst dabei keine Qt-Widgets an.
+"""
+import heapq
+import itertools
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Optional, Tuple
+
+from keydsl import (
+    compile_keys, DslError, KeyProgram, EMPTY_PROGRAM,
+    OP_TAP, OP_COMBO, OP_DOWN, OP_UP, OP_WAIT, OP_LOOP, OP_NEXT, OP_TYPE,
+)
+from keymap import canonical_name, pynput_keys
+from macro import load_track, MacroTrack, KIND_MASK, KEY_DOWN, KEY_UP, MOVE, BTN_DOWN, BTN_UP
+
+
+# -------------------------------
+# Helpers
+# -------------------------------
+def clamp_int(val, lo, hi, default):
+    try:
+        v = int(val)
+    except Exception:
+        return default
+    return max(lo, min(hi, v))
+
+
+def clamp_float(val, lo, hi, default):
+    try:
+        v = float(val)
+    except Exception:
+        return default
+    if v != v:  # NaN
+        return default
+    return max(lo, min(hi, v))
+
+
+def read_us(d: dict, key_us: str, key_ms: str, lo_us: int, hi_us: int, default_us: int) -> int:
+    # neues Feld in µs bevorzugen, sonst altes ms-Feld übernehmen
+    if d.get(key_us) is not None:
+        return clamp_int(d.get(key_us), lo_us, hi_us, default_us)
+    ms = d.get(key_ms)
+    try:
+        return max(lo_us, min(hi_us, int(round(float(ms) * 1000))))
+    except Exception:
+        return default_us
+
+
+# -------------------------------
+# Key resolution
+# -------------------------------
+# Maustasten mit X11-Nummern; andere Namen (x1, x2 …) werden übersprungen
+MOUSE_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+
+def special_keys() -> dict:
+    # vollständige Tabelle aus keymap, einmal gebaut
+    return pynput_keys()
+
+
+def resolve_key(key_text: str):
+    """
+    Wandelt einen Tastennamen (auch Aliase, Ziffernblock, "u20ac") in ein
+    fertiges pynput-Key-Objekt um; Zeichen werden zu KeyCode, damit pynput
+    beim Drücken nichts mehr umwandeln muss.
+    Unbekannte Namen ergeben None (Taste wird übersprungen, Timing bleibt).
+    """
+    name = canonical_name(key_text)
+    if name is None:
+        return None
+    keys = special_keys()
+    key = keys.get(name)
+    if key is None and len(name) == 1:
+        from pynput.keyboard import KeyCode
+        key = keys[name] = KeyCode.from_char(name)
+    return key
+
+
+def split_keys(text: str) -> list:
+    return [k.strip().lower() for k in (text or "").split(",") if k.strip()]
+
+
+# -------------------------------
+# Click positions
+# -------------------------------
+# Intervall-Grenzen in Mikrosekunden
+US_MAX = 9_999_999_000
+INNER_MIN_US = 1
+CLICK_MIN_US = 1_000
+
+
+@dataclass
+class ClickPosition:
+    enabled: bool
+    x: int
+    y: int
+    interval_us: int  # 0 => fallback
+
+    def to_dict(self):
+        return {
+            "enabled": bool(self.enabled),
+            "x": int(self.x),
+            "y": int(self.y),
+            # ms-Feld bleibt für ältere Versionen erhalten
+            "interval_ms": int(self.interval_us // 1000),
+            "interval_us": int(self.interval_us),
+        }
+
+    @staticmethod
+    def from_dict(d: dict) -> "ClickPosition":
+        return ClickPosition(
+            enabled=bool(d.get("enabled", True)),
+            x=clamp_int(d.get("x"), -10_000_000, 10_000_000, 0),
+            y=clamp_int(d.get("y"), -10_000_000, 10_000_000, 0),
+            interval_us=read_us(d, "interval_us", "interval_ms", 0, US_MAX, 0),
+        )
+
+
+# -------------------------------
+# Compiled plans
+# -------------------------------
+CLICK_OFF = 0
+CLICK_ONCE = 1       # Positionen genau einmal pro Set-Aktivierung
+CLICK_INTERVAL = 2   # eigener Klick-Takt parallel zu den Tasten
+
+US_NS = 1_000
+MS_NS = 1_000_000
+
+
+@dataclass(frozen=True)
+class PositionPlan:
+    x: int
+    y: int
+    interval_ns: int  # bereits mit globalem Intervall aufgelöst
+
+
+@dataclass(frozen=True)
+class SetPlan:
+    program: KeyProgram               # Tasten-Feld als Bytecode (keydsl)
+    inner_ns: int
+    repeat_ns: int
+    jump_target: int                  # 0-basiert, -1 = aus
+    switch_target: int                # 0-basiert, -1 = aus
+    switch_after_ns: int              # 0 = sofort nach einem Durchlauf
+    click_mode: int
+    click_interval_ns: int
+    positions: Tuple[PositionPlan, ...]  # leer => Klick an aktueller Position
+    macro: Optional["MacroPlan"] = None  # ersetzt die Tasten des Sets
+    error: Optional[DslError] = None     # Syntaxfehler im Tasten-Feld (Programm ist dann leer)
+
+
+@dataclass(frozen=True)
+class MacroPlan:
+    """
+    Aufgenommenes Makro zum Abspielen. Die Spalten des Tracks werden nicht
+    kopiert; pro Name (Taste/Maustaste) steht hier nur das aufgelöste Objekt.
+    """
+    track: MacroTrack
+    keys: Tuple[object, ...]       # Name-Index -> Backend-Key (None = überspringen)
+    buttons: Tuple[Optional[str], ...]  # Name-Index -> Maustaste (None = unbekannt)
+    speed: float                   # 2.0 = doppelt so schnell
+    loop: bool
+    start_ns: int                  # Startposition im Track (Aufnahmezeit)
+
+    def due_ns(self, base_ns: int, i: int) -> int:
+        # absolute Deadline aus der Aufnahmezeit: kein Aufsummieren, keine Drift
+        return base_ns + int(self.track.t_ns[i] / self.speed)
+
+
+MACRO_SPEED_MIN = 0.1
+MACRO_SPEED_MAX = 100.0
+
+
+def compile_macro(data: dict, resolve=resolve_key) -> Optional[MacroPlan]:
+    track = load_track(data)
+    if track is None or not len(track):
+        return None
+    speed = clamp_float(data.get("macro_speed"), MACRO_SPEED_MIN, MACRO_SPEED_MAX, 1.0)
+    return MacroPlan(
+        track=track,
+        keys=tuple(resolve(name) for name in track.names),
+        buttons=tuple(name if name in MOUSE_BUTTONS else None for name in track.names),
+        speed=speed,
+        loop=bool(data.get("macro_loop", True)),
+        start_ns=clamp_int(data.get("macro_start_ms"), 0, 10**9, 0) * MS_NS,
+    )
+
+
+EMPTY_PLAN = SetPlan(
+    program=EMPTY_PROGRAM, inner_ns=150 * MS_NS, repeat_ns=150 * MS_NS,
+    jump_target=-1, switch_target=-1, switch_after_ns=0,
+    click_mode=CLICK_OFF, click_interval_ns=200 * MS_NS, positions=(),
+)
+
+
+def compile_set(data: dict, resolve=resolve_key) -> SetPlan:
+    """Kompiliert ein Set-Dict (Format von SetWidget.to_dict) in einen SetPlan."""
+    if not isinstance(data, dict):
+        return EMPTY_PLAN
+
+    # Tasten-Feld einmal in Bytecode übersetzen; bei Syntaxfehler drückt das Set nichts
+    error = None
+    try:
+        program = compile_keys(str(data.get("keys", "")), resolve)
+    except DslError as e:
+        program, error = EMPTY_PROGRAM, e
+    inner_ns = read_us(data, "inner_us", "inner_ms", INNER_MIN_US, US_MAX, 50_000) * US_NS
+    repeat_ns = read_us(data, "repeat_us", "repeat_ms", INNER_MIN_US, US_MAX, 150_000) * US_NS
+
+    jb = data.get("jump_back") or {}
+    jump_target = -1
+    if jb.get("enabled", False):
+        jump_target = clamp_int(jb.get("target"), 1, 999, 1) - 1
+
+    sw = data.get("switch") or {}
+    switch_target = -1
+    switch_after_ns = 0
+    if sw.get("enabled", False):
+        switch_target = clamp_int(sw.get("target"), 1, 999, 1) - 1
+        dur_s = clamp_int(sw.get("min"), 0, 180, 0) * 60 + clamp_int(sw.get("sec"), 0, 59, 0)
+        switch_after_ns = dur_s * 1_000_000_000
+
+    ck = data.get("click") or {}
+    global_ns = read_us(
+        ck, "global_interval_us", "global_interval_ms", CLICK_MIN_US, US_MAX, 200_000
+    ) * US_NS
+    raw_positions = []
+    if ck.get("positions_enabled", False) and isinstance(ck.get("positions"), list):
+        raw_positions = [ClickPosition.from_dict(p) for p in ck["positions"][:8] if isinstance(p, dict)]
+
+    positions = tuple(
+        PositionPlan(p.x, p.y, p.interval_us * US_NS if p.interval_us > 0 else global_ns)
+        for p in raw_positions if p.enabled
+    )
+
+    click_mode = CLICK_OFF
+    if ck.get("enabled", False):
+        if ck.get("interval_enabled", False):
+            click_mode = CLICK_INTERVAL
+        elif raw_positions:
+            click_mode = CLICK_ONCE
+
+    return SetPlan(
+        program=program,
+        inner_ns=inner_ns,
+        repeat_ns=repeat_ns,
+        jump_target=jump_target,
+        switch_target=switch_target,
+        switch_after_ns=switch_after_ns,
+        click_mode=click_mode,
+        click_interval_ns=global_ns,
+        positions=positions,
+        macro=compile_macro(data, resolve),
+        error=error,
+    )
+
+
+def compile_sets(sets, resolve=resolve_key) -> Tuple[SetPlan, ...]:
+    if not isinstance(sets, list):
+        return ()
+    return tuple(compile_set(s, resolve) for s in sets)
+
+
+def normalize_set(data: dict) -> dict:
+    """Set-Dict geprüft und vollständig, im Format von SetWidget.to_dict (unbekannte Felder bleiben)."""
+    data = data if isinstance(data, dict) else {}
+    inner_us = read_us(data, "inner_us", "inner_ms", INNER_MIN_US, US_MAX, 50_000)
+    repeat_us = read_us(data, "repeat_us", "repeat_ms", INNER_MIN_US, US_MAX, 150_000)
+    sw = data.get("switch") if isinstance(data.get("switch"), dict) else {}
+    jb = data.get("jump_back") if isinstance(data.get("jump_back"), dict) else {}
+    ck = data.get("click") if isinstance(data.get("click"), dict) else {}
+    global_us = read_us(ck, "global_interval_us", "global_interval_ms", CLICK_MIN_US, US_MAX, 200_000)
+    positions = ck.get("positions") if isinstance(ck.get("positions"), list) else []
+    return dict(
+        data,
+        keys=str(data.get("keys", "")),
+        inner_ms=inner_us // 1000,
+        repeat_ms=repeat_us // 1000,
+        inner_us=inner_us,
+        repeat_us=repeat_us,
+        switch={
+            "enabled": bool(sw.get("enabled", False)),
+            "min": clamp_int(sw.get("min"), 0, 180, 0),
+            "sec": clamp_int(sw.get("sec"), 0, 59, 0),
+            "target": clamp_int(sw.get("target"), 1, 999, 1),
+        },
+        jump_back={
+            "enabled": bool(jb.get("enabled", False)),
+            "target": clamp_int(jb.get("target"), 1, 999, 1),
+        },
+        click={
+            "enabled": bool(ck.get("enabled", False)),
+            "interval_enabled": bool(ck.get("interval_enabled", False)),
+            "global_interval_ms": global_us // 1000,
+            "global_interval_us": global_us,
+            "positions_enabled": bool(ck.get("positions_enabled", False)),
+            "positions": [ClickPosition.from_dict(p).to_dict() for p in positions[:8] if isinstance(p, dict)],
+        },
+        macro=data["macro"] if isinstance(data.get("macro"), str) else "",
+        macro_speed=round(clamp_float(data.get("macro_speed"), MACRO_SPEED_MIN, MACRO_SPEED_MAX, 1.0), 1),
+        macro_loop=bool(data.get("macro_loop", True)),
+        macro_start_ms=clamp_int(data.get("macro_start_ms"), 0, 10**9, 0),
+    )
+
+
+# -------------------------------
+# Timing
+# -------------------------------
+# Spin-Fenster: die letzten N ns vor einer Deadline wird nicht geschlafen,
+# sondern aktiv gewartet. Größer = genauer, aber mehr CPU-Last.
+DEFAULT_SPIN_US = 300
+SPIN_MAX_US = 5_000
+_spin_ns = DEFAULT_SPIN_US * US_NS
+
+
+def set_spin_window_us(us: int):
+    global _spin_ns
+    _spin_ns = clamp_int(us, 0, SPIN_MAX_US, DEFAULT_SPIN_US) * US_NS
+
+
+def spin_window_us() -> int:
+    return _spin_ns // US_NS
+
+
+def sleep_until(deadline_ns: int, cancel: Optional[Event] = None) -> bool:
+    """
+    Hybrides Warten: grob bis kurz vor die Deadline, den Rest per Spin
+    (mit sleep(0), damit andere Threads den GIL bekommen).
+    Mit `cancel` ist das Warten sofort abbrechbar; Rückgabe False = abgebrochen.
+    """
+    remaining = deadline_ns - time.perf_counter_ns()
+    if remaining <= 0:
+        return not (cancel and cancel.is_set())
+    coarse = remaining - _spin_ns
+    if coarse > 0:
+        if cancel is None:
+            time.sleep(coarse / 1e9)
+        elif cancel.wait(coarse / 1e9):
+            return False
+    while time.perf_counter_ns() < deadline_ns:
+        if cancel is not None and cancel.is_set():
+            return False
+        time.sleep(0)
+    return True
+
+
+class DeadlineTimer:
+    """
+    Taktgeber mit absoluten Deadlines (perf_counter_ns).
+    Injektionskosten und Sleep-Überschwinger summieren sich nicht auf:
+    jede Wartezeit endet am geplanten Zeitpunkt, nicht "jetzt + Intervall".
+    Verpasste Slots (z. B. nach einem Hänger) werden nicht nachgeholt,
+    sondern in `skipped` gezählt.
+    """
+
+    def __init__(self, start_ns: Optional[int] = None):
+        self.next_ns = time.perf_counter_ns() if start_ns is None else start_ns
+        self.skipped = 0
+
+    def advance(self, interval_ns: int) -> int:
+        deadline = self.next_ns + interval_ns
+        now = time.perf_counter_ns()
+        # mehr als ein ganzer Slot zu spät -> Raster neu ausrichten
+        if interval_ns > 0 and now - deadline > interval_ns:
+            missed = (now - deadline) // interval_ns
+            self.skipped += missed
+            deadline += missed * interval_ns
+        self.next_ns = deadline
+        return deadline
+
+    def sleep(self, interval_ns: int, cancel: Optional[Event] = None) -> bool:
+        return sleep_until(self.advance(interval_ns), cancel)
+
+
+# -------------------------------
+# Telemetry
+# -------------------------------
+class LatencyHistogram:
+    """
+    Log-lineares Histogramm (HDR-Prinzip) in Mikrosekunden: 16 Unterteilungen
+    pro Zweierpotenz, ~6 % Auflösung, feste Größe. Es gibt genau einen
+    Schreiber (Scheduler-Thread), daher kein Lock; Leser sehen höchstens
+    einen minimal veralteten Stand.
+    """
+    SUB_BITS = 4
+    SUB = 1 << SUB_BITS
+    BUCKETS = (40 + 1) * SUB
+
+    def __init__(self):
+        self.counts = array("Q", bytes(8 * self.BUCKETS))
+        self.total = 0
+        self.max_us = 0
+
+    def record(self, value_ns: int):
+        v = value_ns // 1000 if value_ns > 0 else 0
+        if v < self.SUB:
+            idx = v
+        else:
+            e = v.bit_length() - self.SUB_BITS - 1
+            idx = min(self.BUCKETS - 1, (e + 1) * self.SUB + (v >> e) - self.SUB)
+        self.counts[idx] += 1
+        self.total += 1
+        if v > self.max_us:
+            self.max_us = v
+
+    def _bucket_value(self, idx: int) -> int:
+        if idx < self.SUB:
+            return idx
+        e = idx // self.SUB - 1
+        lo = (idx % self.SUB + self.SUB) << e
+        return lo + ((1 << e) >> 1)  # Bucket-Mitte
+
+    def percentile(self, q: float) -> int:
+        if not self.total:
+            return 0
+        target = max(1, int(q * self.total + 0.5))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= target:
+                    return min(self._bucket_value(idx), self.max_us)
+        return self.max_us
+
+
+MISS_NS = 1 * MS_NS  # später als das gilt als verpasste Deadline
+
+
+class SetStats:
+    """Laufzeit-Statistik eines Sets (nur vom Scheduler-Thread geschrieben)."""
+
+    def __init__(self):
+        self.events = 0
+        self.missed = 0
+        self.lateness = LatencyHistogram()
+        self.interval = LatencyHistogram()
+        self._last_ns = 0
+
+    def record(self, deadline_ns: int, now_ns: int):
+        self.events += 1
+        late = now_ns - deadline_ns
+        self.lateness.record(late)
+        if late > MISS_NS:
+            self.missed += 1
+        if self._last_ns:
+            self.interval.record(now_ns - self._last_ns)
+        self._last_ns = now_ns
+
+    def snapshot(self) -> tuple:
+        # (events, p99 Verspätung µs, verpasste Deadlines)
+        return self.events, self.lateness.percentile(0.99), self.missed
+
+
+# -------------------------------
+# Scheduler (ein Thread, Heap-Timer-Queue)
+# -------------------------------
+class Scheduler:
+    """
+    Führt Callbacks zu absoluten Deadlines auf genau einem Thread aus.
+    Einträge: (deadline_ns, seq, owner, fn, args); fn(deadline_ns, *args).
+    Der Thread läuft nur, solange die Queue nicht leer ist.
+
+    Jede Wartezeit ist unterbrechbar: call_at/remove wecken den Thread über
+    die Condition (grobe Phase) bzw. das `_changed`-Flag (Spin-Phase).
+
+    Steuerbefehle (Start/Stop aus Hotkey- oder GUI-Thread) kommen über post()
+    in eine Deque und laufen auf dem Scheduler-Thread vor dem nächsten
+    Timer-Eintrag; die Zeit bis dahin landet in `command_latency`.
+    """
+
+    def __init__(self, name: str = "scheduler"):
+        self.name = name
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._cond = Condition()
+        self._changed = False
+        self._thread: Optional[Thread] = None
+        # werden aufgerufen, sobald alle fälligen Einträge eines Ticks liefen
+        self._flushers: list = []
+        self._dirty = False
+        # (issued_ns, fn, args); append/popleft sind atomar, kein eigener Lock
+        self._commands: deque = deque()
+        self.command_latency = LatencyHistogram()
+
+    def post(self, issued_ns: int, fn: Callable, *args):
+        """Befehl aus beliebigem Thread; fn(*args) läuft auf dem Scheduler-Thread."""
+        self._commands.append((issued_ns, fn, args))
+        self._changed = True  # bricht eine laufende Spin-Phase sofort ab
+        with self._cond:
+            self._cond.notify()
+            self._ensure_thread()
+
+    def call_at(self, deadline_ns: int, owner, fn: Callable, *args):
+        with self._cond:
+            heapq.heappush(self._heap, (deadline_ns, next(self._seq), owner, fn, args))
+            self._wake()
+            self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = Thread(target=self._loop, name=self.name, daemon=True)
+            self._thread.start()
+
+    def remove(self, owner):
+        # nur bei Stop nötig, daher O(n) ok
+        with self._cond:
+            self._heap = [e for e in self._heap if e[2] is not owner]
+            heapq.heapify(self._heap)
+            self._wake()
+
+    def add_flusher(self, fn: Callable):
+        with self._cond:
+            if fn not in self._flushers:
+                self._flushers.append(fn)
+
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def _flush(self, flushers: list):
+        # ohne _cond: Display-I/O der Backends blockiert kein call_at/post
+        for fn in flushers:
+            try:
+                fn()
+            except Exception as e:
+                print("[Scheduler ERROR]", repr(e))
+
+    def _wake(self):
+        self._changed = True
+        self._cond.notify()
+
+    def _run_commands(self):
+        while self._commands:
+            issued_ns, fn, args = self._commands.popleft()
+            try:
+                fn(*args)
+            except Exception as e:
+                print("[Scheduler ERROR]", repr(e))
+            self.command_latency.record(time.perf_counter_ns() - issued_ns)
+        self._dirty = True
+
+    def _loop(self):
+        while True:
+            entry = None
+            flushers = None
+            with self._cond:
+                while True:
+                    if self._commands:
+                        break
+                    if self._heap:
+                        deadline = self._heap[0][0]
+                        remaining = deadline - time.perf_counter_ns()
+                        if remaining <= 0:
+                            entry = heapq.heappop(self._heap)
+                            break
+                    # Tick vorbei (oder nichts mehr geplant): gesammelte Events einmal
+                    # senden, außerhalb des Locks
+                    if self._dirty:
+                        self._dirty = False
+                        flushers = list(self._flushers)
+                        break
+                    if not self._heap:
+                        self._thread = None
+                        return
+                    if remaining <= _spin_ns:
+                        break
+                    self._cond.wait((remaining - _spin_ns) / 1e9)
+                self._changed = False
+
+            if flushers is not None:
+                self._flush(flushers)
+                continue
+
+            if entry is None:
+                if self._commands:
+                    self._run_commands()
+                    continue
+                # Spin-Phase ohne Lock; jede Queue-Änderung bricht sie ab
+                while time.perf_counter_ns() < deadline and not self._changed:
+                    time.sleep(0)
+                continue
+
+            deadline, _, _, fn, args = entry
+            self._dirty = True
+            try:
+                fn(deadline, *args)
+            except Exception as e:
+                print("[Scheduler ERROR]", repr(e))
+
+
+# -------------------------------
+# Profile runner
+# -------------------------------
+CLICK_SETTLE_NS = 10 * MS_NS   # Maus bewegen -> kurz warten -> klicken
+EMPTY_SET_NS = 10 * MS_NS      # Set ohne Tasten blockiert nicht
+ZERO_TIME_OPS = 10_000         # Befehle ohne Zeit pro Schritt, danach neu einplanen
+
+
+class ProfileRunner:
+    """
+    Zustandsautomat eines laufenden Profils auf einem Scheduler.
+    Tasten, Intervall-Klicks und Set-Wechsel sind Timer-Einträge; ein
+    Set-Wechsel erhöht nur `gen`, veraltete Einträge verfallen beim Pop.
+
+    Alle Callbacks laufen über _dispatch unter `_lock`; stop() nimmt denselben
+    Lock. Nach der Rückkehr von stop() wird also kein Event mehr ausgelöst.
+
+    Hat ein Set ein Makro, ersetzt dessen Wiedergabe die Tasten: Ereignisse
+    werden direkt aus den Track-Spalten gelesen, jede Deadline ist
+    `_macro_base_ns + t / speed` (absolut, ohne Drift). Alle fälligen
+    Ereignisse eines Ticks laufen in einem Rutsch, die Verspätung jedes
+    Ereignisses landet in der Set-Statistik. Eine Runde = Makro + "Wiederholen
+    nach"; ohne Schleife hält der Runner nach einer Runde an.
+    """
+
+    def __init__(self, get_plans: Callable[[], Tuple[SetPlan, ...]], scheduler: Scheduler, backend):
+        self.get_plans = get_plans
+        self.scheduler = scheduler
+        self.backend = backend  # siehe inputs.InputBackend
+
+        self.running = False
+        self.gen = 0
+        self.index = 0
+        self.plan: SetPlan = EMPTY_PLAN
+        self.set_start_ns = 0
+        self.pc = 0
+        self._loops: list = []   # Restdurchläufe offener Schleifen (OP_LOOP/OP_NEXT)
+        self._type_i = 0         # nächstes Text-Stück von OP_TYPE
+        self.click_i = 0
+        self.skipped = 0
+
+        # Telemetrie pro Set-Index; wird bei jedem Start neu angelegt
+        self.stats: dict = {}
+        self._set_stats = SetStats()
+
+        self._lock = Lock()
+        self._key_timer = DeadlineTimer()
+        self._click_timer = DeadlineTimer()
+
+        # Makro-Wiedergabe; eigene Generation, damit seek() Tasten-/Klick-Timer nicht verwirft
+        self._macro: Optional[MacroPlan] = None
+        self._macro_i = 0
+        self._macro_base_ns = 0
+        self._macro_gen = 0
+
+        # gedrückte Keys/Maustasten (hold, Makro) -> Loslassen-Funktion; bei Stop freigeben
+        self._held: dict = {}
+
+    # Control
+    def start(self, index: int = 0):
+        self.scheduler.add_flusher(self.backend.flush)
+        with self._lock:
+            if self.running:
+                return
+            self.running = True
+            self.stats = {}
+            self._activate(index, time.perf_counter_ns())
+
+    def stop(self):
+        with self._lock:
+            self.running = False
+            self.gen += 1
+            held, self._held = self._held, {}
+        self.scheduler.remove(self)
+        if held:
+            # auf dem Scheduler-Thread loslassen (Backends sind nicht thread-safe)
+            self.scheduler.post(time.perf_counter_ns(), self._release_all, held)
+
+    def request_start(self, index: int = 0, issued_ns: Optional[int] = None):
+        """Start aus beliebigem Thread, ausgeführt vom Scheduler-Thread."""
+        self.scheduler.post(issued_ns or time.perf_counter_ns(), self.start, index)
+
+    def request_stop(self, issued_ns: Optional[int] = None):
+        self.scheduler.post(issued_ns or time.perf_counter_ns(), self.stop)
+
+    def request_seek(self, index: int, t_ms: int, issued_ns: Optional[int] = None):
+        """Makro von Set `index` ab Aufnahmezeit t_ms weiterspielen, falls es gerade aktiv ist."""
+        self.scheduler.post(issued_ns or time.perf_counter_ns(), self.seek, index, t_ms * MS_NS)
+
+    def seek(self, index: int, t_ns: int):
+        with self._lock:
+            if (not self.running or index != self.index
+                    or self.plan.macro is None or self._macro is None):
+                return
+            self._macro_seek(t_ns, time.perf_counter_ns())
+
+    def stats_snapshot(self) -> dict:
+        return {i: st.snapshot() for i, st in list(self.stats.items())}
+
+    def total_events(self) -> int:
+        return sum(st.events for st in list(self.stats.values()))
+
+    def _at(self, deadline_ns: int, fn: Callable, *args):
+        self.scheduler.call_at(deadline_ns, self, self._dispatch, self.gen, fn, args)
+
+    def _dispatch(self, deadline: int, gen: int, fn: Callable, args: tuple):
+        with self._lock:
+            if self.running and gen == self.gen:
+                fn(deadline, *args)
+
+    # Set activation
+    def _activate(self, index: int, now_ns: int):
+        plans = self.get_plans()
+        if not plans:
+            self.running = False
+            return
+        if index < 0 or index >= len(plans):
+            index = 0
+
+        self.gen += 1
+        # Set-Wechsel mitten in hold(): ausstehendes Loslassen ist verworfen
+        self._release_all(self._held)
+        self._held = {}
+        # Makro des alten Sets ist vorbei (seek() darf es nicht wieder anwerfen)
+        self._macro = None
+        self._macro_gen += 1
+        self.index = index
+        self.plan = plan = plans[index]
+        self.set_start_ns = now_ns
+        stats = self.stats.get(index)
+        if stats is None:
+            stats = self.stats[index] = SetStats()
+        self._set_stats = stats
+
+        t = now_ns
+        if not plan.program and plan.macro is None:
+            t += EMPTY_SET_NS
+
+        if plan.click_mode == CLICK_INTERVAL:
+            self.click_i = 0
+            self._click_timer = DeadlineTimer(t)
+            self._at(t, self._click_step)
+
+        # ✅ Positionen GENAU EINMAL pro Set, danach erst die Tasten
+        if plan.click_mode == CLICK_ONCE:
+            if plan.positions:
+                for p in plan.positions:
+                    self._at(t, self._move_step, p.x, p.y)
+                    t += CLICK_SETTLE_NS
+                    self._at(t, self._click_only)
+            else:
+                self._at(t, self._click_only)
+
+        self._at(t, self._cycle_start)
+
+    # Keys
+    def _cycle_start(self, deadline: int):
+        # Neu kompilierten Plan nur an der Zyklusgrenze übernehmen
+        plans = self.get_plans()
+        if self.index >= len(plans):
+            self._activate(0, deadline)
+            return
+        self.plan = plans[self.index]
+        if self.plan.macro is not None:
+            self._macro = self.plan.macro
+            self._macro_seek(self._macro.start_ns, deadline)
+            return
+        self._macro = None
+        self.pc = 0
+        self._loops = []
+        self._type_i = 0
+        self._key_timer = DeadlineTimer(deadline)
+        self._key_step(deadline)
+
+    def _key_step(self, deadline: int):
+        # Bytecode bis zum nächsten Schritt mit Zeit ausführen (keydsl)
+        plan = self.plan
+        code = plan.program.code
+        consts = plan.program.consts
+        backend = self.backend
+        held = self._held
+        pc = self.pc
+        budget = ZERO_TIME_OPS
+        while pc < len(code):
+            op = code[pc]
+            arg = code[pc + 1]
+            pc += 2
+            if op == OP_TAP:
+                key = consts[arg]
+                if key is not None:
+                    backend.press(key)
+                    self._set_stats.record(deadline, time.perf_counter_ns())
+                self.pc = pc
+                self._at(self._next(self._key_timer, plan.inner_ns), self._key_step)
+                return
+            if op == OP_COMBO:
+                keys = consts[arg]
+                for key in keys:
+                    backend.key_down(key)
+                for key in reversed(keys):
+                    backend.key_up(key)
+                if keys:
+                    self._set_stats.record(deadline, time.perf_counter_ns())
+                self.pc = pc
+                self._at(self._next(self._key_timer, plan.inner_ns), self._key_step)
+                return
+            if op == OP_DOWN:
+                for key in consts[arg]:
+                    backend.key_down(key)
+                    held[("key", key)] = (backend.key_up, key)
+            elif op == OP_UP:
+                for key in reversed(consts[arg]):
+                    backend.key_up(key)
+                    held.pop(("key", key), None)
+                if consts[arg]:
+                    self._set_stats.record(deadline, time.perf_counter_ns())
+                self.pc = pc
+                self._at(self._next(self._key_timer, plan.inner_ns), self._key_step)
+                return
+            elif op == OP_WAIT:
+                self.pc = pc
+                self._at(self._next(self._key_timer, arg), self._key_step)
+                return
+            elif op == OP_TYPE:
+                # ein Stück pro Schritt; der Scheduler flusht dazwischen
+                chunks, char_ns = consts[arg]
+                i = self._type_i
+                if i == 0 or char_ns:
+                    self._set_stats.record(deadline, time.perf_counter_ns())
+                backend.type_text(chunks[i])
+                if not char_ns:
+                    # ohne Abstand so schnell wie möglich: Raster ans Ende des Stücks legen
+                    self._key_timer.next_ns = time.perf_counter_ns()
+                if i + 1 < len(chunks):
+                    self._type_i = i + 1
+                    self.pc = pc - 2
+                    self._at(self._next(self._key_timer, char_ns), self._key_step)
+                else:
+                    self._type_i = 0
+                    self.pc = pc
+                    self._at(self._next(self._key_timer, plan.inner_ns), self._key_step)
+                return
+            elif op == OP_LOOP:
+                self._loops.append(arg)
+            elif op == OP_NEXT:
+                self._loops[-1] -= 1
+                if self._loops[-1] > 0:
+                    pc = arg
+                else:
+                    self._loops.pop()
+            budget -= 1
+            if budget <= 0:
+                # Schleife ohne Zeit (z. B. [wait(0)]*9999): Scheduler nicht blockieren
+                self.pc = pc
+                self._at(deadline, self._key_step)
+                return
+        self.pc = pc
+        self._at(self._next(self._key_timer, plan.repeat_ns), self._cycle_end)
+
+    def _cycle_end(self, deadline: int):
+        plan = self.plan
+
+        # 1️⃣ Jump-Back hat PRIORITÄT
+        if plan.jump_target >= 0:
+            self._activate(plan.jump_target, deadline)
+            return
+
+        # 2️⃣ Switch to target set (Zeit = 0 → sofort, sonst wenn Zeit erreicht)
+        if plan.switch_target >= 0 and (
+                plan.switch_after_ns == 0
+                or deadline - self.set_start_ns >= plan.switch_after_ns
+        ):
+            self._activate(plan.switch_target, deadline)
+            return
+
+        self._cycle_start(deadline)
+
+    # Macro
+    def _macro_seek(self, t_ns: int, now_ns: int):
+        m = self._macro
+        self._release_all(self._held)
+        self._held = {}
+        self._macro_gen += 1
+        self._macro_i = m.track.index_at(t_ns)
+        # Aufnahmezeit t_ns liegt jetzt bei now_ns
+        self._macro_base_ns = now_ns - int(t_ns / m.speed)
+        if self._macro_i < len(m.track):
+            self._at(m.due_ns(self._macro_base_ns, self._macro_i), self._macro_step, self._macro_gen)
+        else:
+            self._macro_end(now_ns)
+
+    def _macro_step(self, deadline: int, gen: int):
+        if gen != self._macro_gen:
+            return
+        m = self._macro
+        n = len(m.track)
+        i = self._macro_i
+        base = self._macro_base_ns
+        stats = self._set_stats
+        due = deadline
+        while True:
+            self._macro_event(m, i)
+            stats.record(due, time.perf_counter_ns())
+            i += 1
+            if i >= n:
+                break
+            due = m.due_ns(base, i)
+            if due > time.perf_counter_ns():
+                break
+        self._macro_i = i
+        if i < n:
+            self._at(due, self._macro_step, gen)
+        else:
+            self._macro_end(m.due_ns(base, n - 1))
+
+    def _macro_event(self, m: MacroPlan, i: int):
+        track = m.track
+        k = track.kind[i]
+        kind = k & KIND_MASK
+        backend = self.backend
+        if kind == MOVE:
+            backend.move(track.a[i], track.b[i])
+        elif kind == KEY_DOWN or kind == KEY_UP:
+            key = m.keys[track.a[i]]
+            if key is None:
+                return
+            if kind == KEY_DOWN:
+                backend.key_down(key)
+                self._held[("key", key)] = (backend.key_up, key)
+            else:
+                backend.key_up(key)
+                self._held.pop(("key", key), None)
+        elif kind == BTN_DOWN or kind == BTN_UP:
+            button = m.buttons[k >> 3]
+            if button is None:
+                return
+            backend.move(track.a[i], track.b[i])
+            if kind == BTN_DOWN:
+                backend.button_down(button)
+                self._held[("button", button)] = (backend.button_up, button)
+            else:
+                backend.button_up(button)
+                self._held.pop(("button", button), None)
+
+    def _macro_end(self, end_ns: int):
+        # am Ende gehaltene Tasten (Aufnahme mittendrin beendet) loslassen
+        self._release_all(self._held)
+        self._held = {}
+        plan = self.plan
+        if self._macro.loop or plan.jump_target >= 0 or plan.switch_target >= 0:
+            self._at(end_ns + plan.repeat_ns, self._macro_round_end, self._macro_gen)
+        else:
+            # einmal abspielen: Runner hält an
+            self.running = False
+            self.gen += 1
+
+    def _macro_round_end(self, deadline: int, gen: int):
+        if gen == self._macro_gen:
+            self._cycle_end(deadline)
+
+    def _release_all(self, held: dict):
+        for release, arg in held.values():
+            try:
+                release(arg)
+            except Exception as e:
+                print("[Macro ERROR]", repr(e))
+
+    # Clicks
+    def _click_step(self, deadline: int):
+        plans = self.get_plans()
+        plan = plans[self.index] if self.index < len(plans) else self.plan
+        if plan.click_mode != CLICK_INTERVAL:
+            return
+
+        if plan.positions:
+            p = plan.positions[self.click_i % len(plan.positions)]
+            self.click_i += 1
+            self.backend.move(p.x, p.y)
+            self._at(deadline + CLICK_SETTLE_NS, self._click_only)
+            interval = max(p.interval_ns, CLICK_SETTLE_NS)
+        else:
+            self.backend.click()
+            self._set_stats.record(deadline, time.perf_counter_ns())
+            interval = plan.click_interval_ns
+
+        self._at(self._next(self._click_timer, interval), self._click_step)
+
+    def _move_step(self, deadline: int, x: int, y: int):
+        self.backend.move(x, y)
+
+    def _click_only(self, deadline: int):
+        self.backend.click()
+        self._set_stats.record(deadline, time.perf_counter_ns())
+
+    def _next(self, timer: DeadlineTimer, interval_ns: int) -> int:
+        deadline = timer.advance(interval_ns)
+        if timer.skipped:
+            self.skipped += timer.skipped
+            self._set_stats.missed += timer.skipped
+            timer.skipped = 0
+        return deadline
+
+
+# -------------------------------
+# Engine (mehrere Profile, ein Scheduler)
+# -------------------------------
+class Engine:
+    """
+    Gemeinsamer Scheduler-Thread und gemeinsames Backend für beliebig viele
+    gleichzeitig laufende Profile. Die Timer aller Profile liegen in einer
+    Heap-Queue, statt dass jedes Profil eigene Threads um den GIL konkurrieren lässt.
+    """
+
+    def __init__(self, backend, name: str = "engine"):
+        self.backend = backend
+        self.scheduler = Scheduler(name=name)
+        self.runners: list = []
+
+    def create_runner(self, get_plans: Callable[[], Tuple[SetPlan, ...]]) -> ProfileRunner:
+        runner = ProfileRunner(get_plans, self.scheduler, self.backend)
+        self.runners.append(runner)
+        return runner
+
+    def remove_runner(self, runner: ProfileRunner):
+        runner.stop()
+        if runner in self.runners:
+            self.runners.remove(runner)
+
+    def stop_all(self):
+        for r in list(self.runners):
+            r.stop()
+
+    def running_count(self) -> int:
+        return sum(1 for r in self.runners if r.running)
+
+    def total_events(self) -> int:
+        # nur lesend, Zähler werden vom Scheduler-Thread geschrieben
+        return sum(r.total_events() for r in list(self.runners))
+
+    def control_latency_us(self) -> Optional[int]:
+        """p99 Hotkey/Button -> Wirkung in µs (None = noch kein Befehl)."""
+        hist = self.scheduler.command_latency
+        return hist.percentile(0.99) if hist.total else None
+
+    def set_spin_window_us(self, us: int):
+        set_spin_window_us(us)
+
+    def poll(self):
+        # Prozess-Engine holt hier Statistiken ab; lokal liegt alles im Speicher
+        pass
+
+    def close(self):
+        self.stop_all()
@@ -0,0 +1,124 @@
+"""
+Headless-Runner: führt ein gespeichertes Profil ohne Qt aus.
+
+    python main.py run --profile "Profil 1" --file button_masher_profiles.json
+
+Gleiche Runner-Semantik wie die GUI (Set-Wechsel, Jump-Back, Klicks),
+beendet mit Strg+C oder nach --duration Sekunden. --profile darf mehrfach
+angegeben werden; alle Profile laufen dann gleichzeitig auf einer Engine.
+"""
+import argparse
+import json
+import signal
+import sys
+import time
+from pathlib import Path
+from threading import Event
+from typing import Optional
+
+from engine import (
+    compile_sets, clamp_int, set_spin_window_us, Engine,
+    DEFAULT_SPIN_US, SPIN_MAX_US,
+)
+from library import last_active_name
+
+SETTINGS_PATH = Path(__file__).with_name("button_masher_profiles.json")
+
+
+def find_profile(cfg: dict, name: Optional[str]) -> Optional[dict]:
+    profiles = cfg.get("profiles", [])
+    if not isinstance(profiles, list) or not profiles:
+        return None
+    if name is None:
+        # zuletzt aktives Profil, sonst das erste
+        last = last_active_name(cfg)
+        for p in profiles:
+            if isinstance(p, dict) and p.get("name") == last:
+                return p
+        return next((p for p in profiles if isinstance(p, dict)), None)
+    for p in profiles:
+        if isinstance(p, dict) and p.get("name") == name:
+            return p
+    return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="main.py run", description="Profil ohne GUI ausführen")
+    ap.add_argument("--profile", action="append",
+                    help="Profilname, mehrfach möglich (Standard: zuletzt aktives Profil)")
+    ap.add_argument("--file", type=Path, default=SETTINGS_PATH, help="Profil-Datei (JSON)")
+    ap.add_argument("--backend", help="Eingabe-Backend (pynput, xtest, recording; Standard: $BUTTON_MASHER_BACKEND)")
+    ap.add_argument("--duration", type=float, default=0.0, help="Laufzeit in Sekunden (0 = bis Strg+C)")
+    return ap
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    try:
+        cfg = json.loads(Path(args.file).read_text(encoding="utf-8"))
+    except Exception as e:
+        print(f"Profile konnten nicht geladen werden: {e}", file=sys.stderr)
+        return 1
+    if not isinstance(cfg, dict):
+        cfg = {}
+
+    profiles = []
+    for name in (args.profile or [None]):
+        profile = find_profile(cfg, name)
+        if profile is None:
+            print(f"Profil nicht gefunden: {name}", file=sys.stderr)
+            return 2
+        profiles.append(profile)
+
+    # Backend öffnet ggf. die Display-Verbindung, daher erst nach dem Laden
+    from inputs import select_backend
+    try:
+        backend = select_backend(args.backend)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    compiled = []
+    for profile in profiles:
+        data = profile.get("data", {})
+        plans = compile_sets(data.get("sets", []) if isinstance(data, dict) else [], backend.resolve_key)
+        if not plans:
+            print(f"Kein Set vorhanden: {profile.get('name', '')}", file=sys.stderr)
+            return 2
+        for i, plan in enumerate(plans, 1):
+            if plan.error is not None:
+                print(f"Set {i} in „{profile.get('name', '')}“: {plan.error}", file=sys.stderr)
+                return 2
+        compiled.append((profile.get("name", ""), plans))
+
+    ui = cfg.get("ui", {}) if isinstance(cfg.get("ui"), dict) else {}
+    set_spin_window_us(clamp_int(ui.get("spin_us"), 0, SPIN_MAX_US, DEFAULT_SPIN_US))
+
+    done = Event()
+    signal.signal(signal.SIGINT, lambda *_: done.set())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: done.set())
+
+    engine = Engine(backend, name="runner:headless")
+    for name, plans in compiled:
+        runner = engine.create_runner(lambda plans=plans: plans)
+        print(f"Starte Profil „{name}“ ({len(plans)} Sets) – Strg+C zum Beenden")
+        runner.start()
+
+    # kurze Event.wait-Schritte, damit Signale auch unter Windows ankommen
+    end = time.monotonic() + args.duration if args.duration > 0 else None
+    while engine.running_count() and not done.wait(0.2):
+        if end is not None and time.monotonic() >= end:
+            break
+
+    engine.stop_all()
+    backend.close()
+    skipped = sum(r.skipped for r in engine.runners)
+    if skipped:
+        print(f"Verpasste Takt-Slots: {skipped}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
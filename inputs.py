@@ -0,0 +1,571 @@
+"""
+Eingabe-Backends ohne Qt-Abhängigkeit.
+Wird von der GUI (main.py) und vom Headless-Runner (headless.py) genutzt.
+
+Das aktive Backend wird beim Start gewählt (Umgebungsvariable
+BUTTON_MASHER_BACKEND bzw. `--backend` im Headless-Modus):
+
+- pynput     – Standard, plattformübergreifend
+- xtest      – Linux/X11: direkte XTest-Injektion, eine Verbindung,
+               Events werden pro Scheduler-Tick gesammelt und gebündelt
+               gesendet (benötigt python-xlib)
+- recording  – schreibt Events nur in einen Speicher (Benchmarks, Tests,
+               Rechner ohne Display)
+"""
+import os
+import time
+from array import array
+from collections import deque
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from engine import resolve_key, MOUSE_BUTTONS
+from keymap import canonical_name, char_keysym, X_KEYSYMS
+
+
+# -------------------------------
+# Injected-event ledger
+# -------------------------------
+CLICK_TOKEN = "<click>"
+MOVE_TOKEN = "<move>"
+
+
+def button_token(button: str) -> str:
+    """Maustaste ("left"/"middle"/"right") -> Ledger-Token fürs Drücken."""
+    return CLICK_TOKEN if button == "left" else f"<{button}>"
+
+
+class InjectedLedger:
+    """
+    Merkt sich selbst injizierte Tastendrücke/Klicks, damit die globalen
+    Listener sie verwerfen können. Erfasst werden nur beobachtete Tokens
+    (Hotkeys, Klick); für alle anderen kostet note() einen Set-Lookup.
+    Während einer Makro-Aufnahme (watch_all) zählen alle Tasten, Maustasten
+    und Mausbewegungen, damit ein laufendes Set sich nicht selbst aufnimmt.
+    Tokens: Zeichen bzw. pynput-Key-Name ("a", "f5", "enter").
+    Klicks und Bewegungen tragen ihre Bildschirmposition: ein echter Klick
+    woanders (z. B. beim Erfassen einer Klickposition) verbraucht keinen
+    injizierten Eintrag.
+    Einträge verfallen nach TTL_NS, falls der Listener ein Event nie sieht.
+    """
+    TTL_NS = 250_000_000
+    MAX_PENDING = 1024
+    POS_TOLERANCE = 2       # px, Rundung bei skalierten Bildschirmen
+
+    def __init__(self):
+        self._lock = Lock()
+        self._watched: frozenset = frozenset()
+        self._all = False
+        self._pending: Dict[str, deque] = {}
+
+    def watch(self, tokens: Iterable[str]):
+        with self._lock:
+            self._watched = frozenset(tokens)
+            self._pending = {}
+
+    def watch_all(self, enabled: bool):
+        """Makro-Aufnahme: alle injizierten Tasten, Maustasten und Bewegungen merken."""
+        with self._lock:
+            self._all = enabled
+            self._pending = {}
+
+    def note(self, token, pos: Optional[Tuple[int, int]] = None):
+        if token not in self._watched and not self._all:
+            return
+        with self._lock:
+            q = self._pending.get(token)
+            if q is None:
+                q = self._pending[token] = deque(maxlen=self.MAX_PENDING)
+            q.append((time.perf_counter_ns(), pos))
+
+    def note_click(self, position: Callable[[], Tuple[int, int]], button: str = "left"):
+        """Injiziertes Drücken einer Maustaste; position() nur, wenn sie beobachtet wird."""
+        token = button_token(button)
+        if token not in self._watched and not self._all:
+            return
+        try:
+            pos = position()
+        except Exception:
+            pos = None      # ohne Position passt der Eintrag auf jeden Klick
+        self.note(token, pos)
+
+    def note_move(self, x: int, y: int):
+        if self._all:
+            self.note(MOVE_TOKEN, (x, y))
+
+    def consume(self, token, pos: Optional[Tuple[int, int]] = None) -> bool:
+        """True, wenn das Event von uns stammt (Eintrag wird verbraucht)."""
+        if not self._pending:
+            return False
+        now = time.perf_counter_ns()
+        tol = self.POS_TOLERANCE
+        with self._lock:
+            q = self._pending.get(token)
+            while q and now - q[0][0] > self.TTL_NS:
+                q.popleft()
+            if not q:
+                return False
+            for i, (_, noted) in enumerate(q):
+                if noted is None or pos is None or (
+                        abs(noted[0] - pos[0]) <= tol and abs(noted[1] - pos[1]) <= tol):
+                    del q[i]
+                    return True
+        return False
+
+
+INJECTED = InjectedLedger()
+
+
+def key_token(key) -> Optional[str]:
+    """pynput-Key/KeyCode bzw. Zeichen -> Ledger-/Hotkey-Token."""
+    if isinstance(key, str):
+        return key
+    return getattr(key, "char", None) or getattr(key, "name", None)
+
+
+# -------------------------------
+# Backend interface
+# -------------------------------
+class InputBackend:
+    name = "base"
+
+    def resolve_key(self, key_text: str):
+        """Tastenname -> backend-eigenes Key-Objekt (None = unbekannt)."""
+        raise NotImplementedError
+
+    def press(self, key):
+        # Taste einmal tippen (down + up)
+        self.key_down(key)
+        self.key_up(key)
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def type_text(self, text: str):
+        """Text tippen (Unicode, "\n" = Enter, "\t" = Tab); Stücke kommen vorab geteilt aus keydsl."""
+        raise NotImplementedError
+
+    def move(self, x: int, y: int) -> bool:
+        raise NotImplementedError
+
+    def click(self) -> bool:
+        raise NotImplementedError
+
+    def button_down(self, button: str):
+        """Maustaste drücken ("left"/"middle"/"right", siehe MOUSE_BUTTONS)."""
+        raise NotImplementedError
+
+    def button_up(self, button: str):
+        raise NotImplementedError
+
+    def position(self) -> Tuple[int, int]:
+        return 0, 0
+
+    def flush(self):
+        # für Backends, die Events pro Tick sammeln
+        pass
+
+    def close(self):
+        pass
+
+
+# -------------------------------
+# pynput
+# -------------------------------
+class PynputBackend(InputBackend):
+    name = "pynput"
+
+    def __init__(self):
+        from pynput.keyboard import Controller as KeyController
+        from pynput.mouse import Controller as MouseController, Button
+        self.kb = KeyController()
+        self.ms = MouseController()
+        self._left = Button.left
+        self._buttons = {name: getattr(Button, name) for name in MOUSE_BUTTONS}
+        # Zeichen -> fertiges Key-Objekt (wächst mit jedem neuen Zeichen)
+        self._text_keys: Dict[str, object] = {}
+
+    def resolve_key(self, key_text: str):
+        return resolve_key(key_text)
+
+    def press(self, key):
+        INJECTED.note(key_token(key))
+        self.kb.press(key)
+        self.kb.release(key)
+
+    def key_down(self, key):
+        INJECTED.note(key_token(key))
+        self.kb.press(key)
+
+    def key_up(self, key):
+        self.kb.release(key)
+
+    def _text_key(self, ch: str):
+        from pynput.keyboard import Key, KeyCode
+        key = Key.enter if ch in "\n\r" else Key.tab if ch == "\t" else KeyCode.from_char(ch)
+        self._text_keys[ch] = key
+        return key
+
+    def type_text(self, text: str):
+        # wie Controller.type(), aber ohne Umwandlung pro Zeichen
+        keys = self._text_keys
+        kb = self.kb
+        for ch in text:
+            key = keys.get(ch) or self._text_key(ch)
+            INJECTED.note(key_token(key))
+            kb.press(key)
+            kb.release(key)
+
+    def move(self, x: int, y: int) -> bool:
+        try:
+            INJECTED.note_move(int(x), int(y))
+            self.ms.position = (int(x), int(y))
+            return True
+        except Exception as e:
+            print("[Mouse ERROR]", repr(e))
+            return False
+
+    def click(self) -> bool:
+        try:
+            INJECTED.note_click(self.position)
+            self.ms.click(self._left)
+            return True
+        except Exception as e:
+            print("[Mouse ERROR]", repr(e))
+            return False
+
+    def button_down(self, button: str):
+        INJECTED.note_click(self.position, button)
+        self.ms.press(self._buttons[button])
+
+    def button_up(self, button: str):
+        self.ms.release(self._buttons[button])
+
+    def position(self) -> Tuple[int, int]:
+        x, y = self.ms.position
+        return int(x), int(y)
+
+
+# -------------------------------
+# XTest (Linux/X11, gebündelt)
+# -------------------------------
+# zusätzlich zu keymap: alle Keysym-Namen von python-xlib ("xf86audioplay", "kp_home" …)
+_XK_GROUPS = ("miscellany", "latin1", "latin2", "latin3", "latin4", "greek",
+              "cyrillic", "arabic", "hebrew", "xkb", "xf86", "publishing", "special")
+
+
+# Core-Keymap-Spalte -> Modifier für type_text: 0/1 Grundebene (+Umschalt),
+# 2/3 Gruppe 2 über Mode_switch, 4/5 AltGr-Ebene (XKB legt Ebene 3/4 dorthin).
+# Weitere Spalten werden nicht getippt.
+_XK_SHIFT, _XK_MODE_SWITCH, _XK_LEVEL3 = X_KEYSYMS["shift"], 0xFF7E, X_KEYSYMS["alt_gr"]
+_XK_INDEX_MODS = ((), (_XK_SHIFT,), (_XK_MODE_SWITCH,), (_XK_MODE_SWITCH, _XK_SHIFT),
+                  (_XK_LEVEL3,), (_XK_LEVEL3, _XK_SHIFT))
+
+
+class XTestBackend(InputBackend):
+    """
+    Hält genau eine Display-Verbindung offen. fake_input() landet nur im
+    Ausgabepuffer von python-xlib; erst flush() schickt alle Events eines
+    Ticks in einem Schwung an den Server (kein sync/Round-Trip pro Event).
+    Key-Objekte sind X-Keycodes.
+    """
+    name = "xtest"
+
+    def __init__(self):
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._fake = xtest.fake_input
+        self.display = display.Display()
+        if not self.display.has_extension("XTEST"):
+            raise RuntimeError("X-Server ohne XTEST-Erweiterung")
+        # eigene Verbindung für Abfragen aus anderen Threads (Xlib ist nicht thread-safe)
+        self._query_display = None
+        self._pending = 0
+        self._moved_to: Optional[Tuple[int, int]] = None
+        # Keycode -> Ledger-Token (Name, unter dem resolve_key ihn geliefert hat)
+        self._tokens: Dict[int, str] = {}
+        self._xk_names: Optional[Dict[str, int]] = None
+        # Zeichen -> (Keycode, Modifier-Keycodes) bzw. None, wenn das Layout es nicht hat
+        self._text_keys: Dict[str, Optional[Tuple[int, Tuple[int, ...]]]] = {}
+
+    def _keysym_names(self) -> Dict[str, int]:
+        # einmal beim ersten unbekannten Namen: Keysym-Tabellen von python-xlib, klein geschrieben
+        if self._xk_names is None:
+            XK = self._XK
+            for group in _XK_GROUPS:
+                try:
+                    XK.load_keysym_group(group)
+                except ImportError:
+                    pass
+            names: Dict[str, int] = {}
+            for attr, keysym in vars(XK).items():
+                if attr.startswith("XK_") and isinstance(keysym, int):
+                    names.setdefault(attr[3:].lower(), keysym)
+            self._xk_names = names
+        return self._xk_names
+
+    def resolve_key(self, key_text: str):
+        name = canonical_name(key_text)
+        if name is not None and name in X_KEYSYMS:
+            keysym = X_KEYSYMS[name]
+        elif name is not None and len(name) == 1:
+            keysym = char_keysym(name)
+        else:
+            name = (key_text or "").strip().lower()
+            keysym = self._keysym_names().get(name)
+            if keysym is None:
+                return None
+        keycode = self.display.keysym_to_keycode(keysym)
+        if keycode:
+            self._tokens.setdefault(keycode, name)
+        return keycode or None
+
+    def press(self, key):
+        INJECTED.note(self._tokens.get(key))
+        self._fake(self.display, self._X.KeyPress, key)
+        self._fake(self.display, self._X.KeyRelease, key)
+        self._pending += 2
+
+    def key_down(self, key):
+        INJECTED.note(self._tokens.get(key))
+        self._fake(self.display, self._X.KeyPress, key)
+        self._pending += 1
+
+    def key_up(self, key):
+        self._fake(self.display, self._X.KeyRelease, key)
+        self._pending += 1
+
+    def _text_key(self, ch: str) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        keysym = X_KEYSYMS["enter"] if ch in "\n\r" else X_KEYSYMS["tab"] if ch == "\t" else char_keysym(ch)
+        display = self.display
+        keycode = display.keysym_to_keycode(keysym)
+        entry = None
+        if keycode:
+            # Spalte in der Core-Tastaturtabelle -> nötige Modifier
+            for index, mod_keysyms in enumerate(_XK_INDEX_MODS):
+                if display.keycode_to_keysym(keycode, index) == keysym:
+                    mods = tuple(display.keysym_to_keycode(m) for m in mod_keysyms)
+                    # Modifier fehlt im Layout: Zeichen überspringen statt falsch tippen
+                    if all(mods):
+                        entry = (keycode, mods)
+                    break
+        self._text_keys[ch] = entry
+        return entry
+
+    def type_text(self, text: str):
+        # Zeichen ohne Taste im aktuellen Layout werden übersprungen
+        fake, display, X = self._fake, self.display, self._X
+        keys = self._text_keys
+        n = 0
+        for ch in text:
+            entry = keys[ch] if ch in keys else self._text_key(ch)
+            if entry is None:
+                continue
+            keycode, mods = entry
+            for m in mods:
+                fake(display, X.KeyPress, m)
+            fake(display, X.KeyPress, keycode)
+            fake(display, X.KeyRelease, keycode)
+            for m in reversed(mods):
+                fake(display, X.KeyRelease, m)
+            n += 2 + 2 * len(mods)
+        self._pending += n
+
+    def move(self, x: int, y: int) -> bool:
+        try:
+            INJECTED.note_move(int(x), int(y))
+            self._fake(self.display, self._X.MotionNotify, x=int(x), y=int(y))
+            self._pending += 1
+            self._moved_to = (int(x), int(y))
+            return True
+        except Exception as e:
+            print("[Mouse ERROR]", repr(e))
+            return False
+
+    def click(self) -> bool:
+        try:
+            INJECTED.note_click(self._click_position)
+            self._fake(self.display, self._X.ButtonPress, 1)
+            self._fake(self.display, self._X.ButtonRelease, 1)
+            self._pending += 2
+            return True
+        except Exception as e:
+            print("[Mouse ERROR]", repr(e))
+            return False
+
+    def button_down(self, button: str):
+        INJECTED.note_click(self._click_position, button)
+        self._fake(self.display, self._X.ButtonPress, MOUSE_BUTTONS[button])
+        self._pending += 1
+
+    def button_up(self, button: str):
+        self._fake(self.display, self._X.ButtonRelease, MOUSE_BUTTONS[button])
+        self._pending += 1
+
+    def position(self) -> Tuple[int, int]:
+        if self._query_display is None:
+            from Xlib import display
+            self._query_display = display.Display()
+        p = self._query_display.screen().root.query_pointer()
+        return int(p.root_x), int(p.root_y)
+
+    def _click_position(self) -> Tuple[int, int]:
+        # Bewegung dieses Ticks liegt noch im Puffer, der Server kennt sie nicht;
+        # sonst über die eigene Verbindung fragen (Runner-Thread, nicht _query_display)
+        if self._moved_to is not None:
+            return self._moved_to
+        p = self.display.screen().root.query_pointer()
+        return int(p.root_x), int(p.root_y)
+
+    def flush(self):
+        self._moved_to = None
+        if self._pending:
+            self._pending = 0
+            self.display.flush()
+
+    def close(self):
+        try:
+            self.flush()
+            self.display.close()
+            if self._query_display is not None:
+                self._query_display.close()
+        except Exception:
+            pass
+
+
+# -------------------------------
+# Recording (in-memory)
+# -------------------------------
+EV_KEY = 1        # a = Key-Code (Tippen)
+EV_KEY_DOWN = 2
+EV_KEY_UP = 3
+EV_MOVE = 4       # a = x, b = y
+EV_CLICK = 5
+EV_BUTTON_DOWN = 6  # a = Tastennummer (MOUSE_BUTTONS)
+EV_BUTTON_UP = 7
+
+# kanonische Namen -> negative Codes (Reihenfolge von keymap.X_KEYSYMS), Zeichen -> Codepoint
+_RECORDING_CODES = {name: -(i + 1) for i, name in enumerate(X_KEYSYMS)}
+
+
+class RecordingBackend(InputBackend):
+    """
+    Speichert jedes Event mit perf_counter_ns in vorab allozierten Arrays
+    (struct-of-arrays, keine Python-Objekte pro Event). Ist der Puffer voll,
+    werden weitere Events nur noch in `dropped` gezählt.
+    Key-Codes: Zeichen = Unicode-Codepoint, Sondertasten = negativ.
+    """
+    name = "recording"
+
+    def __init__(self, capacity: int = 1_000_000):
+        self.capacity = capacity
+        self.t_ns = array("q", bytes(8 * capacity))
+        self.kind = array("b", bytes(capacity))
+        self.a = array("i", bytes(4 * capacity))
+        self.b = array("i", bytes(4 * capacity))
+        self.count = 0
+        self.dropped = 0
+        self._pos = (0, 0)
+
+    def _record(self, kind: int, a: int = 0, b: int = 0):
+        i = self.count
+        if i >= self.capacity:
+            self.dropped += 1
+            return
+        self.t_ns[i] = time.perf_counter_ns()
+        self.kind[i] = kind
+        self.a[i] = a
+        self.b[i] = b
+        self.count = i + 1
+
+    def resolve_key(self, key_text: str):
+        name = canonical_name(key_text)
+        if name is None:
+            return None
+        if name in _RECORDING_CODES:
+            return _RECORDING_CODES[name]
+        return ord(name)
+
+    def press(self, key):
+        self._record(EV_KEY, key)
+
+    def key_down(self, key):
+        self._record(EV_KEY_DOWN, key)
+
+    def key_up(self, key):
+        self._record(EV_KEY_UP, key)
+
+    def type_text(self, text: str):
+        # ein EV_KEY pro Zeichen, a = Codepoint (Groß-/Kleinschreibung bleibt)
+        for ch in text:
+            self._record(EV_KEY, ord(ch))
+
+    def move(self, x: int, y: int) -> bool:
+        self._pos = (int(x), int(y))
+        self._record(EV_MOVE, self._pos[0], self._pos[1])
+        return True
+
+    def click(self) -> bool:
+        self._record(EV_CLICK, self._pos[0], self._pos[1])
+        return True
+
+    def button_down(self, button: str):
+        self._record(EV_BUTTON_DOWN, MOUSE_BUTTONS[button])
+
+    def button_up(self, button: str):
+        self._record(EV_BUTTON_UP, MOUSE_BUTTONS[button])
+
+    def position(self) -> Tuple[int, int]:
+        return self._pos
+
+    def clear(self):
+        self.count = 0
+        self.dropped = 0
+
+    def timestamps(self) -> memoryview:
+        return memoryview(self.t_ns)[:self.count]
+
+    def events(self):
+        for i in range(self.count):
+            yield self.t_ns[i], self.kind[i], self.a[i], self.b[i]
+
+
+# -------------------------------
+# Selection
+# -------------------------------
+BACKENDS: Dict[str, type] = {
+    PynputBackend.name: PynputBackend,
+    XTestBackend.name: XTestBackend,
+    RecordingBackend.name: RecordingBackend,
+}
+
+DEFAULT_BACKEND = "pynput"
+_backend: Optional[InputBackend] = None
+
+
+def select_backend(name: Optional[str] = None) -> InputBackend:
+    """Aktives Backend festlegen (einmal beim Start)."""
+    global _backend
+    name = (name or os.environ.get("BUTTON_MASHER_BACKEND") or DEFAULT_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unbekanntes Eingabe-Backend: {name} (verfügbar: {', '.join(BACKENDS)})")
+    try:
+        backend = BACKENDS[name]()
+    except Exception as e:
+        raise ValueError(f"Eingabe-Backend {name} nicht verfügbar: {e}") from e
+    if _backend is not None:
+        _backend.close()
+    _backend = backend
+    return _backend
+
+
+def get_backend() -> InputBackend:
+    if _backend is None:
+        return select_backend()
+    return _backend
+
@@ -0,0 +1,342 @@
+"""
+Makro-Sprache für das Tasten-Feld (ohne Qt-Abhängigkeit).
+
+    a, b, enter            Tasten nacheinander tippen (wie bisher)
+    ctrl+c                 Kombination: alle drücken, umgekehrt loslassen
+    hold(w, 500)           Taste(n) 500 ms halten (auch hold(shift+a, 200))
+    wait(30)               30 ms warten
+    [a, b]*5, a*3          Wiederholen (1–9999), verschachtelbar
+    '+'  ','               Sonderzeichen in Anführungszeichen
+    a, *, b                ein einzelnes Sonderzeichen zwischen Kommas ist
+                           (wie in alten Tasten-Feldern) die Taste selbst
+    type("Hallo Welt")     Text tippen (Unicode, \n = Enter, \t = Tab, \" \\)
+    type("abc", 20)        … mit 20 ms Abstand pro Zeichen
+
+Nach jedem Tippen/Loslassen folgt wie bisher "Abstand zwischen Tasten",
+nach dem letzten Schritt "Wiederholen nach". Eine reine Komma-Liste ist
+also ein gültiges Programm mit unverändertem Timing.
+
+compile_keys() übersetzt einmal in einen flachen Bytecode (Paare
+Opcode, Argument) plus Konstanten (aufgelöste Keys); der Runner führt ihn
+ohne jedes Parsen aus. Text wird beim Kompilieren in Stücke von TYPE_CHUNK
+Zeichen geteilt, die das Backend jeweils in einem Schwung injiziert.
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Tuple
+
+OP_TAP = 0     # arg = Konstante (Key)             + Tastenabstand
+OP_COMBO = 1   # arg = Konstante (Tuple von Keys)  + Tastenabstand
+OP_DOWN = 2    # arg = Konstante (Tuple von Keys)  ohne Zeit
+OP_UP = 3      # arg = Konstante (Tuple von Keys)  + Tastenabstand
+OP_WAIT = 4    # arg = ns
+OP_LOOP = 5    # arg = Anzahl; Zähler auf den Schleifen-Stack
+OP_NEXT = 6    # arg = pc des Schleifenrumpfs
+OP_TYPE = 7    # arg = Konstante (Text-Stücke, ns pro Zeichen) + Tastenabstand
+
+REPEAT_MAX = 9999
+DURATION_MAX_MS = 3_600_000
+TYPE_CHUNK = 64          # Zeichen pro Scheduler-Schritt (ohne Abstand pro Zeichen)
+TEXT_MAX = 100_000
+_SPECIAL = ",+[]()*'\""
+_ESCAPES = {"n": "\n", "t": "\t", '"': '"', "\\": "\\"}
+
+
+class DslError(ValueError):
+    """Syntaxfehler; pos/end = Zeichenbereich im Text, code + params für die Übersetzung."""
+
+    def __init__(self, code: str, pos: int, end: int, **args):
+        self.code = code
+        self.pos = pos
+        self.end = max(end, pos + 1)
+        self.params = args
+        super().__init__(f"Syntaxfehler bei Zeichen {pos + 1} ({code})")
+
+    def __reduce__(self):
+        return _make_error, (self.code, self.pos, self.end, self.params)
+
+
+def _make_error(code: str, pos: int, end: int, params: dict) -> DslError:
+    return DslError(code, pos, end, **params)
+
+
+@dataclass(frozen=True)
+class KeyProgram:
+    code: Tuple[int, ...]
+    consts: Tuple[object, ...]
+
+    def __bool__(self) -> bool:
+        return bool(self.code)
+
+
+EMPTY_PROGRAM = KeyProgram((), ())
+
+
+# -------------------------------
+# Tokenizer
+# -------------------------------
+def _lone(text: str, i: int) -> bool:
+    # Zeichen steht allein zwischen Kommas bzw. am Rand (Leerzeichen zählen nicht)
+    before = text[:i].rstrip()
+    after = text[i + 1:].lstrip()
+    return (not before or before[-1] == ",") and (not after or after[0] == ",")
+
+
+# Token: (Art, Text, Start, Ende); Art = Sonderzeichen selbst, "word", "text" oder "end"
+def _tokenize(text: str) -> List[tuple]:
+    tokens = []
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch.isspace():
+            i += 1
+        elif ch in _SPECIAL and ch != "," and _lone(text, i) and (
+                ch not in "'\"" or text.find(ch, i + 1) < 0):
+            # altes Tasten-Feld ("a,*,b", "+"): Sonderzeichen als Taste
+            tokens.append(("word", ch, i, i + 1))
+            i += 1
+        elif ch == "'":
+            j = text.find("'", i + 1)
+            if j < 0:
+                raise DslError("expected", n, n, tok="'")
+            if j == i + 1:
+                raise DslError("unexpected", i, j + 1, tok="''")
+            tokens.append(("word", text[i + 1:j], i, j + 1))
+            i = j + 1
+        elif ch == '"':
+            tokens.append(_text_token(text, i))
+            i = tokens[-1][3]
+        elif ch in _SPECIAL:
+            tokens.append((ch, ch, i, i + 1))
+            i += 1
+        else:
+            j = i
+            while j < n and not text[j].isspace() and text[j] not in _SPECIAL:
+                j += 1
+            tokens.append(("word", text[i:j], i, j))
+            i = j
+    tokens.append(("end", "", n, n))
+    return tokens
+
+
+def _text_token(text: str, start: int) -> tuple:
+    # "…" mit \n, \t, \" und \\
+    out = []
+    i, n = start + 1, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '"':
+            if i - start - 1 > TEXT_MAX:
+                raise DslError("text", start, i + 1, max=TEXT_MAX)
+            return ("text", "".join(out), start, i + 1)
+        if ch == "\\":
+            esc = _ESCAPES.get(text[i + 1:i + 2])
+            if esc is None:
+                raise DslError("unexpected", i, i + 2, tok=text[i:i + 2])
+            out.append(esc)
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    raise DslError("expected", n, n, tok='"')
+
+
+# -------------------------------
+# Parser -> Baum
+# -------------------------------
+# Knoten: ("keys", [Namen]) | ("hold", [Namen], ns) | ("wait", ns) | ("type", Text, ns)
+#         | ("seq", [Knoten]) | ("repeat", Knoten, n)
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.i = 0
+
+    def peek(self, k: int = 0) -> tuple:
+        return self.tokens[min(self.i + k, len(self.tokens) - 1)]
+
+    def take(self, kind: str) -> tuple:
+        tok = self.peek()
+        if tok[0] != kind:
+            raise DslError("expected", tok[2], tok[3], tok=kind)
+        self.i += 1
+        return tok
+
+    def program(self) -> tuple:
+        node = self.seq(top=True)
+        tok = self.peek()
+        if tok[0] != "end":
+            raise DslError("unexpected", tok[2], tok[3], tok=tok[1])
+        return node
+
+    def seq(self, top: bool = False) -> tuple:
+        items = []
+        while True:
+            tok = self.peek()
+            # leere Einträge ("a,,b", Komma am Ende) wie bisher ignorieren
+            if tok[0] == ",":
+                self.i += 1
+                continue
+            if tok[0] == "end" or (tok[0] == "]" and not top):
+                return ("seq", items)
+            items.append(self.item())
+            tok = self.peek()
+            if tok[0] not in (",", "end", "]"):
+                raise DslError("expected", tok[2], tok[3], tok=",")
+
+    def item(self) -> tuple:
+        node = self.atom()
+        while self.peek()[0] == "*":
+            self.i += 1
+            tok = self.take("word")
+            node = ("repeat", node, self.number(tok, 1, REPEAT_MAX, "count"))
+        return node
+
+    def atom(self) -> tuple:
+        tok = self.peek()
+        if tok[0] == "[":
+            self.i += 1
+            node = self.seq()
+            self.take("]")
+            return node
+        if tok[0] != "word":
+            raise DslError("unexpected", tok[2], tok[3], tok=tok[1])
+        name = tok[1].lower()
+        if self.peek(1)[0] == "(" and name in ("hold", "wait", "type"):
+            self.i += 2
+            if name == "type":
+                text = self.take("text")[1]
+                ns = 0
+                if self.peek()[0] == ",":
+                    self.i += 1
+                    ns = self.duration()
+                self.take(")")
+                return ("type", text, ns)
+            if name == "wait":
+                ns = self.duration()
+                self.take(")")
+                return ("wait", ns)
+            keys = self.combo()
+            self.take(",")
+            ns = self.duration()
+            self.take(")")
+            return ("hold", keys, ns)
+        return ("keys", self.combo())
+
+    def combo(self) -> List[str]:
+        names = [self.name()]
+        while self.peek()[0] == "+":
+            self.i += 1
+            names.append(self.name())
+        return names
+
+    def name(self) -> str:
+        # "a b" war in alten Tasten-Feldern ein (unbekannter) Name: zusammenfassen statt Fehler
+        parts = [self.take("word")[1]]
+        while self.peek()[0] == "word":
+            parts.append(self.take("word")[1])
+        return " ".join(parts).lower()
+
+    def duration(self) -> int:
+        tok = self.take("word")
+        try:
+            ms = float(tok[1])
+        except ValueError:
+            raise DslError("duration", tok[2], tok[3], max=DURATION_MAX_MS) from None
+        if not 0 <= ms <= DURATION_MAX_MS:
+            raise DslError("duration", tok[2], tok[3], max=DURATION_MAX_MS)
+        return int(round(ms * 1_000_000))
+
+    @staticmethod
+    def number(tok: tuple, lo: int, hi: int, code: str) -> int:
+        if not tok[1].isdigit() or not lo <= int(tok[1]) <= hi:
+            raise DslError(code, tok[2], tok[3], max=hi)
+        return int(tok[1])
+
+
+def parse(text: str) -> tuple:
+    return _Parser(text or "").program()
+
+
+def check(text: str) -> Optional[DslError]:
+    try:
+        parse(text)
+    except DslError as e:
+        return e
+    return None
+
+
+def key_names(text: str) -> List[str]:
+    """Alle Tastennamen eines Programms (Suche); bei Syntaxfehlern leer."""
+    try:
+        root = parse(text)
+    except DslError:
+        return []
+    names = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        kind = node[0]
+        if kind in ("keys", "hold"):
+            names.extend(node[1])
+        elif kind == "seq":
+            stack.extend(node[1])
+        elif kind == "repeat":
+            stack.append(node[1])
+    return names
+
+
+# -------------------------------
+# Compiler
+# -------------------------------
+def compile_keys(text: str, resolve: Callable[[str], object]) -> KeyProgram:
+    """Text -> KeyProgram; DslError bei Syntaxfehlern. Unbekannte Tasten = None (Timing bleibt)."""
+    code: List[int] = []
+    consts: list = []
+    const_ids: dict = {}
+
+    def const(value) -> int:
+        try:
+            cid = const_ids.get(value)
+        except TypeError:
+            # nicht hashbares Backend-Key-Objekt: ohne Zusammenfassen ablegen
+            consts.append(value)
+            return len(consts) - 1
+        if cid is None:
+            cid = const_ids[value] = len(consts)
+            consts.append(value)
+        return cid
+
+    def resolved(names: List[str]) -> tuple:
+        return tuple(k for k in (resolve(n) for n in names) if k is not None)
+
+    def emit(node: tuple):
+        kind = node[0]
+        if kind == "seq":
+            for child in node[1]:
+                emit(child)
+        elif kind == "keys":
+            if len(node[1]) == 1:
+                code.extend((OP_TAP, const(resolve(node[1][0]))))
+            else:
+                code.extend((OP_COMBO, const(resolved(node[1]))))
+        elif kind == "hold":
+            keys = const(resolved(node[1]))
+            code.extend((OP_DOWN, keys, OP_WAIT, node[2], OP_UP, keys))
+        elif kind == "wait":
+            code.extend((OP_WAIT, node[1]))
+        elif kind == "type":
+            text, ns = node[1], node[2]
+            if text:
+                size = 1 if ns else TYPE_CHUNK
+                chunks = tuple(text[i:i + size] for i in range(0, len(text), size))
+                code.extend((OP_TYPE, const((chunks, ns))))
+        elif kind == "repeat":
+            if node[2] == 1:
+                emit(node[1])
+                return
+            code.extend((OP_LOOP, node[2]))
+            body = len(code)
+            emit(node[1])
+            code.extend((OP_NEXT, body))
+
+    emit(parse(text))
+    return KeyProgram(tuple(code), tuple(consts))
@@ -0,0 +1,158 @@
+"""
+Tastennamen ohne Qt-Abhängigkeit.
+
+Kanonische Namen sind die Namen der pynput-Key-Member ("enter", "page_up",
+"media_volume_up", "f24" …) plus Ziffernblock ("num_0" … "num_9",
+"num_add" …). Dazu kommen Aliase ("return", "pgup", "del", "numpad5",
+"volumeup" …) und Unicode:
+
+    a, ä, €        ein Zeichen steht für sich selbst
+    u20ac          Unicode-Codepoint in Hex (wie die X-Keysyms "U20AC")
+
+Jeder kanonische Name hat einen X-Keysym (XTest, pynput unter X11). Die
+Tabellen hier sind reine Daten; die Backends bauen daraus beim ersten
+Bedarf einmal eine fertige Zuordnung Name -> Key-Objekt.
+"""
+import sys
+from typing import Dict, Optional
+
+# Kanonischer Name -> X-Keysym. Reihenfolge = Recording-Codes (-1, -2, …),
+# die alten Sondertasten stehen deshalb vorn.
+X_KEYSYMS: Dict[str, int] = {
+    "enter": 0xFF0D, "space": 0x0020, "tab": 0xFF09,
+    "shift": 0xFFE1, "ctrl": 0xFFE3, "alt": 0xFFE9, "esc": 0xFF1B,
+    "up": 0xFF52, "down": 0xFF54, "left": 0xFF51, "right": 0xFF53,
+    **{f"f{i}": 0xFFBE + i - 1 for i in range(1, 13)},
+    # weitere pynput-Key-Member
+    "shift_l": 0xFFE1, "shift_r": 0xFFE2,
+    "ctrl_l": 0xFFE3, "ctrl_r": 0xFFE4,
+    "alt_l": 0xFFE9, "alt_r": 0xFFEA, "alt_gr": 0xFE03,
+    "cmd": 0xFFEB, "cmd_l": 0xFFEB, "cmd_r": 0xFFEC,
+    "backspace": 0xFF08, "delete": 0xFFFF, "insert": 0xFF63,
+    "home": 0xFF50, "end": 0xFF57, "page_up": 0xFF55, "page_down": 0xFF56,
+    "caps_lock": 0xFFE5, "num_lock": 0xFF7F, "scroll_lock": 0xFF14,
+    "print_screen": 0xFF61, "pause": 0xFF13, "menu": 0xFF67,
+    "media_play_pause": 0x1008FF14, "media_volume_mute": 0x1008FF12,
+    "media_volume_down": 0x1008FF11, "media_volume_up": 0x1008FF13,
+    "media_previous": 0x1008FF16, "media_next": 0x1008FF17,
+    **{f"f{i}": 0xFFBE + i - 1 for i in range(13, 25)},
+    # Ziffernblock (keine pynput-Key-Member)
+    **{f"num_{i}": 0xFFB0 + i for i in range(10)},
+    "num_add": 0xFFAB, "num_subtract": 0xFFAD, "num_multiply": 0xFFAA,
+    "num_divide": 0xFFAF, "num_decimal": 0xFFAE, "num_enter": 0xFF8D,
+}
+
+_NUMPAD_OPS = {
+    "add": "num_add", "plus": "num_add",
+    "subtract": "num_subtract", "minus": "num_subtract", "sub": "num_subtract",
+    "multiply": "num_multiply", "mul": "num_multiply", "star": "num_multiply",
+    "divide": "num_divide", "div": "num_divide", "slash": "num_divide",
+    "decimal": "num_decimal", "dot": "num_decimal", "period": "num_decimal",
+    "enter": "num_enter",
+    **{str(i): f"num_{i}" for i in range(10)},
+}
+
+ALIASES: Dict[str, str] = {
+    "return": "enter", "escape": "esc", "spacebar": "space",
+    "control": "ctrl", "strg": "ctrl", "option": "alt", "altgr": "alt_gr",
+    "win": "cmd", "windows": "cmd", "super": "cmd", "meta": "cmd", "command": "cmd",
+    "pgup": "page_up", "pageup": "page_up", "prior": "page_up",
+    "pgdn": "page_down", "pagedown": "page_down", "next": "page_down",
+    "del": "delete", "ins": "insert", "bksp": "backspace", "back": "backspace",
+    "caps": "caps_lock", "capslock": "caps_lock", "numlock": "num_lock",
+    "scrolllock": "scroll_lock", "print": "print_screen", "printscreen": "print_screen",
+    "prtsc": "print_screen", "prtscr": "print_screen", "break": "pause",
+    "apps": "menu", "context_menu": "menu",
+    "arrowup": "up", "arrowdown": "down", "arrowleft": "left", "arrowright": "right",
+    "volumeup": "media_volume_up", "volume_up": "media_volume_up",
+    "volumedown": "media_volume_down", "volume_down": "media_volume_down",
+    "mute": "media_volume_mute", "volume_mute": "media_volume_mute",
+    "play": "media_play_pause", "playpause": "media_play_pause", "play_pause": "media_play_pause",
+    "next_track": "media_next", "media_next_track": "media_next",
+    "prev_track": "media_previous", "previous_track": "media_previous", "media_prev": "media_previous",
+    **{f"{prefix}{op}": name
+       for prefix in ("numpad", "numpad_", "kp", "kp_", "num", "num_")
+       for op, name in _NUMPAD_OPS.items()},
+}
+
+# Plattform-Keycodes für Namen ohne pynput-Key-Member (KeyCode.from_vk)
+_WIN_VK: Dict[str, int] = {
+    **{f"num_{i}": 0x60 + i for i in range(10)},
+    "num_multiply": 0x6A, "num_add": 0x6B, "num_subtract": 0x6D,
+    "num_decimal": 0x6E, "num_divide": 0x6F,
+    **{f"f{i}": 0x70 + i - 1 for i in range(13, 25)},
+}
+_MAC_VK: Dict[str, int] = {
+    **{f"num_{i}": code for i, code in enumerate((0x52, 0x53, 0x54, 0x55, 0x56, 0x57, 0x58, 0x59, 0x5B, 0x5C))},
+    "num_decimal": 0x41, "num_multiply": 0x43, "num_add": 0x45,
+    "num_divide": 0x4B, "num_enter": 0x4C, "num_subtract": 0x4E,
+}
+
+
+def _unicode_name(k: str) -> Optional[str]:
+    # "u20ac" -> "€"
+    if len(k) < 5 or k[0] != "u":
+        return None
+    try:
+        cp = int(k[1:], 16)
+    except ValueError:
+        return None
+    if len(k) > 7 or not 0x20 <= cp <= 0x10FFFF or 0xD800 <= cp <= 0xDFFF:
+        return None
+    return chr(cp)
+
+
+def canonical_name(key_text: str) -> Optional[str]:
+    """
+    Tastenname -> kanonischer Name bzw. einzelnes Zeichen; None = unbekannt.
+    Nur beim Kompilieren aufgerufen, nie pro Tastendruck.
+    """
+    k = (key_text or "").strip().lower()
+    if not k:
+        return None
+    if k in X_KEYSYMS:
+        return k
+    name = ALIASES.get(k)
+    if name is not None:
+        return name
+    if len(k) == 1:
+        return k
+    return _unicode_name(k)
+
+
+def char_keysym(ch: str) -> int:
+    # Latin-1 entspricht den Keysyms, sonst Unicode-Keysym
+    cp = ord(ch)
+    return cp if cp < 0x100 else 0x01000000 + cp
+
+
+# -------------------------------
+# pynput
+# -------------------------------
+_PYNPUT_KEYS: Optional[dict] = None
+
+
+def pynput_keys() -> dict:
+    """
+    Alle kanonischen Namen und Aliase -> pynput-Key/KeyCode (einmal gebaut,
+    pynput erst beim ersten Bedarf importiert). Namen, die es auf dieser
+    Plattform nicht gibt, fehlen.
+    """
+    global _PYNPUT_KEYS
+    if _PYNPUT_KEYS is None:
+        from pynput.keyboard import Key, KeyCode
+        keys = {name: member for name, member in Key.__members__.items()}
+        if sys.platform.startswith("win"):
+            vk = _WIN_VK
+        elif sys.platform == "darwin":
+            vk = _MAC_VK
+        else:
+            vk = X_KEYSYMS      # unter X11 ist vk der Keysym
+        for name in X_KEYSYMS:
+            if name not in keys and name in vk:
+                keys[name] = KeyCode.from_vk(vk[name])
+        for alias, name in ALIASES.items():
+            if name in keys:
+                keys.setdefault(alias, keys[name])
+        _PYNPUT_KEYS = keys
+    return _PYNPUT_KEYS
@@ -0,0 +1,210 @@
+"""
+Profil-Bibliothek ohne Qt-Abhängigkeit.
+
+Alle Profile der Datei liegen hier als Daten; nur geöffnete Profile haben
+einen Tab. Für die Suche hält die Bibliothek pro Profil einen kleinen Index
+(Name in Kleinbuchstaben, Tasten aller Sets, Tags) und einen invertierten
+Index Token -> Profile.
+
+Suchsyntax (Begriffe mit Leerzeichen getrennt, alle müssen passen):
+    text        unscharf im Namen (Zeichen in dieser Reihenfolge)
+    #tag        Profil hat diesen Tag
+    key:f       ein Set des Profils drückt diese Taste
+"""
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from keydsl import key_names
+from keymap import canonical_name
+
+
+@dataclass
+class ProfileEntry:
+    uid: int
+    name: str
+    data: Optional[dict]          # None = noch nicht geladen (SQLite-Speicher)
+    tags: Tuple[str, ...] = ()
+    open: bool = False
+    store_id: Optional[int] = None  # Zeilen-ID im SQLite-Speicher
+    # Suchindex, siehe ProfileLibrary._index
+    name_lc: str = ""
+    keys: frozenset = field(default_factory=frozenset)
+
+    def to_dict(self, with_id: bool = False) -> dict:
+        d = {"name": self.name, "data": self.data, "open": self.open}
+        if self.tags:
+            d["tags"] = list(self.tags)
+        if with_id:
+            d["id"] = self.store_id
+        return d
+
+
+def profile_keys(data: dict) -> frozenset:
+    keys = set()
+    sets = data.get("sets", []) if isinstance(data, dict) else []
+    for s in sets if isinstance(sets, list) else []:
+        if isinstance(s, dict):
+            keys.update(canonical_name(k) or k for k in key_names(str(s.get("keys", ""))))
+    return frozenset(keys)
+
+
+def last_active_name(cfg: dict) -> Optional[str]:
+    """
+    Name des zuletzt aktiven Profils. Neue Dateien speichern den Namen,
+    ältere den Index in "profiles" (damals hatte jedes Profil einen Tab).
+    """
+    last = cfg.get("last_active_profile") if isinstance(cfg, dict) else None
+    if isinstance(last, str):
+        return last
+    profiles = cfg.get("profiles") if isinstance(cfg, dict) else None
+    if isinstance(last, int) and not isinstance(last, bool) and isinstance(profiles, list) \
+            and 0 <= last < len(profiles) and isinstance(profiles[last], dict):
+        return profiles[last].get("name")
+    return None
+
+
+def fuzzy_score(query: str, text: str) -> Optional[int]:
+    """Kleiner = besser; None = Zeichen kommen nicht in dieser Reihenfolge vor."""
+    if not query:
+        return 0
+    if text.startswith(query):
+        return 0
+    pos = text.find(query)
+    if pos >= 0:
+        return 1 + pos
+    # Teilfolge: Lücken zwischen den Treffern bestrafen
+    score = 100
+    i = -1
+    for ch in query:
+        j = text.find(ch, i + 1)
+        if j < 0:
+            return None
+        score += j - i - 1
+        i = j
+    return score
+
+
+class ProfileLibrary:
+    def __init__(self):
+        self._uids = itertools.count(1)
+        self.entries: Dict[int, ProfileEntry] = {}   # in Einfügereihenfolge
+        self._names: Dict[str, int] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        # lädt die Daten eines Eintrags mit data=None nach
+        self.loader: Optional[Callable[[ProfileEntry], dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(list(self.entries.values()))
+
+    def clear(self):
+        self.entries.clear()
+        self._names.clear()
+        self._by_token.clear()
+
+    # Index
+    def _tokens(self, e: ProfileEntry) -> Iterable[str]:
+        yield from (f"key:{k}" for k in e.keys)
+        yield from (f"#{t}" for t in e.tags)
+
+    def _index(self, e: ProfileEntry):
+        e.name_lc = e.name.lower()
+        if e.data is not None:
+            e.keys = profile_keys(e.data)
+        self._names[e.name] = e.uid
+        for tok in self._tokens(e):
+            self._by_token.setdefault(tok, set()).add(e.uid)
+
+    def _unindex(self, e: ProfileEntry):
+        if self._names.get(e.name) == e.uid:
+            del self._names[e.name]
+        for tok in self._tokens(e):
+            uids = self._by_token.get(tok)
+            if uids is not None:
+                uids.discard(e.uid)
+                if not uids:
+                    del self._by_token[tok]
+
+    # Mutations
+    def add(self, name: str, data: Optional[dict] = None, tags: Iterable[str] = (), open: bool = False,
+            keys: Optional[Iterable[str]] = None, store_id: Optional[int] = None) -> ProfileEntry:
+        """keys: Tasten aus den Metadaten, wenn data noch nicht geladen ist (data=None)."""
+        if keys is not None:
+            data = data if isinstance(data, dict) else None
+        else:
+            data = data if isinstance(data, dict) else {}
+        e = ProfileEntry(
+            uid=next(self._uids), name=name, data=data,
+            tags=tuple(str(t).strip().lower() for t in tags if str(t).strip()),
+            open=open, store_id=store_id,
+            keys=frozenset(str(k).lower() for k in (keys or ())),
+        )
+        self.entries[e.uid] = e
+        self._index(e)
+        return e
+
+    def remove(self, uid: int):
+        e = self.entries.pop(uid, None)
+        if e is not None:
+            self._unindex(e)
+
+    def update(self, uid: int, name: Optional[str] = None, data: Optional[dict] = None,
+               tags: Optional[Iterable[str]] = None):
+        e = self.entries.get(uid)
+        if e is None:
+            return
+        self._unindex(e)
+        if name is not None:
+            e.name = name
+        if data is not None:
+            e.data = data
+        if tags is not None:
+            e.tags = tuple(str(t).strip().lower() for t in tags if str(t).strip())
+        self._index(e)
+
+    def ensure_data(self, e: ProfileEntry) -> dict:
+        if e.data is None:
+            e.data = self.loader(e) if self.loader is not None else {}
+        return e.data
+
+    # Lookup
+    def get(self, uid: int) -> Optional[ProfileEntry]:
+        return self.entries.get(uid)
+
+    def by_name(self, name: str) -> Optional[ProfileEntry]:
+        uid = self._names.get(name)
+        return self.entries.get(uid) if uid is not None else None
+
+    def unique_name(self, prefix: str) -> str:
+        # kleinste freie Nummer; Set-Lookups statt Tab-Texte durchzugehen
+        n = 1
+        while f"{prefix} {n}" in self._names:
+            n += 1
+        return f"{prefix} {n}"
+
+    def search(self, query: str, limit: int = 200) -> List[ProfileEntry]:
+        terms = query.lower().split()
+        # key:pgup findet auch "page_up"
+        terms = [f"key:{canonical_name(t[4:]) or t[4:]}" if t.startswith("key:") and t[4:] else t for t in terms]
+        token_terms = [t for t in terms if t.startswith("#") or t.startswith("key:")]
+        text = " ".join(t for t in terms if t not in token_terms)
+
+        # exakte Tokens über den invertierten Index schneiden
+        candidates: Optional[Set[int]] = None
+        for t in token_terms:
+            uids = self._by_token.get(t, set())
+            candidates = set(uids) if candidates is None else candidates & uids
+            if not candidates:
+                return []
+
+        pool = (self.entries[u] for u in candidates) if candidates is not None else self.entries.values()
+        scored = []
+        for e in pool:
+            score = fuzzy_score(text, e.name_lc)
+            if score is not None:
+                scored.append((score, e.uid, e))
+        scored.sort(key=lambda x: (x[0], x[1]))
+        return [e for _, _, e in scored[:limit]]
@@ -0,0 +1,238 @@
+"""
+Makro-Aufnahme ohne Qt-Abhängigkeit.
+
+Eine Aufnahme ist ein MacroTrack: parallele array-Spalten statt eines
+Python-Objekts pro Ereignis (Zeit in ns seit Aufnahmebeginn, Art, zwei
+Ganzzahl-Argumente). Tasten und Maustasten stehen als Index in einer
+kleinen Namenstabelle.
+
+    KEY_DOWN/KEY_UP    a = Name-Index
+    MOVE               a = x, b = y
+    BTN_DOWN/BTN_UP    a = x, b = y, Maustaste als Name-Index in der Art-Spalte
+                       (kind = BTN_DOWN/BTN_UP | name << 3)
+
+Gespeichert wird ein Track als Binär-Blob (to_bytes), im Set-Dict als
+Base64-Text unter "macro":
+    Magic "BMM1", dann zlib(Header <III> = Anzahl, Namen-Bytes, Zeit-Einheit
+    + Namen (UTF-8, '\\n'-getrennt) + dt (uint32, µs seit dem vorigen
+    Ereignis) + kind (uint16) + a (int32) + b (int32)), little endian.
+"""
+import base64
+import bisect
+import functools
+import struct
+import sys
+import time
+import zlib
+from array import array
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+KEY_DOWN = 0
+KEY_UP = 1
+MOVE = 2
+BTN_DOWN = 3
+BTN_UP = 4
+KIND_MASK = 0x7
+
+MAGIC = b"BMM1"
+_HEADER = struct.Struct("<III")
+_TIME_UNIT_NS = 1_000
+_DT_MAX = 0xFFFF_FFFF
+
+
+def _le(arr: array) -> array:
+    # Blob ist immer little endian
+    if sys.byteorder == "big":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    return arr
+
+
+class MacroTrack:
+    """Aufgenommene Ereignisse als Struct-of-Arrays (wenige Bytes pro Ereignis)."""
+
+    def __init__(self):
+        self.t_ns = array("q")
+        self.kind = array("H")
+        self.a = array("i")
+        self.b = array("i")
+        self.names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.t_ns)
+
+    def name_id(self, name: str) -> int:
+        nid = self._name_ids.get(name)
+        if nid is None:
+            nid = self._name_ids[name] = len(self.names)
+            self.names.append(name)
+        return nid
+
+    def append(self, t_ns: int, kind: int, a: int = 0, b: int = 0):
+        self.t_ns.append(t_ns)
+        self.kind.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+
+    def event(self, i: int) -> Tuple[int, int, str, int, int]:
+        """(t_ns, Art, Name, a, b) – Name für Tasten und Maustasten, sonst ""."""
+        k = self.kind[i]
+        kind = k & KIND_MASK
+        if kind in (KEY_DOWN, KEY_UP):
+            return self.t_ns[i], kind, self.names[self.a[i]], 0, 0
+        if kind in (BTN_DOWN, BTN_UP):
+            return self.t_ns[i], kind, self.names[k >> 3], self.a[i], self.b[i]
+        return self.t_ns[i], kind, "", self.a[i], self.b[i]
+
+    def duration_ns(self) -> int:
+        return self.t_ns[-1] if self.t_ns else 0
+
+    def index_at(self, t_ns: int) -> int:
+        """Erstes Ereignis mit Zeit >= t_ns (binäre Suche, ohne Kopie)."""
+        return bisect.bisect_left(self.t_ns, t_ns)
+
+    def truncate(self, n: int):
+        del self.t_ns[n:], self.kind[n:], self.a[n:], self.b[n:]
+
+    # Serialization
+    def to_bytes(self) -> bytes:
+        # absolute Zeiten quantisieren, nicht die Abstände: sonst summiert
+        # sich der Rundungsrest jedes Ereignisses zu Drift auf
+        dt = array("I")
+        prev_q = 0
+        for t in self.t_ns:
+            d = min(_DT_MAX, max(0, t // _TIME_UNIT_NS - prev_q))
+            dt.append(d)
+            prev_q += d
+        names = "\n".join(self.names).encode("utf-8")
+        body = b"".join((
+            _HEADER.pack(len(self), len(names), _TIME_UNIT_NS), names,
+            _le(dt).tobytes(), _le(self.kind).tobytes(), _le(self.a).tobytes(), _le(self.b).tobytes(),
+        ))
+        return MAGIC + zlib.compress(body, 6)
+
+    @classmethod
+    def from_bytes(cls, blob: bytes) -> "MacroTrack":
+        if blob[:4] != MAGIC:
+            raise ValueError("kein Makro (Magic)")
+        body = zlib.decompress(blob[4:])
+        n, names_len, unit = _HEADER.unpack_from(body)
+        pos = _HEADER.size
+        track = cls()
+        if names_len:
+            for name in body[pos:pos + names_len].decode("utf-8").split("\n"):
+                track.name_id(name)
+        pos += names_len
+
+        def column(typecode: str) -> array:
+            nonlocal pos
+            col = array(typecode)
+            size = n * col.itemsize
+            if len(body) < pos + size:
+                raise ValueError("Makro abgeschnitten")
+            col.frombytes(body[pos:pos + size])
+            pos += size
+            return _le(col)
+
+        dt = column("I")
+        track.kind = column("H")
+        track.a = column("i")
+        track.b = column("i")
+        t = 0
+        for d in dt:
+            t += d * unit
+            track.t_ns.append(t)
+        return track
+
+    def to_text(self) -> str:
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    @classmethod
+    def from_text(cls, text: str) -> "MacroTrack":
+        return cls.from_bytes(base64.b64decode(text.encode("ascii"), validate=True))
+
+
+@functools.lru_cache(maxsize=16)
+def _cached_track(text: str) -> Optional[MacroTrack]:
+    try:
+        return MacroTrack.from_text(text)
+    except (ValueError, zlib.error, struct.error, UnicodeDecodeError):
+        return None
+
+
+def load_track(data: dict) -> Optional[MacroTrack]:
+    """
+    Makro eines Set-Dicts; None, wenn keins da oder es unlesbar ist.
+    Gleicher Text -> dasselbe (nicht zu verändernde) Track-Objekt: Pläne
+    werden bei jeder Änderung neu kompiliert, dekodiert wird nur einmal.
+    """
+    text = data.get("macro") if isinstance(data, dict) else None
+    if not isinstance(text, str) or not text:
+        return None
+    return _cached_track(text)
+
+
+class MacroRecorder:
+    """
+    Nimmt Ereignisse der pynput-Listener auf (Aufrufe aus deren Threads).
+    Loslassen ohne aufgenommenes Drücken wird verworfen: so landet weder das
+    Loslassen des Klicks auf „Aufnehmen“ noch eine vorher gehaltene Taste
+    im Makro.
+    """
+
+    def __init__(self):
+        self.track = MacroTrack()
+        self._lock = Lock()
+        self._t0 = time.perf_counter_ns()
+        self._keys_down = set()
+        self._buttons_down = set()
+
+    def _now(self) -> int:
+        return time.perf_counter_ns() - self._t0
+
+    def key_down(self, name: str):
+        t = self._now()
+        with self._lock:
+            self._keys_down.add(name)
+            self.track.append(t, KEY_DOWN, self.track.name_id(name))
+
+    def key_up(self, name: str):
+        t = self._now()
+        with self._lock:
+            if name not in self._keys_down:
+                return
+            self._keys_down.discard(name)
+            self.track.append(t, KEY_UP, self.track.name_id(name))
+
+    def move(self, x: int, y: int):
+        t = self._now()
+        with self._lock:
+            self.track.append(t, MOVE, int(x), int(y))
+
+    def button(self, name: str, x: int, y: int, pressed: bool):
+        t = self._now()
+        with self._lock:
+            if pressed:
+                self._buttons_down.add(name)
+            elif name in self._buttons_down:
+                self._buttons_down.discard(name)
+            else:
+                return
+            kind = (BTN_DOWN if pressed else BTN_UP) | (self.track.name_id(name) << 3)
+            self.track.append(t, kind, int(x), int(y))
+
+    def stop(self, drop_last_click: bool = True) -> MacroTrack:
+        """
+        Aufnahme beenden. drop_last_click entfernt den abschließenden Klick
+        (Klick auf „Stopp“) samt der Bewegungen danach.
+        """
+        with self._lock:
+            track = self.track
+            if drop_last_click:
+                for i in range(len(track) - 1, -1, -1):
+                    if track.kind[i] & KIND_MASK == BTN_DOWN:
+                        track.truncate(i)
+                        break
+            return track
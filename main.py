@@ -7,15 +7,25 @@ import sys
 if sys.platform.startswith("linux") and os.environ.get("WAYLAND_DISPLAY"):
     os.environ.setdefault("QT_QPA_PLATFORM", "xcb")
 
+# ===============================
+# HEADLESS: python main.py run ...
+# (vor allen Qt-Imports abzweigen)
+# ===============================
+if __name__ == "__main__":
+    # Runner-Kindprozess in gebündelten Builds (PyInstaller)
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+if __name__ == "__main__" and len(sys.argv) > 1 and sys.argv[1] == "run":
+    from headless import main as headless_main
+    sys.exit(headless_main(sys.argv[2:]))
+
 import time
-import json
-from dataclasses import dataclass
 from pathlib import Path
-from threading import Thread
 from typing import Optional, List, Tuple
 from PyQt6.QtGui import QPainter, QColor
 
-from PyQt6.QtCore import (Qt, QSize, QTimer, QPoint, pyqtSignal, QPropertyAnimation, QEasingCurve)
+from PyQt6.QtCore import (Qt, QSize, QTimer, QPoint, QThread, pyqtSignal, QPropertyAnimation, QEasingCurve)
 
 try:
     from PyQt6.QtCore import pyqtProperty
@@ -27,14 +37,28 @@ except ImportError:
 from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QLineEdit, QSpinBox, QCheckBox, QTabWidget, QMessageBox,
-    QInputDialog, QFileDialog, QFrame, QDialog, QDialogButtonBox, QSlider
+    QLineEdit, QSpinBox, QDoubleSpinBox, QCheckBox, QTabWidget, QMessageBox,
+    QInputDialog, QFileDialog, QFrame, QDialog, QDialogButtonBox, QSlider,
+    QListWidget, QListWidgetItem
 )
 
 from pynput import keyboard as pynput_keyboard
 from pynput import mouse as pynput_mouse
-from pynput.keyboard import Controller as KeyController, Key
-from pynput.mouse import Controller as MouseController, Button
+from pynput.mouse import Button
+
+from engine import (
+    clamp_int, clamp_float, compile_set, ClickPosition, SetPlan,
+    read_us, Engine,
+    US_MAX, INNER_MIN_US, CLICK_MIN_US, DEFAULT_SPIN_US, SPIN_MAX_US,
+    MACRO_SPEED_MIN, MACRO_SPEED_MAX,
+)
+from inputs import get_backend, select_backend, key_token, button_token, INJECTED, CLICK_TOKEN, MOVE_TOKEN
+from remote import RemoteEngine, RemoteRunner
+from storage import AutoSaver, load_config
+from library import ProfileLibrary, last_active_name
+from keydsl import check as check_keys
+from sqlstore import SqliteStore, is_db_path
+from macro import MacroRecorder, MacroTrack, load_track
 
 
 # ===============================
@@ -47,14 +71,17 @@ if sys.platform.startswith("win"):
     except Exception:
         pass
 
-# -------------------------------
-# Global controllers (Simulation)
-# -------------------------------
-kb = KeyController()
-ms = MouseController()
+# Windows: Flag für synthetische Events in KBDLLHOOKSTRUCT / MSLLHOOKSTRUCT
+LLKHF_INJECTED = 0x10
+LLMHF_INJECTED = 0x01
 
 SETTINGS_PATH = Path(__file__).with_name("button_masher_profiles.json")
+# existiert diese Datei, wird sie statt der JSON-Datei benutzt (siehe sqlstore.py)
+SETTINGS_DB_PATH = SETTINGS_PATH.with_suffix(".db")
 DEFAULT_WINDOW_SIZE = QSize(400, 400)
+STATS_REFRESH_MS = 500
+AUTOSAVE_DEBOUNCE_MS = 1500
+PLAN_DEBOUNCE_MS = 150     # Tippen/Spinboxen: geänderte Sets gesammelt neu kompilieren
 
 
 # -------------------------------
@@ -145,8 +172,55 @@ def _tr_table():
             "load_file_title": "Profil-Datei laden",
             "save_file_title": "Profile speichern unter…",
 
-            "files_json": "JSON-Dateien (*.json);;Alle Dateien (*)",
-            "files_all_or_json": "Alle Dateien (*);;JSON-Dateien (*.json)",
+            "files_json": "JSON-Dateien (*.json);;SQLite-Datenbank (*.db *.sqlite);;Alle Dateien (*)",
+            "files_all_or_json": "Alle Dateien (*);;JSON-Dateien (*.json);;SQLite-Datenbank (*.db *.sqlite)",
+
+            "timing": "Timing",
+            "spin_window": "Spin-Fenster vor Deadline (µs):",
+            "spin_hint": "Höher = genauer, aber mehr CPU-Last",
+
+            "stats_line": "{eps} Ev/s · p99 Verspätung {p99} µs · verpasst {missed}",
+            "stats_idle": "Statistik: –",
+
+            "engine_line": "{running} aktiv · {eps} Ev/s gesamt",
+
+            "process_runner": "Runner in eigenem Prozess",
+            "process_hint": "Tastendrücke laufen unabhängig von der Oberfläche weiter",
+            "process_error": "Runner-Prozess konnte nicht gestartet werden:\n{err}",
+
+            "control_line": " · Hotkey p99 {us} µs",
+
+            "library": "Bibliothek",
+            "library_title": "Profil-Bibliothek",
+            "library_search_hint": "Suchen … (#tag, key:f5)",
+            "library_open": "Öffnen",
+            "library_open_marker": "offen",
+            "library_tags": "Tags …",
+            "library_tags_prompt": "Tags (mit Komma getrennt):",
+            "library_count": "{shown} von {total} Profilen",
+
+            "macro_record": "⏺ Makro aufnehmen",
+            "macro_stop_record": "⏹ Aufnahme beenden",
+            "macro_clear": "Makro löschen",
+            "macro_none": "Kein Makro",
+            "macro_info": "Makro: {n} Ereignisse, {sec} s, {kb} KB",
+            "macro_recording": "Aufnahme läuft … ({hotkey} oder Klick auf Beenden)",
+
+            "macro_speed": "Tempo",
+            "macro_loop": "Schleife",
+            "macro_start": "Start bei",
+            "macro_seek": "Springen",
+
+            "dsl_key": "Taste",
+            "dsl_expected": "„{tok}“ erwartet",
+            "dsl_unexpected": "„{tok}“ unerwartet",
+            "dsl_count": "Anzahl 1–{max} erwartet",
+            "dsl_duration": "Dauer 0–{max} ms erwartet",
+            "keys_error_at": "Zeichen {pos}: {msg}",
+            "keys_syntax_error": "Das Tasten-Feld eines Sets enthält einen Syntaxfehler.",
+
+            "dsl_text": "Text höchstens {max} Zeichen",
+            "dsl_string": "Text in \"…\"",
 
             "set_prefix": "Set",
             "profile_prefix": "Profil",
@@ -162,12 +236,18 @@ def _tr_table():
                 "<b>Mögliche Tasten:</b><br><br>"
                 "<b>• Buchstaben:</b><br> &nbsp;&nbsp;   a–z oder A-Z<br>"
                 "<b>• Zahlen:</b><br> &nbsp;&nbsp;   0–9<br>"
-                "<b>• Funktionstasten:</b><br> &nbsp;&nbsp;   f1–f12<br>"
+                "<b>• Funktionstasten:</b><br> &nbsp;&nbsp;   f1–f24<br>"
                 "<b>• Sondertasten:</b><br>"
                 "&nbsp;&nbsp;   Eingabetaste (enter), Leertaste (space), Tabulator (tab), Escape (esc)<br>"
                 "&nbsp;&nbsp;   Umschalt (shift), Steuerung (ctrl), Alt (alt)<br>"
-                "&nbsp;&nbsp;   Pfeil hoch (up), runter (down), links (left), rechts (right)<br><br>"
-                "<i>Mehrere Tasten mit Komma trennen. Keine Ganzen Wörter.</i>"
+                "&nbsp;&nbsp;   Pfeil hoch (up), runter (down), links (left), rechts (right)<br>"
+                "&nbsp;&nbsp;   home, end, page_up, page_down, insert, delete, backspace, menu<br>"
+                "&nbsp;&nbsp;   num_0–num_9, num_add, num_enter, media_play_pause, media_volume_up, u20ac (€)<br><br>"
+                "<i>Mehrere Tasten mit Komma trennen. Keine Ganzen Wörter.</i><br><br>"
+                "<b>• Makros:</b><br>"
+                "&nbsp;&nbsp;   ctrl+c (Kombination), hold(w, 500) (500 ms halten), wait(30) (30 ms warten)<br>"
+                "&nbsp;&nbsp;   [a, b]*5 (wiederholen), '+' und ',' in Anführungszeichen<br>"
+                "&nbsp;&nbsp;   type(\"Hallo\") (Text tippen), type(\"Hallo\", 20) (20 ms pro Zeichen)"
             ),
         },
 
@@ -245,8 +325,55 @@ def _tr_table():
             "load_file_title": "Load profile file",
             "save_file_title": "Save profiles as…",
 
-            "files_json": "JSON files (*.json);;All files (*)",
-            "files_all_or_json": "All files (*);;JSON files (*.json)",
+            "files_json": "JSON files (*.json);;SQLite database (*.db *.sqlite);;All files (*)",
+            "files_all_or_json": "All files (*);;JSON files (*.json);;SQLite database (*.db *.sqlite)",
+
+            "timing": "Timing",
+            "spin_window": "Spin window before deadline (µs):",
+            "spin_hint": "Higher = more precise, but more CPU load",
+
+            "stats_line": "{eps} ev/s · p99 lateness {p99} µs · missed {missed}",
+            "stats_idle": "Stats: –",
+
+            "engine_line": "{running} running · {eps} ev/s total",
+
+            "process_runner": "Runner in separate process",
+            "process_hint": "Key presses keep running independently of the UI",
+            "process_error": "Could not start runner process:\n{err}",
+
+            "control_line": " · hotkey p99 {us} µs",
+
+            "library": "Library",
+            "library_title": "Profile library",
+            "library_search_hint": "Search … (#tag, key:f5)",
+            "library_open": "Open",
+            "library_open_marker": "open",
+            "library_tags": "Tags …",
+            "library_tags_prompt": "Tags (comma separated):",
+            "library_count": "{shown} of {total} profiles",
+
+            "macro_record": "⏺ Record macro",
+            "macro_stop_record": "⏹ Stop recording",
+            "macro_clear": "Clear macro",
+            "macro_none": "No macro",
+            "macro_info": "Macro: {n} events, {sec} s, {kb} KB",
+            "macro_recording": "Recording … ({hotkey} or click Stop)",
+
+            "macro_speed": "Speed",
+            "macro_loop": "Loop",
+            "macro_start": "Start at",
+            "macro_seek": "Jump",
+
+            "dsl_key": "key",
+            "dsl_expected": "expected \"{tok}\"",
+            "dsl_unexpected": "unexpected \"{tok}\"",
+            "dsl_count": "expected a count of 1–{max}",
+            "dsl_duration": "expected a duration of 0–{max} ms",
+            "keys_error_at": "Character {pos}: {msg}",
+            "keys_syntax_error": "The keys field of a set contains a syntax error.",
+
+            "dsl_text": "text of at most {max} characters",
+            "dsl_string": "text in \"…\"",
 
             "set_prefix": "Set",
             "profile_prefix": "Profile",
@@ -256,12 +383,18 @@ def _tr_table():
                 "<b>Possible keys:</b><br><br>"
                 "<b>• Letters:</b><br> &nbsp;&nbsp;   a–z or A–Z<br>"
                 "<b>• Numbers:</b><br> &nbsp;&nbsp;   0–9<br>"
-                "<b>• Function keys:</b><br> &nbsp;&nbsp;   f1–f12<br>"
+                "<b>• Function keys:</b><br> &nbsp;&nbsp;   f1–f24<br>"
                 "<b>• Special keys:</b><br>"
                 "&nbsp;&nbsp;   Enter key (enter), Space bar (space), Tab (tab), Escape (esc)<br>"
                 "&nbsp;&nbsp;   Shift (shift), Control (ctrl), Alt (alt)<br>"
-                "&nbsp;&nbsp;   Arrow up (up), down (down), left (left), right (right)<br><br>"
-                "<i>Separate multiple keys with commas. No whole words.</i>"
+                "&nbsp;&nbsp;   Arrow up (up), down (down), left (left), right (right)<br>"
+                "&nbsp;&nbsp;   home, end, page_up, page_down, insert, delete, backspace, menu<br>"
+                "&nbsp;&nbsp;   num_0–num_9, num_add, num_enter, media_play_pause, media_volume_up, u20ac (€)<br><br>"
+                "<i>Separate multiple keys with commas. No whole words.</i><br><br>"
+                "<b>• Macros:</b><br>"
+                "&nbsp;&nbsp;   ctrl+c (combination), hold(w, 500) (hold 500 ms), wait(30) (wait 30 ms)<br>"
+                "&nbsp;&nbsp;   [a, b]*5 (repeat), '+' and ',' in quotes<br>"
+                "&nbsp;&nbsp;   type(\"Hello\") (type text), type(\"Hello\", 20) (20 ms per character)"
             ),
         },
 
@@ -340,8 +473,55 @@ def _tr_table():
             "load_file_title": "Profil dosyası yükle",
             "save_file_title": "Profilleri farklı kaydet…",
 
-            "files_json": "JSON dosyaları (*.json);;Tüm dosyalar (*)",
-            "files_all_or_json": "Tüm dosyalar (*);;JSON dosyaları (*.json)",
+            "files_json": "JSON dosyaları (*.json);;SQLite veritabanı (*.db *.sqlite);;Tüm dosyalar (*)",
+            "files_all_or_json": "Tüm dosyalar (*);;JSON dosyaları (*.json);;SQLite veritabanı (*.db *.sqlite)",
+
+            "timing": "Zamanlama",
+            "spin_window": "Son tarihten önce bekleme penceresi (µs):",
+            "spin_hint": "Yüksek = daha hassas, ama daha fazla CPU yükü",
+
+            "stats_line": "{eps} olay/sn · p99 gecikme {p99} µs · kaçırılan {missed}",
+            "stats_idle": "İstatistik: –",
+
+            "engine_line": "{running} çalışıyor · toplam {eps} olay/sn",
+
+            "process_runner": "Çalıştırıcı ayrı süreçte",
+            "process_hint": "Tuş basımları arayüzden bağımsız çalışır",
+            "process_error": "Çalıştırıcı süreci başlatılamadı:\n{err}",
+
+            "control_line": " · kısayol p99 {us} µs",
+
+            "library": "Kütüphane",
+            "library_title": "Profil kütüphanesi",
+            "library_search_hint": "Ara … (#etiket, key:f5)",
+            "library_open": "Aç",
+            "library_open_marker": "açık",
+            "library_tags": "Etiketler …",
+            "library_tags_prompt": "Etiketler (virgülle ayrılmış):",
+            "library_count": "{total} profilden {shown}",
+
+            "macro_record": "⏺ Makro kaydet",
+            "macro_stop_record": "⏹ Kaydı durdur",
+            "macro_clear": "Makroyu sil",
+            "macro_none": "Makro yok",
+            "macro_info": "Makro: {n} olay, {sec} sn, {kb} KB",
+            "macro_recording": "Kayıt sürüyor … ({hotkey} veya Durdur)",
+
+            "macro_speed": "Hız",
+            "macro_loop": "Döngü",
+            "macro_start": "Başlangıç",
+            "macro_seek": "Atla",
+
+            "dsl_key": "tuş",
+            "dsl_expected": "\"{tok}\" bekleniyor",
+            "dsl_unexpected": "beklenmeyen \"{tok}\"",
+            "dsl_count": "1–{max} arası bir sayı bekleniyor",
+            "dsl_duration": "0–{max} ms arası bir süre bekleniyor",
+            "keys_error_at": "Karakter {pos}: {msg}",
+            "keys_syntax_error": "Bir setin tuş alanında sözdizimi hatası var.",
+
+            "dsl_text": "en fazla {max} karakterlik metin",
+            "dsl_string": "\"…\" içinde metin",
 
             "set_prefix": "Set",
             "profile_prefix": "Profil",
@@ -351,12 +531,18 @@ def _tr_table():
                 "<b>Olası tuşlar:</b><br><br>"
                 "<b>• Harfler:</b><br> &nbsp;&nbsp;   a–z veya A–Z<br>"
                 "<b>• Sayılar:</b><br> &nbsp;&nbsp;   0–9<br>"
-                "<b>• Fonksiyon tuşları:</b><br> &nbsp;&nbsp;   f1–f12<br>"
+                "<b>• Fonksiyon tuşları:</b><br> &nbsp;&nbsp;   f1–f24<br>"
                 "<b>• Özel tuşlar:</b><br>"
                 "&nbsp;&nbsp;   Enter tuşu (enter), Boşluk (space), Tab (tab), Escape (esc)<br>"
                 "&nbsp;&nbsp;   Shift (shift), Ctrl (ctrl), Alt (alt)<br>"
-                "&nbsp;&nbsp;   Yukarı ok (up), aşağı (down), sol (left), sağ (right)<br><br>"
-                "<i>Birden fazla tuşu virgülle ayır. Tam kelime yazma.</i>"
+                "&nbsp;&nbsp;   Yukarı ok (up), aşağı (down), sol (left), sağ (right)<br>"
+                "&nbsp;&nbsp;   home, end, page_up, page_down, insert, delete, backspace, menu<br>"
+                "&nbsp;&nbsp;   num_0–num_9, num_add, num_enter, media_play_pause, media_volume_up, u20ac (€)<br><br>"
+                "<i>Birden fazla tuşu virgülle ayır. Tam kelime yazma.</i><br><br>"
+                "<b>• Makrolar:</b><br>"
+                "&nbsp;&nbsp;   ctrl+c (kombinasyon), hold(w, 500) (500 ms basılı tut), wait(30) (30 ms bekle)<br>"
+                "&nbsp;&nbsp;   [a, b]*5 (tekrarla), '+' ve ',' tırnak içinde<br>"
+                "&nbsp;&nbsp;   type(\"Merhaba\") (metin yaz), type(\"Merhaba\", 20) (karakter başına 20 ms)"
             ),
         },
 
@@ -435,8 +621,55 @@ def _tr_table():
             "load_file_title": "تحميل ملف",
             "save_file_title": "حفظ الملفات باسم…",
 
-            "files_json": "ملفات JSON (*.json);;كل الملفات (*)",
-            "files_all_or_json": "كل الملفات (*);;ملفات JSON (*.json)",
+            "files_json": "ملفات JSON (*.json);;قاعدة بيانات SQLite (*.db *.sqlite);;كل الملفات (*)",
+            "files_all_or_json": "كل الملفات (*);;ملفات JSON (*.json);;قاعدة بيانات SQLite (*.db *.sqlite)",
+
+            "timing": "التوقيت",
+            "spin_window": "نافذة الانتظار النشط قبل الموعد (µs):",
+            "spin_hint": "أعلى = أدق، لكن استهلاك أكبر للمعالج",
+
+            "stats_line": "{eps} حدث/ث · تأخر p99 {p99} µs · فائت {missed}",
+            "stats_idle": "إحصاءات: –",
+
+            "engine_line": "{running} قيد التشغيل · {eps} حدث/ث إجمالي",
+
+            "process_runner": "المشغل في عملية منفصلة",
+            "process_hint": "تستمر ضغطات المفاتيح بشكل مستقل عن الواجهة",
+            "process_error": "تعذر بدء عملية المشغل:\n{err}",
+
+            "control_line": " · اختصار p99 {us} µs",
+
+            "library": "المكتبة",
+            "library_title": "مكتبة الملفات الشخصية",
+            "library_search_hint": "بحث … (#وسم، key:f5)",
+            "library_open": "فتح",
+            "library_open_marker": "مفتوح",
+            "library_tags": "الوسوم …",
+            "library_tags_prompt": "الوسوم (مفصولة بفواصل):",
+            "library_count": "{shown} من {total} ملف شخصي",
+
+            "macro_record": "⏺ تسجيل ماكرو",
+            "macro_stop_record": "⏹ إيقاف التسجيل",
+            "macro_clear": "حذف الماكرو",
+            "macro_none": "لا يوجد ماكرو",
+            "macro_info": "ماكرو: {n} حدث، {sec} ث، {kb} KB",
+            "macro_recording": "جارٍ التسجيل … ({hotkey} أو انقر إيقاف)",
+
+            "macro_speed": "السرعة",
+            "macro_loop": "تكرار",
+            "macro_start": "البدء عند",
+            "macro_seek": "انتقال",
+
+            "dsl_key": "مفتاح",
+            "dsl_expected": "متوقع \"{tok}\"",
+            "dsl_unexpected": "غير متوقع \"{tok}\"",
+            "dsl_count": "متوقع عدد من 1 إلى {max}",
+            "dsl_duration": "متوقعة مدة من 0 إلى {max} ms",
+            "keys_error_at": "الحرف {pos}: {msg}",
+            "keys_syntax_error": "يحتوي حقل المفاتيح في إحدى المجموعات على خطأ في الصياغة.",
+
+            "dsl_text": "نص من {max} حرف كحد أقصى",
+            "dsl_string": "نص بين \"…\"",
 
             "set_prefix": "مجموعة",
             "profile_prefix": "ملف",
@@ -446,12 +679,18 @@ def _tr_table():
                 "<b>المفاتيح الممكنة:</b><br><br>"
                 "<b>• حروف:</b><br> &nbsp;&nbsp;   a–z أو A–Z<br>"
                 "<b>• أرقام:</b><br> &nbsp;&nbsp;   0–9<br>"
-                "<b>• مفاتيح الوظائف:</b><br> &nbsp;&nbsp;   f1–f12<br>"
+                "<b>• مفاتيح الوظائف:</b><br> &nbsp;&nbsp;   f1–f24<br>"
                 "<b>• مفاتيح خاصة:</b><br>"
                 "&nbsp;&nbsp;   مفتاح الإدخال (enter)، المسافة (space)، تبويب (tab)، خروج (esc)<br>"
                 "&nbsp;&nbsp;   تبديل (shift)، تحكم (ctrl)، Alt (alt)<br>"
-                "&nbsp;&nbsp;   سهم للأعلى (up)، للأسفل (down)، لليسار (left)، لليمين (right)<br><br>"
-                "<i>افصل بين المفاتيح بفاصلة. بدون كلمات كاملة.</i>"
+                "&nbsp;&nbsp;   سهم للأعلى (up)، للأسفل (down)، لليسار (left)، لليمين (right)<br>"
+                "&nbsp;&nbsp;   home, end, page_up, page_down, insert, delete, backspace, menu<br>"
+                "&nbsp;&nbsp;   num_0–num_9, num_add, num_enter, media_play_pause, media_volume_up, u20ac (€)<br><br>"
+                "<i>افصل بين المفاتيح بفاصلة. بدون كلمات كاملة.</i><br><br>"
+                "<b>• الماكرو:</b><br>"
+                "&nbsp;&nbsp;   ctrl+c (تركيبة)، hold(w, 500) (ضغط مطوّل 500 ms)، wait(30) (انتظار 30 ms)<br>"
+                "&nbsp;&nbsp;   [a, b]*5 (تكرار)، '+' و ',' بين علامتي اقتباس<br>"
+                "&nbsp;&nbsp;   type(\"Hello\") (كتابة نص)، type(\"Hello\", 20) (20 ms لكل حرف)"
             ),
         },
 
@@ -528,8 +767,55 @@ def _tr_table():
             "load_file_title": "Загрузить файл профилей",
             "save_file_title": "Сохранить профили как…",
 
-            "files_json": "Файлы JSON (*.json);;Все файлы (*)",
-            "files_all_or_json": "Все файлы (*);;Файлы JSON (*.json)",
+            "files_json": "Файлы JSON (*.json);;База данных SQLite (*.db *.sqlite);;Все файлы (*)",
+            "files_all_or_json": "Все файлы (*);;Файлы JSON (*.json);;База данных SQLite (*.db *.sqlite)",
+
+            "timing": "Тайминг",
+            "spin_window": "Окно ожидания перед дедлайном (мкс):",
+            "spin_hint": "Больше = точнее, но выше нагрузка на CPU",
+
+            "stats_line": "{eps} соб/с · p99 задержка {p99} мкс · пропущено {missed}",
+            "stats_idle": "Статистика: –",
+
+            "engine_line": "{running} активно · всего {eps} соб/с",
+
+            "process_runner": "Раннер в отдельном процессе",
+            "process_hint": "Нажатия клавиш выполняются независимо от интерфейса",
+            "process_error": "Не удалось запустить процесс раннера:\n{err}",
+
+            "control_line": " · горячая клавиша p99 {us} µs",
+
+            "library": "Библиотека",
+            "library_title": "Библиотека профилей",
+            "library_search_hint": "Поиск … (#тег, key:f5)",
+            "library_open": "Открыть",
+            "library_open_marker": "открыт",
+            "library_tags": "Теги …",
+            "library_tags_prompt": "Теги (через запятую):",
+            "library_count": "{shown} из {total} профилей",
+
+            "macro_record": "⏺ Записать макрос",
+            "macro_stop_record": "⏹ Остановить запись",
+            "macro_clear": "Удалить макрос",
+            "macro_none": "Нет макроса",
+            "macro_info": "Макрос: {n} событий, {sec} с, {kb} КБ",
+            "macro_recording": "Идёт запись … ({hotkey} или «Остановить»)",
+
+            "macro_speed": "Скорость",
+            "macro_loop": "Повтор",
+            "macro_start": "Начать с",
+            "macro_seek": "Перейти",
+
+            "dsl_key": "клавиша",
+            "dsl_expected": "ожидается «{tok}»",
+            "dsl_unexpected": "неожиданно «{tok}»",
+            "dsl_count": "ожидается число 1–{max}",
+            "dsl_duration": "ожидается длительность 0–{max} мс",
+            "keys_error_at": "Символ {pos}: {msg}",
+            "keys_syntax_error": "Поле клавиш одного из наборов содержит синтаксическую ошибку.",
+
+            "dsl_text": "текст не длиннее {max} символов",
+            "dsl_string": "текст в \"…\"",
 
             "set_prefix": "Набор",
             "profile_prefix": "Профиль",
@@ -539,12 +825,18 @@ def _tr_table():
                 "<b>Возможные клавиши:</b><br><br>"
                 "<b>• Буквы:</b><br> &nbsp;&nbsp;   a–z или A–Z<br>"
                 "<b>• Цифры:</b><br> &nbsp;&nbsp;   0–9<br>"
-                "<b>• Функциональные:</b><br> &nbsp;&nbsp;   f1–f12<br>"
+                "<b>• Функциональные:</b><br> &nbsp;&nbsp;   f1–f24<br>"
                 "<b>• Спец. клавиши:</b><br>"
                 "&nbsp;&nbsp;   Клавиша Enter (enter), Пробел (space), Tab (tab), Escape (esc)<br>"
                 "&nbsp;&nbsp;   Shift (shift), Control (ctrl), Alt (alt)<br>"
-                "&nbsp;&nbsp;   Стрелка вверх (up), вниз (down), влево (left), вправо (right)<br><br>"
-                "<i>Разделяйте клавиши запятыми. Не вводите целые слова.</i>"
+                "&nbsp;&nbsp;   Стрелка вверх (up), вниз (down), влево (left), вправо (right)<br>"
+                "&nbsp;&nbsp;   home, end, page_up, page_down, insert, delete, backspace, menu<br>"
+                "&nbsp;&nbsp;   num_0–num_9, num_add, num_enter, media_play_pause, media_volume_up, u20ac (€)<br><br>"
+                "<i>Разделяйте клавиши запятыми. Не вводите целые слова.</i><br><br>"
+                "<b>• Макросы:</b><br>"
+                "&nbsp;&nbsp;   ctrl+c (сочетание), hold(w, 500) (удерживать 500 мс), wait(30) (ждать 30 мс)<br>"
+                "&nbsp;&nbsp;   [a, b]*5 (повтор), '+' и ',' в кавычках<br>"
+                "&nbsp;&nbsp;   type(\"Привет\") (ввод текста), type(\"Привет\", 20) (20 мс на символ)"
             ),
         },
     }
@@ -677,20 +969,6 @@ class ThemeToggle(QPushButton):
 # -------------------------------
 # Helpers
 # -------------------------------
-def clamp_int(val, lo, hi, default):
-    try:
-        v = int(val)
-    except Exception:
-        return default
-    return max(lo, min(hi, v))
-
-SPECIAL_KEYS = {
-    "enter": Key.enter, "space": Key.space, "tab": Key.tab,
-    "shift": Key.shift, "ctrl": Key.ctrl, "alt": Key.alt,
-    "esc": Key.esc, "up": Key.up, "down": Key.down,
-    "left": Key.left, "right": Key.right,
-    **{f"f{i}": getattr(Key, f"f{i}") for i in range(1, 13)}
-}
 from PyQt6.QtWidgets import QSizePolicy
 
 def make_button_big(btn: QPushButton, min_w: int = 160, min_h: int = 38, font_pt: int = 11):
@@ -701,31 +979,21 @@ def make_button_big(btn: QPushButton, min_w: int = 160, min_h: int = 38, font_pt
     btn.setMinimumSize(min_w, min_h)
     btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
 
-def press_key_text(key_text: str):
-    k = (key_text or "").strip().lower()
-    if not k:
-        return
-    if k in SPECIAL_KEYS:
-        kb.press(SPECIAL_KEYS[k])
-        kb.release(SPECIAL_KEYS[k])
-        return
-    if len(k) == 1:
-        kb.press(k)
-        kb.release(k)
-
-def move_and_left_click(x: int, y: int, settle_ms: int = 10) -> bool:
-    """
-    Bewegt die Maus und klickt.
-    Gibt False zurück, wenn Wayland/X11 das verhindert.
-    """
-    try:
-        ms.position = (int(x), int(y))
-        time.sleep(settle_ms / 1000.0)
-        ms.click(Button.left)
-        return True
-    except Exception as e:
-        print("[Mouse ERROR]", repr(e))
-        return False
+class MicrosecondSpinBox(QDoubleSpinBox):
+    """Anzeige in ms mit drei Nachkommastellen, intern ganze Mikrosekunden."""
+
+    def __init__(self, lo_us: int, hi_us: int, value_us: int):
+        super().__init__()
+        self.setDecimals(3)
+        self.setRange(lo_us / 1000.0, hi_us / 1000.0)
+        self.setSingleStep(1.0)
+        self.set_value_us(value_us)
+
+    def value_us(self) -> int:
+        return int(round(self.value() * 1000))
+
+    def set_value_us(self, us: int):
+        self.setValue(us / 1000.0)
 
 def safe_float_pair_list(obj) -> List[Tuple[float, float]]:
     out: List[Tuple[float, float]] = []
@@ -857,6 +1125,28 @@ class SettingsDialog(QDialog):
 
         root.addLayout(hk_row)
 
+        root.addWidget(self._hline())
+
+        # Timing (CPU-Budget des Spin-Waits)
+        timing_row = QHBoxLayout()
+        self.lbl_spin = QLabel(tr(self.lang, "spin_window"))
+        timing_row.addWidget(self.lbl_spin)
+
+        self.sp_spin = QSpinBox()
+        self.sp_spin.setRange(0, SPIN_MAX_US)
+        self.sp_spin.setValue(getattr(main_window, "spin_us", DEFAULT_SPIN_US))
+        self.sp_spin.setFixedWidth(80)
+        self.sp_spin.setToolTip(tr(self.lang, "spin_hint"))
+        timing_row.addWidget(self.sp_spin)
+        timing_row.addStretch()
+
+        self.cb_process = QCheckBox(tr(self.lang, "process_runner"))
+        self.cb_process.setChecked(getattr(main_window, "out_of_process", False))
+        self.cb_process.setToolTip(tr(self.lang, "process_hint"))
+        timing_row.addWidget(self.cb_process)
+
+        root.addLayout(timing_row)
+
         # Ok/Cancel
         self.buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         # Texte explizit setzen (damit wirklich überall übersetzt ist)
@@ -883,6 +1173,10 @@ class SettingsDialog(QDialog):
         self.lbl_light.setText(tr(self.lang, "theme_light"))
         self.lbl_dark.setText(tr(self.lang, "theme_dark"))
         self.lbl_lang.setText(tr(self.lang, "language"))
+        self.lbl_spin.setText(tr(self.lang, "spin_window"))
+        self.sp_spin.setToolTip(tr(self.lang, "spin_hint"))
+        self.cb_process.setText(tr(self.lang, "process_runner"))
+        self.cb_process.setToolTip(tr(self.lang, "process_hint"))
 
         self.btn_de.setText(tr(self.lang, "lang_ger"))
         self.btn_en.setText(tr(self.lang, "lang_eng"))
@@ -918,45 +1212,109 @@ class SettingsDialog(QDialog):
                 "start": self.hk_start.text().strip() or "F5",
                 "stop": self.hk_stop.text().strip() or "F6",
                 "pos": self.hk_pos.text().strip() or "F7",
-            }
+            },
+            "spin_us": self.sp_spin.value(),
+            "out_of_process": self.cb_process.isChecked(),
         }
 
 
 
 # -------------------------------
-# Click positions
+# Profile library dialog
 # -------------------------------
-@dataclass
-class ClickPosition:
-    enabled: bool
-    x: int
-    y: int
-    interval_ms: int  # 0 => fallback
-
-    def to_dict(self):
-        return {
-            "enabled": bool(self.enabled),
-            "x": int(self.x),
-            "y": int(self.y),
-            "interval_ms": int(self.interval_ms),
-        }
+class ProfileLibraryDialog(QDialog):
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.library: ProfileLibrary = main_window.library
+        self.lang = main_window.lang
+        self.selected_uid: Optional[int] = None
+
+        self.setWindowTitle(tr(self.lang, "library_title"))
+        self.setModal(True)
+        self.resize(420, 480)
+
+        root = QVBoxLayout(self)
 
-    @staticmethod
-    def from_dict(d: dict) -> "ClickPosition":
-        return ClickPosition(
-            enabled=bool(d.get("enabled", True)),
-            x=clamp_int(d.get("x"), -10_000_000, 10_000_000, 0),
-            y=clamp_int(d.get("y"), -10_000_000, 10_000_000, 0),
-            interval_ms=clamp_int(d.get("interval_ms"), 0, 9999999, 0),
+        self.search = QLineEdit()
+        self.search.setPlaceholderText(tr(self.lang, "library_search_hint"))
+        self.search.textChanged.connect(self._refresh)
+        root.addWidget(self.search)
+
+        self.list = QListWidget()
+        self.list.itemDoubleClicked.connect(lambda _: self._open_selected())
+        root.addWidget(self.list)
+
+        self.lbl_count = QLabel("")
+        self.lbl_count.setStyleSheet("color: #888;")
+        root.addWidget(self.lbl_count)
+
+        row = QHBoxLayout()
+        self.btn_tags = QPushButton(tr(self.lang, "library_tags"))
+        self.btn_tags.clicked.connect(self._edit_tags)
+        row.addWidget(self.btn_tags)
+        row.addStretch()
+        self.btn_open = QPushButton(tr(self.lang, "library_open"))
+        self.btn_open.clicked.connect(self._open_selected)
+        row.addWidget(self.btn_open)
+        root.addLayout(row)
+
+        self._refresh()
+        self.search.setFocus()
+
+    def _refresh(self):
+        results = self.library.search(self.search.text())
+        self.list.clear()
+        for e in results:
+            text = e.name
+            if e.tags:
+                text += "   " + " ".join(f"#{t}" for t in e.tags)
+            if e.open:
+                text += f"   ({tr(self.lang, 'library_open_marker')})"
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, e.uid)
+            self.list.addItem(item)
+        if results:
+            self.list.setCurrentRow(0)
+        self.lbl_count.setText(tr(self.lang, "library_count", shown=len(results), total=len(self.library)))
+
+    def _current_uid(self) -> Optional[int]:
+        item = self.list.currentItem()
+        return item.data(Qt.ItemDataRole.UserRole) if item else None
+
+    def _edit_tags(self):
+        uid = self._current_uid()
+        entry = self.library.get(uid) if uid is not None else None
+        if entry is None:
+            return
+        text, ok = QInputDialog.getText(
+            self,
+            tr(self.lang, "library_tags"),
+            tr(self.lang, "library_tags_prompt"),
+            text=", ".join(entry.tags)
         )
+        if ok:
+            self.library.update(uid, tags=text.replace("#", "").split(","))
+            self.main_window.schedule_autosave()
+            self._refresh()
+
+    def _open_selected(self):
+        self.selected_uid = self._current_uid()
+        if self.selected_uid is not None:
+            self.accept()
+
 
+# -------------------------------
+# Click positions
+# -------------------------------
 class ClickPositionRow(QWidget):
-    def __init__(self, main_window, pos: ClickPosition, on_remove):
+    def __init__(self, main_window, pos: ClickPosition, on_remove, on_changed=None):
 
         super().__init__()
         self.main_window = main_window
         self.pos = pos
         self.on_remove = on_remove
+        self.on_changed = on_changed
 
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -972,9 +1330,7 @@ class ClickPositionRow(QWidget):
         self.lbl_interval = QLabel(tr(self.main_window.lang, "interval_label"))
         layout.addWidget(self.lbl_interval)
 
-        self.sp_interval = QSpinBox()
-        self.sp_interval.setRange(0, 9999999)
-        self.sp_interval.setValue(pos.interval_ms)
+        self.sp_interval = MicrosecondSpinBox(0, US_MAX, pos.interval_us)
         self.sp_interval.setFixedWidth(110)
         layout.addWidget(self.sp_interval)
 
@@ -995,11 +1351,17 @@ class ClickPositionRow(QWidget):
 
     def _sync(self):
         self.pos.enabled = self.cb_enabled.isChecked()
-        self.pos.interval_ms = self.sp_interval.value()
+        self.pos.interval_us = self.sp_interval.value_us()
+        if self.on_changed:
+            self.on_changed()
 # -------------------------------
 # Set widget
 # -------------------------------
 class SetWidget(QWidget):
+    # jede Änderung, die den kompilierten Plan betrifft
+    plan_changed = pyqtSignal()
+    seek_requested = pyqtSignal(int)   # ms in der Aufnahme
+
     def __init__(self, main_window, set_index: int, on_ui_changed, name: str | None = None):
         self.main_window = main_window
         self.custom_name = name
@@ -1010,6 +1372,11 @@ class SetWidget(QWidget):
         self.positions: List[ClickPosition] = []
         self.position_rows: List[ClickPositionRow] = []
 
+        # aufgenommenes Makro: Base64-Blob (wie gespeichert) + Kurzinfo fürs Label
+        self.macro_text = ""
+        self._macro_info: Optional[tuple] = None   # (Ereignisse, Dauer s, Bytes)
+        self._recording = False
+
         self._build_ui()
         self.retranslate()
 
@@ -1083,21 +1450,24 @@ class SetWidget(QWidget):
         self.keys_input = QLineEdit()
         layout.addWidget(self.keys_input)
 
+        # Syntaxfehler der Makro-Sprache (keydsl), direkt beim Tippen
+        self.lbl_keys_error = QLabel("")
+        self.lbl_keys_error.setStyleSheet("color: #d9534f; font-size: 9pt;")
+        self.lbl_keys_error.setWordWrap(True)
+        self.lbl_keys_error.hide()
+        layout.addWidget(self.lbl_keys_error)
+
         row_t = QHBoxLayout()
         self.lbl_inner = QLabel("")
         row_t.addWidget(self.lbl_inner)
 
-        self.inner_ms = QSpinBox()
-        self.inner_ms.setRange(1, 9999999)
-        self.inner_ms.setValue(150)
+        self.inner_ms = MicrosecondSpinBox(INNER_MIN_US, US_MAX, 150_000)
         row_t.addWidget(self.inner_ms)
 
         self.lbl_repeat = QLabel("")
         row_t.addWidget(self.lbl_repeat)
 
-        self.repeat_ms = QSpinBox()
-        self.repeat_ms.setRange(1, 9999999)
-        self.repeat_ms.setValue(150)
+        self.repeat_ms = MicrosecondSpinBox(INNER_MIN_US, US_MAX, 150_000)
         row_t.addWidget(self.repeat_ms)
         layout.addLayout(row_t)
 
@@ -1177,9 +1547,7 @@ class SetWidget(QWidget):
         self.lbl_ms = QLabel("")
         row_c1.addWidget(self.lbl_ms)
 
-        self.global_click_interval = QSpinBox()
-        self.global_click_interval.setRange(10, 9999999)
-        self.global_click_interval.setValue(200)
+        self.global_click_interval = MicrosecondSpinBox(CLICK_MIN_US, US_MAX, 200_000)
         self.global_click_interval.setEnabled(False)
         row_c1.addWidget(self.global_click_interval)
 
@@ -1209,11 +1577,78 @@ class SetWidget(QWidget):
         self.cb_positions.stateChanged.connect(self._toggle_click_fields)
         self._toggle_click_fields()
 
+        # Macro
+        layout.addWidget(self._hline())
+        row_macro = QHBoxLayout()
+        self.btn_record = QPushButton("")
+        self.btn_record.clicked.connect(lambda: self.main_window.toggle_recording(self))
+        row_macro.addWidget(self.btn_record)
+
+        self.lbl_macro = QLabel("")
+        row_macro.addWidget(self.lbl_macro)
+        row_macro.addStretch()
+
+        self.btn_clear_macro = QPushButton("")
+        self.btn_clear_macro.setEnabled(False)
+        self.btn_clear_macro.clicked.connect(lambda: self.set_macro(None))
+        row_macro.addWidget(self.btn_clear_macro)
+        layout.addLayout(row_macro)
+
+        # Wiedergabe: Tempo, Schleife, Startposition
+        row_replay = QHBoxLayout()
+        self.lbl_macro_speed = QLabel("")
+        row_replay.addWidget(self.lbl_macro_speed)
+        self.macro_speed = QDoubleSpinBox()
+        self.macro_speed.setRange(MACRO_SPEED_MIN, MACRO_SPEED_MAX)
+        self.macro_speed.setDecimals(1)
+        self.macro_speed.setSingleStep(0.5)
+        self.macro_speed.setValue(1.0)
+        self.macro_speed.setSuffix(" ×")
+        row_replay.addWidget(self.macro_speed)
+
+        self.cb_macro_loop = QCheckBox("")
+        self.cb_macro_loop.setChecked(True)
+        row_replay.addWidget(self.cb_macro_loop)
+
+        self.lbl_macro_start = QLabel("")
+        row_replay.addWidget(self.lbl_macro_start)
+        self.macro_start = QDoubleSpinBox()
+        self.macro_start.setRange(0.0, 99_999.0)
+        self.macro_start.setDecimals(1)
+        row_replay.addWidget(self.macro_start)
+        self.lbl_macro_start_unit = QLabel("")
+        row_replay.addWidget(self.lbl_macro_start_unit)
+        # laufende Wiedergabe an die Startposition springen lassen
+        self.btn_macro_seek = QPushButton("")
+        self.btn_macro_seek.setEnabled(False)
+        self.btn_macro_seek.clicked.connect(
+            lambda: self.seek_requested.emit(int(round(self.macro_start.value() * 1000))))
+        row_replay.addWidget(self.btn_macro_seek)
+        row_replay.addStretch()
+        layout.addLayout(row_replay)
+
         self.keys_help_popup = self._create_keys_help_popup()
         self.keys_help.installEventFilter(self)
 
+        # Live-Telemetrie (wird vom ProfileWidget per QTimer aktualisiert)
+        self.lbl_stats = QLabel("")
+        self.lbl_stats.setStyleSheet("color: #888; font-size: 9pt;")
+        layout.addWidget(self.lbl_stats)
+        self._stats_values = None
+
         layout.addWidget(self._hline())
 
+        # Plan-Änderungen melden (Runner tauscht den Plan am Zyklusende)
+        self.keys_input.textChanged.connect(self._check_keys)
+        self.keys_input.textChanged.connect(self.plan_changed.emit)
+        for sp in (self.inner_ms, self.repeat_ms, self.jump_back_target, self.sw_target,
+                   self.sw_min, self.sw_sec, self.global_click_interval,
+                   self.macro_speed, self.macro_start):
+            sp.valueChanged.connect(self.plan_changed.emit)
+        for cb in (self.cb_jump_back, self.cb_switch, self.cb_click,
+                   self.cb_click_interval, self.cb_positions, self.cb_macro_loop):
+            cb.stateChanged.connect(self.plan_changed.emit)
+
     def retranslate(self):
         lang = self.main_window.lang
         self.lbl_keys.setText(tr(lang, "keys_to_press"))
@@ -1238,8 +1673,17 @@ class SetWidget(QWidget):
             tr(lang, "positions_enable", hotkey=hk["pos"])
         )
         self.btn_clear_positions.setText(tr(lang, "positions_clear"))
+        self.btn_clear_macro.setText(tr(lang, "macro_clear"))
+        self.lbl_macro_speed.setText(tr(lang, "macro_speed"))
+        self.cb_macro_loop.setText(tr(lang, "macro_loop"))
+        self.lbl_macro_start.setText(tr(lang, "macro_start"))
+        self.lbl_macro_start_unit.setText(tr(lang, "time_sec"))
+        self.btn_macro_seek.setText(tr(lang, "macro_seek"))
 
         self._update_pos_label()
+        self._update_macro_label()
+        self._check_keys()
+        self.set_stats(self._stats_values)
 
         # Help popup
         self.lbl_help_popup.setText(tr(lang, "keys_help_body"))
@@ -1291,8 +1735,27 @@ class SetWidget(QWidget):
 
         self.on_ui_changed()
 
-    def get_keys(self) -> List[str]:
-        return [k.strip().lower() for k in self.keys_input.text().split(",") if k.strip()]
+    def _check_keys(self):
+        err = check_keys(self.keys_input.text())
+        if err is None:
+            self.keys_input.setStyleSheet("")
+            self.keys_input.setToolTip("")
+            self.lbl_keys_error.hide()
+            return
+        lang = self.main_window.lang
+        args = dict(err.params)
+        if args.get("tok") == "word":
+            args["tok"] = tr(lang, "dsl_key")
+        elif args.get("tok") == "text":
+            args["tok"] = tr(lang, "dsl_string")
+        msg = tr(lang, "keys_error_at", pos=err.pos + 1, msg=tr(lang, f"dsl_{err.code}", **args))
+        self.keys_input.setStyleSheet("QLineEdit { border: 1px solid #d9534f; }")
+        self.keys_input.setToolTip(msg)
+        self.lbl_keys_error.setText(msg)
+        self.lbl_keys_error.show()
+        # Fehlerstelle markieren, ohne dem Tippenden den Cursor wegzunehmen
+        if not self.keys_input.hasFocus():
+            self.keys_input.setSelection(err.pos, err.end - err.pos)
 
     # Positions
     def clear_positions(self):
@@ -1305,7 +1768,7 @@ class SetWidget(QWidget):
         if len(self.positions) >= 8:
             return
         x, y = int(pos_xy[0]), int(pos_xy[1])
-        self.positions.append(ClickPosition(enabled=True, x=x, y=y, interval_ms=0))
+        self.positions.append(ClickPosition(enabled=True, x=x, y=y, interval_us=0))
         self._rebuild_positions_ui()
         self._update_pos_label()
         self.on_ui_changed()
@@ -1319,11 +1782,16 @@ class SetWidget(QWidget):
 
         self.position_rows.clear()
         for p in self.positions:
-            row = ClickPositionRow(self.main_window, p, on_remove=self._remove_position_row)
+            row = ClickPositionRow(
+                self.main_window, p,
+                on_remove=self._remove_position_row,
+                on_changed=self.plan_changed.emit
+            )
             self.position_rows.append(row)
             self.positions_container.addWidget(row)
 
         self._set_positions_rows_enabled(self.cb_click.isChecked() and self.cb_positions.isChecked())
+        self.plan_changed.emit()
 
     def _remove_position_row(self, row_widget: ClickPositionRow):
         try:
@@ -1335,15 +1803,61 @@ class SetWidget(QWidget):
         self._update_pos_label()
         self.on_ui_changed()
 
+    def set_recording(self, recording: bool):
+        self._recording = recording
+        self.btn_clear_macro.setEnabled(not recording and bool(self.macro_text))
+        self._update_macro_label()
+
+    def set_macro(self, track: Optional[MacroTrack]):
+        if track is not None and len(track):
+            self._set_macro_text(track.to_text(), track)
+        else:
+            self._set_macro_text("", None)
+        self.btn_clear_macro.setEnabled(not self._recording and bool(self.macro_text))
+        self._update_macro_label()
+        self.plan_changed.emit()
+        self.on_ui_changed()
+
+    def _set_macro_text(self, text: str, track: Optional[MacroTrack]):
+        self.macro_text = text
+        self.btn_macro_seek.setEnabled(bool(text))
+        self._macro_info = (len(track), track.duration_ns() / 1e9, len(text) * 3 // 4) if track else None
+
+    def _update_macro_label(self):
+        lang = self.main_window.lang
+        if self._recording:
+            self.btn_record.setText(tr(lang, "macro_stop_record"))
+            self.lbl_macro.setText(tr(lang, "macro_recording", hotkey=self.main_window.hotkeys["stop"]))
+            return
+        self.btn_record.setText(tr(lang, "macro_record"))
+        if self._macro_info is None:
+            self.lbl_macro.setText(tr(lang, "macro_none"))
+        else:
+            n, sec, size = self._macro_info
+            self.lbl_macro.setText(tr(lang, "macro_info", n=n, sec=f"{sec:.1f}", kb=f"{size / 1024:.1f}"))
+
     def _update_pos_label(self):
         self.lbl_pos_count.setText(tr(self.main_window.lang, "positions_count", cur=len(self.positions)))
 
+    def set_stats(self, values: Optional[tuple]):
+        # values = (events/s, p99 Verspätung µs, verpasste Deadlines) oder None
+        self._stats_values = values
+        lang = self.main_window.lang
+        if values is None:
+            self.lbl_stats.setText(tr(lang, "stats_idle"))
+        else:
+            eps, p99, missed = values
+            self.lbl_stats.setText(tr(lang, "stats_line", eps=f"{eps:.1f}", p99=p99, missed=missed))
+
     # Serialization
     def to_dict(self) -> dict:
         return {
             "keys": self.keys_input.text(),
-            "inner_ms": self.inner_ms.value(),
-            "repeat_ms": self.repeat_ms.value(),
+            # ms-Felder bleiben für ältere Versionen erhalten
+            "inner_ms": self.inner_ms.value_us() // 1000,
+            "repeat_ms": self.repeat_ms.value_us() // 1000,
+            "inner_us": self.inner_ms.value_us(),
+            "repeat_us": self.repeat_ms.value_us(),
             "switch": {
                 "enabled": self.cb_switch.isChecked(),
                 "min": self.sw_min.value(),
@@ -1357,16 +1871,21 @@ class SetWidget(QWidget):
             "click": {
                 "enabled": self.cb_click.isChecked(),
                 "interval_enabled": self.cb_click_interval.isChecked(),
-                "global_interval_ms": self.global_click_interval.value(),
+                "global_interval_ms": self.global_click_interval.value_us() // 1000,
+                "global_interval_us": self.global_click_interval.value_us(),
                 "positions_enabled": self.cb_positions.isChecked(),
                 "positions": [p.to_dict() for p in self.positions],
-            }
+            },
+            "macro": self.macro_text,
+            "macro_speed": round(self.macro_speed.value(), 1),
+            "macro_loop": self.cb_macro_loop.isChecked(),
+            "macro_start_ms": int(round(self.macro_start.value() * 1000)),
         }
 
     def from_dict(self, data: dict):
         self.keys_input.setText(data.get("keys", ""))
-        self.inner_ms.setValue(clamp_int(data.get("inner_ms"), 1, 9999999, 50))
-        self.repeat_ms.setValue(clamp_int(data.get("repeat_ms"), 1, 9999999, 150))
+        self.inner_ms.set_value_us(read_us(data, "inner_us", "inner_ms", INNER_MIN_US, US_MAX, 50_000))
+        self.repeat_ms.set_value_us(read_us(data, "repeat_us", "repeat_ms", INNER_MIN_US, US_MAX, 150_000))
 
         sw = data.get("switch", {})
         self.cb_switch.setChecked(bool(sw.get("enabled", False)))
@@ -1383,7 +1902,9 @@ class SetWidget(QWidget):
         ck = data.get("click", {})
         self.cb_click.setChecked(bool(ck.get("enabled", False)))
         self.cb_click_interval.setChecked(bool(ck.get("interval_enabled", False)))
-        self.global_click_interval.setValue(clamp_int(ck.get("global_interval_ms"), 10, 9999999, 200))
+        self.global_click_interval.set_value_us(
+            read_us(ck, "global_interval_us", "global_interval_ms", CLICK_MIN_US, US_MAX, 200_000)
+        )
         self.cb_positions.setChecked(bool(ck.get("positions_enabled", False)))
 
         self.positions = []
@@ -1395,8 +1916,33 @@ class SetWidget(QWidget):
         self._rebuild_positions_ui()
         self._toggle_click_fields()
 
+        track = load_track(data)
+        self._set_macro_text(data["macro"] if track is not None else "", track)
+        self.btn_clear_macro.setEnabled(track is not None)
+        self.macro_speed.setValue(clamp_float(data.get("macro_speed"), MACRO_SPEED_MIN, MACRO_SPEED_MAX, 1.0))
+        self.cb_macro_loop.setChecked(bool(data.get("macro_loop", True)))
+        self.macro_start.setValue(clamp_int(data.get("macro_start_ms"), 0, 99_999_000, 0) / 1000)
+
         self.retranslate()
         self.on_ui_changed()
+
+
+# -------------------------------
+# Lazy tabs
+# -------------------------------
+class LazyTab(QWidget):
+    """Platzhalter für ein geladenes Profil/Set; Widgets entstehen erst beim Anzeigen."""
+
+    def __init__(self, data: Optional[dict]):
+        super().__init__()
+        # wird nie verändert, daher direkt speicherbar
+        self.data = data if isinstance(data, dict) else {}
+        self.library_uid: Optional[int] = None
+
+    def to_dict(self) -> dict:
+        return self.data
+
+
 # -------------------------------
 # Profile widget (sets + runner)
 # -------------------------------
@@ -1405,13 +1951,29 @@ class ProfileWidget(QWidget):
         super().__init__()
         self.main_window = main_window
         self.profile_name = profile_name
-
-        self.running = False
-        self.run_id = 0
-        self.active_set_token = 0
-
-        self.click_thread: Optional[Thread] = None
-        self.runner_thread: Optional[Thread] = None
+        self.library_uid: Optional[int] = None
+
+        # Alle Profile laufen auf dem gemeinsamen Scheduler der MainWindow-Engine
+        self.attach_engine(main_window.engine)
+
+        # Telemetrie nur mit niedriger Frequenz abholen
+        self._stats_prev: dict = {}
+        self._stats_timer = QTimer(self)
+        self._stats_timer.setInterval(STATS_REFRESH_MS)
+        self._stats_timer.timeout.connect(self._refresh_stats)
+        self._stats_timer.start()
+
+        # Kompilierte Pläne aller Sets; wird nur im GUI-Thread ersetzt,
+        # der Runner liest ausschließlich diese Referenz.
+        self._plans: Tuple[SetPlan, ...] = ()
+        # Rohdaten dazu (für den Runner-Prozess)
+        self._set_data: List[dict] = []
+        # geänderte Sets, nach PLAN_DEBOUNCE_MS einzeln neu kompiliert
+        self._dirty_sets: set = set()
+        self._plan_timer = QTimer(self)
+        self._plan_timer.setSingleShot(True)
+        self._plan_timer.setInterval(PLAN_DEBOUNCE_MS)
+        self._plan_timer.timeout.connect(self._flush_plan_changes)
 
         self._build_ui()
         self.retranslate()
@@ -1430,6 +1992,7 @@ class ProfileWidget(QWidget):
         self.set_tabs.addTab(QWidget(), tr(self.main_window.lang, "plus_tab"))
         self.set_tabs.tabBarClicked.connect(self._on_set_tab_clicked)
         self.set_tabs.tabBarDoubleClicked.connect(self._on_set_tab_double_clicked)
+        self.set_tabs.currentChanged.connect(self._on_set_tab_changed)
 
         from PyQt6.QtWidgets import QSizePolicy
 
@@ -1439,8 +2002,8 @@ class ProfileWidget(QWidget):
         make_button_big(self.btn_start, min_w=180, min_h=25, font_pt=12)
         make_button_big(self.btn_stop, min_w=180, min_h=25, font_pt=12)
 
-        self.btn_start.clicked.connect(self.start)
-        self.btn_stop.clicked.connect(self.stop)
+        self.btn_start.clicked.connect(lambda: self.start())
+        self.btn_stop.clicked.connect(lambda: self.stop())
 
         btns = QHBoxLayout()
         btns.setSpacing(12)
@@ -1564,6 +2127,7 @@ class ProfileWidget(QWidget):
             self._add_set_tab_auto()
 
     def _on_ui_changed(self):
+        self.main_window.schedule_autosave()
         # nur Layout refreshen, kein resize controller
         self.main_window.updateGeometry()
         if self.main_window.layout():
@@ -1575,20 +2139,45 @@ class ProfileWidget(QWidget):
             insert_at = self.set_tabs.count()
 
         default_name = f"{tr(self.main_window.lang, 'set_prefix')} {insert_at + 1}"
+        sw = self._make_set_widget(insert_at + 1, default_name, data)
+
+        self.set_tabs.insertTab(insert_at, sw, default_name)
+
+        self._renumber_sets()
+        self.set_tabs.setCurrentIndex(insert_at)
+        self._on_ui_changed()
+
+    def _make_set_widget(self, set_index: int, name: str, data: Optional[dict]) -> SetWidget:
         sw = SetWidget(
             self.main_window,
-            insert_at + 1,
+            set_index,
             on_ui_changed=self._on_ui_changed,
-            name=default_name
+            name=name
         )
         if isinstance(data, dict):
             sw.from_dict(data)
+        sw.plan_changed.connect(lambda sw=sw: self._on_plan_changed(sw))
+        sw.seek_requested.connect(lambda t_ms, sw=sw: self._seek_macro(sw, t_ms))
+        return sw
 
-        self.set_tabs.insertTab(insert_at, sw, default_name)
+    def _on_set_tab_changed(self, index: int):
+        if isinstance(self.set_tabs.widget(index), LazyTab):
+            self._materialize_set(index)
+
+    def _materialize_set(self, index: int):
+        # Platzhalter gegen ein echtes SetWidget tauschen (gleiche Daten)
+        lazy = self.set_tabs.widget(index)
+        title = self.set_tabs.tabText(index)
+        sw = self._make_set_widget(index + 1, title, lazy.data)
+
+        self.set_tabs.blockSignals(True)
+        self.set_tabs.removeTab(index)
+        self.set_tabs.insertTab(index, sw, title)
+        self.set_tabs.setCurrentIndex(index)
+        self.set_tabs.blockSignals(False)
+        lazy.deleteLater()
+        sw.retranslate()
 
-        self._renumber_sets()
-        self.set_tabs.setCurrentIndex(insert_at)
-        self._on_ui_changed()
     def _add_set_tab_auto(self):
         prefix = tr(self.main_window.lang, "set_prefix")
 
@@ -1626,6 +2215,52 @@ class ProfileWidget(QWidget):
                 None
             )
 
+        self._recompile_plans()
+
+    def _recompile_plans(self):
+        # Sets hinzugefügt/entfernt/geladen: alles neu
+        self._plan_timer.stop()
+        self._dirty_sets.clear()
+        resolve = get_backend().resolve_key
+        self._set_data = self.collect_settings()["sets"]
+        self._plans = tuple(compile_set(d, resolve=resolve) for d in self._set_data)
+        if isinstance(self.runner, RemoteRunner) and self.runner.running:
+            self.runner.update_sets(self._set_data)
+        self.main_window.schedule_autosave()
+
+    def _on_plan_changed(self, sw: "SetWidget"):
+        self._dirty_sets.add(sw)
+        self._plan_timer.start()
+
+    def _flush_plan_changes(self):
+        # nur die geänderten Sets neu kompilieren (und an den Runner-Prozess schicken)
+        self._plan_timer.stop()
+        dirty, self._dirty_sets = self._dirty_sets, set()
+        resolve = get_backend().resolve_key
+        plans = list(self._plans)
+        for sw in dirty:
+            i = self.set_tabs.indexOf(sw)
+            if i < 0:
+                continue
+            if i >= len(plans):
+                self._recompile_plans()
+                return
+            data = sw.to_dict()
+            self._set_data[i] = data
+            plans[i] = compile_set(data, resolve=resolve)
+            if isinstance(self.runner, RemoteRunner) and self.runner.running:
+                self.runner.update_set(i, data)
+        self._plans = tuple(plans)
+        self.main_window.schedule_autosave()
+
+    def attach_engine(self, engine):
+        # lokal zieht der Runner die Pläne selbst, der Runner-Prozess bekommt Set-Daten geschickt
+        if isinstance(engine, RemoteEngine):
+            self.runner = engine.create_runner(lambda: self._set_data)
+        else:
+            self.runner = engine.create_runner(lambda: self._plans)
+        self._stats_prev = {}
+
     def current_set_widget(self) -> Optional[SetWidget]:
         w = self.set_tabs.currentWidget()
         return w if isinstance(w, SetWidget) else None
@@ -1635,185 +2270,109 @@ class ProfileWidget(QWidget):
         sets = []
         for i in range(self._set_count()):
             w = self.set_tabs.widget(i)
-            if isinstance(w, SetWidget):
+            if isinstance(w, (SetWidget, LazyTab)):
                 sets.append(w.to_dict())
         return {"sets": sets}
 
     def apply_settings(self, data: dict):
-        self.set_tabs.clear()
+        lang = self.main_window.lang
         sets = data.get("sets", [])
-        if isinstance(sets, list) and sets:
-            for sdata in sets:
-                self._add_set_tab(sdata if isinstance(sdata, dict) else None)
+        sets = sets if isinstance(sets, list) else []
+
+        # Sets nur als Daten einhängen; ein SetWidget entsteht erst beim Anzeigen
+        self.set_tabs.blockSignals(True)
+        self.set_tabs.clear()
+        for i, sdata in enumerate(sets):
+            self.set_tabs.addTab(LazyTab(sdata), f"{tr(lang, 'set_prefix')} {i + 1}")
+        self.set_tabs.blockSignals(False)
+
+        if sets:
+            # wie bisher: das zuletzt geladene Set ist aktiv
+            self.set_tabs.setCurrentIndex(len(sets) - 1)
+            self._on_set_tab_changed(len(sets) - 1)
         else:
             self._add_set_tab()
 
-        self.set_tabs.addTab(QWidget(), tr(self.main_window.lang, "plus_tab"))
+        self.set_tabs.addTab(QWidget(), tr(lang, "plus_tab"))
         self._renumber_sets()
         self.retranslate()
         self._on_ui_changed()
 
-    # Start/Stop
-    def start(self):
+    # Start/Stop (aus GUI- und Hotkey-Thread: keine Widget-Zugriffe,
+    # die Pläne sind durch plan_changed bereits aktuell)
+    def start(self, issued_ns: Optional[int] = None):
         if self.running:
             return
-        if self._set_count() <= 0:
-            QMessageBox.warning(self, tr(self.main_window.lang, "error"), tr(self.main_window.lang, "no_set"))
+        # Start aus dem GUI-Thread: noch gesammelte Änderungen sofort übernehmen.
+        # Hotkey-Thread: keine Widgets anfassen, Pläne sind höchstens PLAN_DEBOUNCE_MS alt.
+        if self._dirty_sets and QThread.currentThread() is self.thread():
+            self._flush_plan_changes()
+        if not self._plans:
+            self.main_window.warning_signal.emit("no_set")
+            return
+        if any(p.error is not None for p in self._plans):
+            self.main_window.warning_signal.emit("keys_syntax_error")
             return
 
-        self.running = True
-        self.run_id += 1
-        my_run_id = self.run_id
-
-        self.runner_thread = Thread(target=self._runner_loop, args=(my_run_id,), daemon=True)
-        self.runner_thread.start()
-
-    def stop(self):
-        self.running = False
-        self.run_id += 1
-        self.active_set_token += 1
-
-    # Runner
-    def _runner_loop(self, my_run_id: int):
-        current_index = 0  # immer Set 1 starten
+        self.runner.request_start(0, issued_ns)
 
-        while self.running and my_run_id == self.run_id:
-            set_count = self._set_count()
-            if set_count <= 0:
-                return
+    def stop(self, issued_ns: Optional[int] = None):
+        self.runner.request_stop(issued_ns)
 
-            if current_index < 0 or current_index >= set_count:
-                current_index = 0
-
-            sw = self.set_tabs.widget(current_index)
-            if isinstance(sw, QFrame):
-                sw = sw.layout().itemAt(0).widget()
-            if not isinstance(sw, SetWidget):
-                current_index = 0
+    def _seek_macro(self, sw: "SetWidget", t_ms: int):
+        # wirkt nur, wenn gerade dieses Set sein Makro abspielt
+        i = self.set_tabs.indexOf(sw)
+        if i < 0 or not self.running:
+            return
+        if self._dirty_sets:
+            self._flush_plan_changes()
+        self.runner.request_seek(i, t_ms)
+
+    def shutdown(self):
+        # vor dem Entfernen des Tabs: Runner stoppen und abmelden
+        self._stats_timer.stop()
+        self.main_window.engine.remove_runner(self.runner)
+
+    @property
+    def running(self) -> bool:
+        return self.runner.running
+
+    def _refresh_stats(self):
+        stats = self.runner.stats_snapshot()
+        if not stats and not self._stats_prev:
+            return
+        now = time.perf_counter()
+        running = self.runner.running
+        prev, self._stats_prev = self._stats_prev, {}
+        for i in range(self._set_count()):
+            w = self.set_tabs.widget(i)
+            if not isinstance(w, SetWidget):
                 continue
+            st = stats.get(i)
+            if st is None:
+                w.set_stats(None)
+                continue
+            events, p99_us, missed = st
+            eps = 0.0
+            p = prev.get(i)
+            if running and p and now > p[1]:
+                eps = (events - p[0]) / (now - p[1])
+            self._stats_prev[i] = (events, now)
+            w.set_stats((eps, p99_us, missed))
+        if not running:
+            self._stats_prev = {}
 
-            # wenn keine Keys vorhanden, trotzdem nicht blockieren
-            keys = sw.get_keys()
-            if not keys:
-                time.sleep(0.01)
-
-            # activate set token
-            self.active_set_token += 1
-            my_set_token = self.active_set_token
-
-            # start per-set threads (Intervall-Klicks laufen hier!)
-            self._start_set_threads(my_run_id, my_set_token, sw)
-
-            # ✅ Positionen GENAU EINMAL pro Set
-            # ❗ NUR wenn:
-            #   - Linksklick AN
-            #   - Intervall AUS
-            #   - Positionen AN
-            if (
-                    sw.cb_click.isChecked()
-                    and not sw.cb_click_interval.isChecked()
-                    and sw.cb_positions.isChecked()
-                    and sw.positions
-            ):
-                self._single_click_cycle(sw)
-
-            set_start_time = time.time()
-
-            # cycle loop (zyklisch)
-            while (
-                    self.running
-                    and my_run_id == self.run_id
-                    and my_set_token == self.active_set_token
-            ):
-                # press keys in order
-                for k in sw.get_keys():
-                    if not (
-                            self.running
-                            and my_run_id == self.run_id
-                            and my_set_token == self.active_set_token
-                    ):
-                        break
-                    press_key_text(k)
-                    time.sleep(sw.inner_ms.value() / 1000.0)
-
-                # repeat pause zwischen Zyklen (WICHTIG!)
-                time.sleep(sw.repeat_ms.value() / 1000.0)
-
-                # =====================================================
-                # SET-WECHSEL NACH EINEM VOLLSTÄNDIGEN DURCHLAUF
-                # =====================================================
-
-                # 1️⃣ Jump-Back hat PRIORITÄT
-                if sw.cb_jump_back.isChecked():
-                    current_index = max(1, sw.jump_back_target.value()) - 1
-                    self.active_set_token += 1
-                    break
-
-                # 2️⃣ Switch to target set (nach Zeit ODER sofort)
-                if sw.cb_switch.isChecked():
-                    dur = sw.sw_min.value() * 60 + sw.sw_sec.value()
-
-                    # Zeit = 0  → sofort nach einem Durchlauf
-                    # Zeit > 0  → nur wenn Zeit erreicht
-                    if dur == 0 or (time.time() - set_start_time) >= dur:
-                        current_index = max(1, sw.sw_target.value()) - 1
-                        self.active_set_token += 1
-                        break
-
-    def _single_click_cycle(self, sw: SetWidget):
-        try:
-            if sw.cb_positions.isChecked() and sw.positions:
-                active = [p for p in sw.positions if p.enabled]
-                if active:
-                    for p in active:
-                        move_and_left_click(p.x, p.y, settle_ms=10)
-                else:
-                    ms.click(Button.left)
-            else:
-                ms.click(Button.left)
-        except Exception:
-            pass
-
-    def _start_set_threads(self, my_run_id: int, my_set_token: int, sw: SetWidget):
-        # CLICK INTERVAL THREAD
-        if sw.cb_click.isChecked() and sw.cb_click_interval.isChecked():
-            def click_loop():
-                while (
-                        self.running
-                        and my_run_id == self.run_id
-                        and my_set_token == self.active_set_token
-                        and sw is self.current_set_widget()  # 🔥 DAS IST DER FIX
-                        and sw.cb_click.isChecked()
-                        and sw.cb_click_interval.isChecked()):
-                    try:
-                        global_iv = sw.global_click_interval.value()
-
-                        if sw.cb_positions.isChecked() and sw.positions:
-                            active_positions = [p for p in sw.positions if p.enabled]
-                            if not active_positions:
-                                ms.click(Button.left)
-                                time.sleep(global_iv / 1000.0)
-                                continue
-
-                            for p in active_positions:
-                                if not (self.running and my_run_id == self.run_id and my_set_token == self.active_set_token):
-                                    return
-                                move_and_left_click(p.x, p.y, settle_ms=10)
-                                iv = p.interval_ms if p.interval_ms > 0 else global_iv
-                                time.sleep(iv / 1000.0)
-                        else:
-                            ms.click(Button.left)
-                            time.sleep(global_iv / 1000.0)
-                    except Exception:
-                        time.sleep(0.05)
-
-            self.click_thread = Thread(target=click_loop, daemon=True)
-            self.click_thread.start()
 # -------------------------------
 # Main window
 # -------------------------------
 class MainWindow(QWidget):
     mouse_pos_signal = pyqtSignal(int, int)
+    # Hotkey-Thread -> GUI-Thread
+    pos_hotkey_signal = pyqtSignal()
+    record_stop_signal = pyqtSignal()
+    warning_signal = pyqtSignal(str)
+    # Autosave-Thread -> GUI-Thread
+    save_error_signal = pyqtSignal(str)
     def __init__(self):
         super().__init__()
 
@@ -1835,9 +2394,28 @@ class MainWindow(QWidget):
             "stop": "F6",
             "pos": "F7",
         }
+        self.spin_us = DEFAULT_SPIN_US
+        self.out_of_process = False
+
+        # Alle Profile der Datei; Tabs gibt es nur für geöffnete
+        self.library = ProfileLibrary()
+        self._plus_tab: Optional[QWidget] = None
+        # SQLite-Speicher, aus dem die Bibliothek Profildaten nachlädt (None = JSON)
+        self._store: Optional[SqliteStore] = None
+
+        # Autosave: Änderungen sammeln, Snapshot im Hintergrund schreiben
+        self.autosaver = AutoSaver(on_error=lambda path, e: self.save_error_signal.emit(str(e)))
+        self.save_error_signal.connect(self._on_save_error)
+        self._autosave_timer = QTimer(self)
+        self._autosave_timer.setSingleShot(True)
+        self._autosave_timer.setInterval(AUTOSAVE_DEBOUNCE_MS)
+        self._autosave_timer.timeout.connect(self.save_profiles_default)
         self._awaiting_click_position = False
         self.resize(DEFAULT_WINDOW_SIZE)
 
+        # Gemeinsame Engine: ein Scheduler-Thread für alle laufenden Profile
+        self.engine = Engine(get_backend())
+
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(12, 12, 12, 0)
         main_layout.setSpacing(1)
@@ -1847,6 +2425,9 @@ class MainWindow(QWidget):
         self.tabs.tabCloseRequested.connect(self._on_close_profile_tab)
         self.tabs.tabBarClicked.connect(self._on_profile_tab_clicked)
         self.tabs.tabBarDoubleClicked.connect(self._on_profile_tab_double_clicked)
+        # aktuelles Profil für den Hotkey-Thread, nur im GUI-Thread gesetzt
+        self._active_profile: Optional[ProfileWidget] = None
+        self.tabs.currentChanged.connect(self._on_current_profile_changed)
         main_layout.addWidget(self.tabs)
 
         controls = QHBoxLayout()
@@ -1869,9 +2450,15 @@ class MainWindow(QWidget):
         self.btn_load.clicked.connect(self.load_profiles_from_file)
         controls.addWidget(self.btn_load)
 
+        self.btn_library = QPushButton("")
+        self.btn_library.setObjectName("badge")
+        self.btn_library.clicked.connect(self.open_library_dialog)
+        controls.addWidget(self.btn_library)
+
         make_button_big(self.btn_save, min_w=150, min_h=35, font_pt=11)
         make_button_big(self.btn_save_as, min_w=150, min_h=35, font_pt=11)
         make_button_big(self.btn_load, min_w=150, min_h=35, font_pt=11)
+        make_button_big(self.btn_library, min_w=150, min_h=35, font_pt=11)
 
         # Zahnrad Button (Settings)
         self.btn_settings = QPushButton("⚙")
@@ -1884,6 +2471,17 @@ class MainWindow(QWidget):
         controls.addWidget(self.btn_settings)
 
         controls.addStretch()
+
+        # Gesamt-Events/s aller laufenden Profile
+        self.lbl_engine = QLabel("")
+        self.lbl_engine.setStyleSheet("color: #888;")
+        controls.addWidget(self.lbl_engine)
+        self._engine_prev = (0, time.perf_counter())
+        self._engine_timer = QTimer(self)
+        self._engine_timer.setInterval(STATS_REFRESH_MS)
+        self._engine_timer.timeout.connect(self._refresh_engine_stats)
+        self._engine_timer.start()
+
         main_layout.addLayout(controls)
 
         self.load_profiles_default()
@@ -1891,25 +2489,41 @@ class MainWindow(QWidget):
         # Qt Shortcuts (immer zuverlässig, wenn Fokus)
         self._qt_shortcuts = {}
         self._rebuild_qt_shortcuts()
-
+        self._hotkey_table = {}
+        self._rebuild_hotkey_table()
+
+        # Makro-Aufnahme: Tastatur über den Hotkey-Listener, Maus über einen
+        # eigenen Listener nur für die Dauer der Aufnahme
+        self._recorder: Optional[MacroRecorder] = None
+        self._recording_set: Optional[SetWidget] = None
+        self._record_listener = None
+
+        # Windows markiert injizierte Events selbst: schon im Hook verwerfen,
+        # sonst über das Ledger der Backends (inputs.INJECTED)
+        kb_filter = {}
+        self._ms_filter = {}
+        if sys.platform.startswith("win"):
+            kb_filter["win32_event_filter"] = lambda msg, data: not (data.flags & LLKHF_INJECTED)
+            self._ms_filter["win32_event_filter"] = lambda msg, data: not (data.flags & LLMHF_INJECTED)
 
         # Global hotkeys attempt (pynput)
         try:
-            self.listener = pynput_keyboard.Listener(on_press=self.on_hotkey)
+            self.listener = pynput_keyboard.Listener(
+                on_press=self.on_hotkey, on_release=self._on_key_release, **kb_filter
+            )
             self.listener.start()
         except Exception as e:
             print("Global Hotkeys deaktiviert:", e)
             self.listener = None
 
         self.mouse_pos_signal.connect(self._on_mouse_pos_signal)
+        self.pos_hotkey_signal.connect(self._on_pos_hotkey)
+        self.record_stop_signal.connect(lambda: self._stop_recording(drop_last_click=False))
+        self.warning_signal.connect(self._show_warning)
 
-        # ✅ Globaler Maus-Listener: fängt den nächsten echten Linksklick ab
-        try:
-            self.mouse_listener = pynput_mouse.Listener(on_click=self._on_global_mouse_click)
-            self.mouse_listener.start()
-        except Exception as e:
-            print("Global Mouse Listener deaktiviert:", e)
-            self.mouse_listener = None
+        # Globaler Maus-Listener nur während einer Positionserfassung
+        # (siehe _arm_position_capture), nicht während normaler Läufe
+        self.mouse_listener = None
 
         # Apply initial UI
         apply_theme(QApplication.instance(), self.theme)
@@ -1922,12 +2536,133 @@ class MainWindow(QWidget):
         self._apply_direction()
         self.setWindowTitle(tr(self.lang, "app_title"))
 
+    def _refresh_engine_stats(self):
+        self.engine.poll()
+        running = self.engine.running_count()
+        events = self.engine.total_events()
+        now = time.perf_counter()
+        prev_events, prev_t = self._engine_prev
+        self._engine_prev = (events, now)
+        if not running:
+            self.lbl_engine.setText("")
+            return
+        eps = max(0, events - prev_events) / (now - prev_t) if now > prev_t else 0.0
+        text = tr(self.lang, "engine_line", running=running, eps=f"{eps:.1f}")
+        control_us = self.engine.control_latency_us()
+        if control_us is not None:
+            text += tr(self.lang, "control_line", us=control_us)
+        self.lbl_engine.setText(text)
+
+    def _shutdown_profile_tab(self, index: int):
+        w = self.tabs.widget(index)
+        if isinstance(w, ProfileWidget):
+            w.shutdown()
+
+    def _switch_engine(self, out_of_process: bool):
+        # Runner im GUI-Prozess oder im eigenen Kindprozess (remote.py)
+        if out_of_process == isinstance(self.engine, RemoteEngine):
+            self.out_of_process = out_of_process
+            return
+        try:
+            if out_of_process:
+                engine = RemoteEngine(get_backend().name, self.spin_us)
+            else:
+                engine = Engine(get_backend())
+                engine.set_spin_window_us(self.spin_us)
+        except RuntimeError as e:
+            QMessageBox.warning(self, tr(self.lang, "error"), tr(self.lang, "process_error", err=e))
+            return
+
+        old = self.engine
+        old.stop_all()
+        self.engine = engine
+        for i in range(self.tabs.count()):
+            w = self.tabs.widget(i)
+            if isinstance(w, ProfileWidget):
+                old.remove_runner(w.runner)
+                w.attach_engine(engine)
+        old.close()
+        self.out_of_process = out_of_process
+
+    def _arm_position_capture(self):
+        # ✅ fängt den nächsten echten Linksklick ab, danach wird der Hook entfernt
+        self._awaiting_click_position = True
+        listener = self.mouse_listener
+        if listener is not None and listener.running:
+            return
+        try:
+            self.mouse_listener = pynput_mouse.Listener(on_click=self._on_global_mouse_click, **self._ms_filter)
+            self.mouse_listener.start()
+        except Exception as e:
+            print("Global Mouse Listener deaktiviert:", e)
+            self.mouse_listener = None
+
+    def toggle_recording(self, sw: "SetWidget"):
+        if self._recorder is not None:
+            self._stop_recording()
+            return
+        self._recorder = MacroRecorder()
+        self._recording_set = sw
+        if not sys.platform.startswith("win"):
+            # ein laufendes Set soll sich nicht selbst aufnehmen
+            INJECTED.watch_all(True)
+        try:
+            self._record_listener = pynput_mouse.Listener(
+                on_move=self._on_record_move,
+                on_click=self._on_record_click,
+                **self._ms_filter,
+            )
+            self._record_listener.start()
+        except Exception as e:
+            print("Global Mouse Listener deaktiviert:", e)
+            self._record_listener = None
+        sw.set_recording(True)
+
+    def _stop_recording(self, drop_last_click: bool = True):
+        # drop_last_click: beendet per Klick auf den Button, der Klick gehört nicht ins Makro
+        rec, sw = self._recorder, self._recording_set
+        if rec is None:
+            return
+        self._recorder = None
+        self._recording_set = None
+        if self._record_listener is not None:
+            self._record_listener.stop()
+            self._record_listener = None
+        if not sys.platform.startswith("win"):
+            INJECTED.watch_all(False)
+        track = rec.stop(drop_last_click=drop_last_click)
+        try:
+            sw.set_recording(False)
+            sw.set_macro(track)
+        except RuntimeError:
+            # Set wurde während der Aufnahme geschlossen
+            pass
+
+    # Aufnahme-Listener: injizierte Events verwerfen wie bei den Hotkeys. Loslassen
+    # ohne aufgenommenes Drücken verwirft der Recorder selbst.
+    def _on_record_move(self, x, y):
+        rec = self._recorder
+        if rec is not None and not INJECTED.consume(MOVE_TOKEN, (int(x), int(y))):
+            rec.move(x, y)
+
+    def _on_record_click(self, x, y, button, pressed):
+        rec = self._recorder
+        if rec is None:
+            return
+        if pressed and INJECTED.consume(button_token(button.name), (int(x), int(y))):
+            return
+        rec.button(button.name, x, y, pressed)
+
     def _on_global_mouse_click(self, x, y, button, pressed):
         if not pressed or button != Button.left:
             return
+        if INJECTED.consume(CLICK_TOKEN, (int(x), int(y))):
+            return
 
         # NUR Signal senden – KEINE GUI-Logik hier!
         self.mouse_pos_signal.emit(int(x), int(y))
+        # False beendet den pynput-Listener
+        return False
 
     def _on_mouse_pos_signal(self, x: int, y: int):
         if not self._awaiting_click_position:
@@ -1954,6 +2689,20 @@ class MainWindow(QWidget):
             QKeySequence(self.hotkeys["pos"]), self, activated=self._qt_add_pos
         )
 
+    def _rebuild_hotkey_table(self):
+        # Token -> Aktion, einmal pro Hotkey-Änderung statt upper() pro Event
+        table = {}
+        for action, text in self.hotkeys.items():
+            t = (text or "").strip()
+            if not t:
+                continue
+            table[t.lower()] = action
+            if len(t) == 1:
+                table[t.upper()] = action
+        self._hotkey_table = table
+        if not sys.platform.startswith("win"):
+            INJECTED.watch(set(table) | {CLICK_TOKEN})
+
     def _apply_direction(self):
         is_rtl = (self.lang == LANG_AR)
 
@@ -1984,8 +2733,13 @@ class MainWindow(QWidget):
             self.lang = result["lang"]
             self.theme = result["theme"]
             self.hotkeys = result["hotkeys"]
+            self._rebuild_hotkey_table()
+            self.spin_us = result["spin_us"]
+            self.engine.set_spin_window_us(self.spin_us)
+            self._switch_engine(result["out_of_process"])
 
             self._rebuild_qt_shortcuts()
+            self.schedule_autosave()
 
             apply_theme(QApplication.instance(), self.theme)
             self._apply_direction()
@@ -2000,6 +2754,7 @@ class MainWindow(QWidget):
         self.btn_save.setText(tr(self.lang, "save"))
         self.btn_save_as.setText(tr(self.lang, "save_as"))
         self.btn_load.setText(tr(self.lang, "load"))
+        self.btn_library.setText(tr(self.lang, "library"))
         self.btn_settings.setToolTip(tr(self.lang, "settings"))
 
         # "+" Tab
@@ -2043,7 +2798,7 @@ class MainWindow(QWidget):
     def _on_profile_tab_double_clicked(self, index):
         if index < 0:
             return
-        if self.tabs.tabText(index) == tr(self.lang, "plus_tab") or self.tabs.tabText(index) == "+":
+        if self.tabs.widget(index) is self._plus_tab:
             return
 
         old_name = self.tabs.tabText(index)
@@ -2060,11 +2815,39 @@ class MainWindow(QWidget):
             w = self.tabs.widget(index)
             if isinstance(w, ProfileWidget):
                 w.profile_name = new_name.strip()
+            if w.library_uid is not None:
+                self.library.update(w.library_uid, name=new_name.strip())
+            self.schedule_autosave()
 
     def current_profile(self) -> Optional[ProfileWidget]:
         w = self.tabs.currentWidget()
         return w if isinstance(w, ProfileWidget) else None
 
+    def _on_current_profile_changed(self, index: int):
+        if isinstance(self.tabs.widget(index), LazyTab):
+            self._materialize_profile(index)
+        self._active_profile = self.current_profile()
+        self.schedule_autosave()
+
+    def _materialize_profile(self, index: int):
+        # Profil wird zum ersten Mal angezeigt: Widgets aus den Daten bauen
+        lazy = self.tabs.widget(index)
+        name = self.tabs.tabText(index)
+        entry = self.library.get(lazy.library_uid)
+        pw = ProfileWidget(self, name)
+        pw.library_uid = lazy.library_uid
+        pw.apply_settings(self.library.ensure_data(entry) if entry is not None else lazy.data)
+
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, pw, name)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        lazy.deleteLater()
+
+    def _show_warning(self, key: str):
+        QMessageBox.warning(self, tr(self.lang, "error"), tr(self.lang, key))
+
     def _ui_add_position(self, pos):
         pw = self.current_profile()
         if not pw:
@@ -2097,41 +2880,63 @@ class MainWindow(QWidget):
             return
 
         # ✅ Sofort speichern (wie im alten Code)
-        sw.add_position_from_mouse(ms.position)
+        sw.add_position_from_mouse(get_backend().position())
 
     # Global hotkey handler (pynput)
     def on_hotkey(self, key):
+        # schneller Pfad für alle Nicht-Hotkeys, auch für injizierte Tasten
+        token = key_token(key)
+        action = self._hotkey_table.get(token)
+        if action is None:
+            rec = self._recorder
+            if rec is not None and token and not INJECTED.consume(token):
+                rec.key_down(token)
+            return
+        if INJECTED.consume(token):
+            return
+        if action == "stop" and self._recorder is not None:
+            # Stop-Hotkey beendet zuerst eine laufende Aufnahme
+            self.record_stop_signal.emit()
+            return
+        # Start/Stop gehen direkt in die Befehls-Queue der Engine,
+        # alles mit Widgets läuft über Signale im GUI-Thread
+        issued_ns = time.perf_counter_ns()
         try:
-            pw = self.current_profile()
+            pw = self._active_profile
             if not pw:
                 return
 
-            # pynput-Key normalisieren
-            if hasattr(key, "name"):
-                key_name = key.name.upper()
-            elif hasattr(key, "char") and key.char:
-                key_name = key.char.upper()
-            else:
-                return
+            if action == "start":
+                pw.start(issued_ns)
 
-            if key_name == self.hotkeys["start"].upper():
-                pw.start()
+            elif action == "stop":
+                pw.stop(issued_ns)
 
-            elif key_name == self.hotkeys["stop"].upper():
-                pw.stop()
-
-            elif key_name == self.hotkeys["pos"].upper():
-                sw = pw.current_set_widget()
-                if sw and sw.cb_click.isChecked() and sw.cb_positions.isChecked():
-                    self._awaiting_click_position = True
-                    print("Warte auf nächsten Linksklick für Positionsspeicherung")
+            elif action == "pos":
+                self.pos_hotkey_signal.emit()
 
         except Exception as e:
             print("Hotkey-Fehler:", e)
 
+    def _on_key_release(self, key):
+        rec = self._recorder
+        if rec is None:
+            return
+        token = key_token(key)
+        if token and token not in self._hotkey_table:
+            rec.key_up(token)
+
+    def _on_pos_hotkey(self):
+        pw = self.current_profile()
+        sw = pw.current_set_widget() if pw else None
+        if sw and sw.cb_click.isChecked() and sw.cb_positions.isChecked():
+            self._arm_position_capture()
+            print("Warte auf nächsten Linksklick für Positionsspeicherung")
+
     # Profiles
     def add_profile(self, name: str, data: Optional[dict] = None):
         pw = ProfileWidget(self, name)
+        pw.library_uid = self.library.add(name, data, open=True).uid
         if isinstance(data, dict):
             pw.apply_settings(data)
         plus_index = self._profile_plus_index()
@@ -2143,31 +2948,30 @@ class MainWindow(QWidget):
         self.retranslate_all()
 
     def _add_profile_auto(self):
-        prefix = tr(self.lang, "profile_prefix")
+        # kleinste freie Nummer über den Namensindex der Bibliothek
+        self.add_profile(self.library.unique_name(tr(self.lang, "profile_prefix")))
 
-        used_numbers = set()
+    def open_library_dialog(self):
+        dlg = ProfileLibraryDialog(self)
+        if dlg.exec() == QDialog.DialogCode.Accepted and dlg.selected_uid is not None:
+            self.open_profile(dlg.selected_uid)
 
-        # Alle bestehenden Profil-Tabs durchgehen
+    def open_profile(self, uid: int):
+        # schon offen: nur hinwechseln (geöffnete Tabs sind wenige)
         for i in range(self.tabs.count()):
-            title = self.tabs.tabText(i)
-
-            # "+" überspringen
-            if title == tr(self.lang, "plus_tab") or title == "+":
-                continue
-
-            # Standardnamen erkennen: "Profil X"
-            if title.startswith(prefix + " "):
-                tail = title[len(prefix) + 1:].strip()
-                if tail.isdigit():
-                    used_numbers.add(int(tail))
-
-        # kleinste freie positive Zahl finden
-        n = 1
-        while n in used_numbers:
-            n += 1
-
-        name = f"{prefix} {n}"
-        self.add_profile(name)
+            if getattr(self.tabs.widget(i), "library_uid", None) == uid:
+                self.tabs.setCurrentIndex(i)
+                return
+        entry = self.library.get(uid)
+        if entry is None:
+            return
+        entry.open = True
+        lazy = LazyTab(entry.data)
+        lazy.library_uid = uid
+        plus_index = self._profile_plus_index()
+        idx = self.tabs.insertTab(plus_index if plus_index is not None else self.tabs.count(), lazy, entry.name)
+        # baut das Profil über currentChanged
+        self.tabs.setCurrentIndex(idx)
 
     def delete_current_profile(self):
         idx = self.tabs.currentIndex()
@@ -2187,18 +2991,39 @@ class MainWindow(QWidget):
         box.exec()
 
         if box.clickedButton() is btn_yes:
+            uid = getattr(self.tabs.widget(idx), "library_uid", None)
+            self._shutdown_profile_tab(idx)
             self.tabs.removeTab(idx)
+            if uid is not None:
+                self.library.remove(uid)
 
     # Save/Load
-    def collect_all_profiles(self) -> dict:
-        profiles = []
+    def collect_all_profiles(self, path: Optional[Path] = None) -> dict:
+        # geöffnete Profile in die Bibliothek übernehmen (Name kann übersetzt sein);
+        # nie angezeigte Profile behalten ihre geladenen Daten unverändert
         for i in range(self.tabs.count()):
             w = self.tabs.widget(i)
             if isinstance(w, ProfileWidget):
-                profiles.append({
-                    "name": self.tabs.tabText(i),
-                    "data": w.collect_settings()
-                })
+                self.library.update(w.library_uid, name=self.tabs.tabText(i), data=w.collect_settings())
+            elif isinstance(w, LazyTab) and w.library_uid is not None:
+                self.library.update(w.library_uid, name=self.tabs.tabText(i))
+
+        path = Path(path or self._last_used_path or SETTINGS_PATH)
+        if is_db_path(path):
+            store = self.autosaver.store_for(path)
+            if store is not self._store:
+                # anderer Speicher: alles mitnehmen, Zeilen-IDs neu vergeben
+                for e in self.library:
+                    self.library.ensure_data(e)
+                    e.store_id = None
+                self._use_store(store)
+            for e in self.library:
+                if e.store_id is None:
+                    e.store_id = store.allocate_id()
+            # data=None: Profil nie geöffnet, seine Zeilen bleiben unberührt
+            profiles = [e.to_dict(with_id=True) for e in self.library]
+        else:
+            profiles = [dict(e.to_dict(), data=self.library.ensure_data(e)) for e in self.library]
 
         return {
             "window_size": {
@@ -2206,13 +3031,21 @@ class MainWindow(QWidget):
                 "height": self.height()
             },
             "ui": {
-                "theme": self.theme
+                "theme": self.theme,
+                "spin_us": self.spin_us,
+                "out_of_process": self.out_of_process,
         },
-            "last_active_profile": self.tabs.currentIndex(),
+            # Name statt Tab-Index: geschlossene Profile haben keinen Tab
+            "last_active_profile": self._current_profile_name(),
             "last_file_path": str(self._last_used_path) if self._last_used_path else None,
             "profiles": profiles
         }
 
+    def _current_profile_name(self) -> Optional[str]:
+        uid = getattr(self.tabs.currentWidget(), "library_uid", None)
+        entry = self.library.get(uid) if uid is not None else None
+        return entry.name if entry is not None else None
+
     def apply_all_profiles(self, cfg: dict):
         # UI state restore
         ui = cfg.get("ui", {}) if isinstance(cfg, dict) else {}
@@ -2222,6 +3055,9 @@ class MainWindow(QWidget):
         if "theme" in ui:
             self.theme = ui["theme"]
 
+        self.spin_us = clamp_int(ui.get("spin_us"), 0, SPIN_MAX_US, DEFAULT_SPIN_US)
+        self.engine.set_spin_window_us(self.spin_us)
+
         self.resize(DEFAULT_WINDOW_SIZE)
         apply_theme(QApplication.instance(), self.theme)
         self._apply_direction()
@@ -2231,33 +3067,67 @@ class MainWindow(QWidget):
         if not cfg.get("window_size"):
             self.resize(DEFAULT_WINDOW_SIZE)
 
+        for i in range(self.tabs.count()):
+            self._shutdown_profile_tab(i)
         self.tabs.clear()
+        self.library.clear()
+        # erst nach dem Leeren wechseln: es gibt keine Runner umzuhängen
+        self._switch_engine(bool(ui.get("out_of_process", False)))
 
         profiles = cfg.get("profiles", []) if isinstance(cfg, dict) else []
-        last_idx = cfg.get("last_active_profile", 0)
+        last_name = last_active_name(cfg)
         last_path = cfg.get("last_file_path")
 
-        if last_path:
+        # SQLite: die geladene Datenbank bleibt das Speicherziel
+        if last_path and self._store is None:
             self._last_used_path = Path(last_path)
 
         if not profiles:
             self.add_profile(f"{tr(self.lang, 'profile_prefix')} 1")
             return
 
+        # alle Profile in die Bibliothek; Tabs (nur Daten, gebaut wird beim
+        # ersten Anzeigen) nur für geöffnete – ältere Dateien kennen kein "open"
         for p in profiles:
-            name = p.get("name", tr(self.lang, "profile_prefix"))
-            data = p.get("data", {})
-            self.add_profile(name, data if isinstance(data, dict) else None)
+            if not isinstance(p, dict):
+                continue
+            tags = p.get("tags", [])
+            self.library.add(
+                p.get("name", tr(self.lang, "profile_prefix")),
+                p.get("data"),
+                tags=tags if isinstance(tags, list) else [],
+                open=bool(p.get("open", True)),
+                # SQLite: nur Metadaten geladen, Tasten für die Suche liegen bei
+                keys=p.get("keys"),
+                store_id=p.get("id"),
+            )
+        open_entries = [e for e in self.library if e.open]
+        if not open_entries and len(self.library):
+            open_entries = [next(iter(self.library))]
+            open_entries[0].open = True
+
+        self.tabs.blockSignals(True)
+        for e in open_entries:
+            lazy = LazyTab(e.data)
+            lazy.library_uid = e.uid
+            self.tabs.addTab(lazy, e.name)
+        self._ensure_profile_plus_tab()
+        self.tabs.blockSignals(False)
 
         # 🔥 NEU: letztes aktives Profil korrekt setzen
         profile_tabs = [
             i for i in range(self.tabs.count())
-            if isinstance(self.tabs.widget(i), ProfileWidget)
+            if isinstance(self.tabs.widget(i), (ProfileWidget, LazyTab))
         ]
 
         if profile_tabs:
-            idx = profile_tabs[min(last_idx, len(profile_tabs) - 1)]
+            last = self.library.by_name(last_name) if last_name is not None else None
+            idx = next((i for i in profile_tabs
+                        if last is not None and self.tabs.widget(i).library_uid == last.uid), profile_tabs[0])
             self.tabs.setCurrentIndex(idx)
+            self._on_current_profile_changed(idx)
+        else:
+            self.add_profile(f"{tr(self.lang, 'profile_prefix')} 1")
 
         self.retranslate_all()
 
@@ -2266,19 +3136,22 @@ class MainWindow(QWidget):
         if self.lang != LANG_AR:
             self._last_ltr_size = self.size()
 
+    def schedule_autosave(self):
+        # jede Änderung startet den Timer neu
+        self._autosave_timer.start()
+
     def save_profiles_default(self):
-        path = self._last_used_path or SETTINGS_PATH
-        try:
-            Path(path).write_text(
-                json.dumps(self.collect_all_profiles(), indent=2),
-                encoding="utf-8"
-            )
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                tr(self.lang, "save_error_title"),
-                tr(self.lang, "save_error_text", err=e)
-            )
+        # Snapshot im GUI-Thread, Serialisieren und Schreiben im Hintergrund
+        self._autosave_timer.stop()
+        path = Path(self._last_used_path or SETTINGS_PATH)
+        self.autosaver.submit(path, self.collect_all_profiles(path))
+
+    def _on_save_error(self, err: str):
+        QMessageBox.critical(
+            self,
+            tr(self.lang, "save_error_title"),
+            tr(self.lang, "save_error_text", err=err)
+        )
 
     def save_profiles_as(self):
         path_str, _ = QFileDialog.getSaveFileName(
@@ -2291,26 +3164,42 @@ class MainWindow(QWidget):
         if not path_str:
             return
         try:
-            Path(path_str).write_text(json.dumps(self.collect_all_profiles(), indent=2), encoding="utf-8")
-            self._last_used_path = Path(path_str)
+            path = Path(path_str)
+            self.autosaver.write_now(path, self.collect_all_profiles(path))
+            self._last_used_path = path
         except Exception as e:
             QMessageBox.critical(self, tr(self.lang, "save_error_title"), tr(self.lang, "save_error_text", err=e))
 
+    def _use_store(self, store: Optional[SqliteStore]):
+        self._store = store
+        self.library.loader = (lambda e: store.load_profile_data(e.store_id)) if store is not None else None
+
+    def _read_config(self, path: Path) -> dict:
+        # SQLite: nur Metadaten, Sets lädt die Bibliothek beim Öffnen nach
+        if is_db_path(path):
+            return self.autosaver.store_for(path).load_meta()
+        # JSON: geprüfter Stand aus dem Cache, solange die Datei unverändert ist
+        cfg, digest = load_config(path)
+        self.autosaver.remember(path, digest)
+        return cfg
+
     def load_profiles_default(self):
-        self._last_used_path = SETTINGS_PATH
+        path = SETTINGS_DB_PATH if SETTINGS_DB_PATH.exists() else SETTINGS_PATH
+        self._last_used_path = path
 
-        if not SETTINGS_PATH.exists():
+        if not path.exists():
             self.add_profile(f"{tr(self.lang, 'profile_prefix')} 1")
             return
 
         try:
-            cfg = json.loads(SETTINGS_PATH.read_text(encoding="utf-8"))
+            cfg = self._read_config(path)
         except Exception as e:
             QMessageBox.critical(self, tr(self.lang, "load_error_title"), tr(self.lang, "load_error_text", err=e))
             self.add_profile(f"{tr(self.lang, 'profile_prefix')} 1")
             return
 
-        self.apply_all_profiles(cfg if isinstance(cfg, dict) else {})
+        self._use_store(self.autosaver.store_for(path) if is_db_path(path) else None)
+        self.apply_all_profiles(cfg)
 
     def load_profiles_from_file(self):
         start_dir = (
@@ -2329,21 +3218,27 @@ class MainWindow(QWidget):
         if not path_str:
             return
         try:
-            cfg = json.loads(Path(path_str).read_text(encoding="utf-8"))
+            cfg = self._read_config(Path(path_str))
             self._last_used_path = Path(path_str)
         except Exception as e:
             QMessageBox.critical(self, tr(self.lang, "load_error_title"), tr(self.lang, "load_error_text", err=e))
             return
 
-        profiles = cfg.get("profiles", []) if isinstance(cfg, dict) else []
+        profiles = cfg.get("profiles", [])
         if not profiles:
             QMessageBox.warning(self, tr(self.lang, "no_profiles_title"), tr(self.lang, "no_profiles_text"))
             return
 
+        path = self._last_used_path
+        self._use_store(self.autosaver.store_for(path) if is_db_path(path) else None)
         self.apply_all_profiles(cfg)
 
     def closeEvent(self, event):
+        self._stop_recording()
+        self.engine.stop_all()
         self.save_profiles_default()
+        self.autosaver.flush(5.0)
+        self.engine.close()
 
         try:
             if getattr(self, "mouse_listener", None):
@@ -2354,14 +3249,15 @@ class MainWindow(QWidget):
         super().closeEvent(event)
 
     def _profile_plus_index(self):
-        for i in range(self.tabs.count()):
-            if self.tabs.tabText(i) == tr(self.lang, "plus_tab") or self.tabs.tabText(i) == "+":
-                return i
+        # "+" ist immer der letzte Tab
+        last = self.tabs.count() - 1
+        if last >= 0 and self.tabs.widget(last) is self._plus_tab:
+            return last
         return None
 
     def _ensure_profile_plus_tab(self):
         if self._profile_plus_index() is None:
-            plus = QWidget()
+            self._plus_tab = plus = QWidget()
             idx = self.tabs.addTab(plus, tr(self.lang, "plus_tab"))
             self.tabs.tabBar().setTabButton(
                 idx,
@@ -2380,12 +3276,12 @@ class MainWindow(QWidget):
                 )
 
     def _on_profile_tab_clicked(self, index):
-        if self.tabs.tabText(index) == tr(self.lang, "plus_tab") or self.tabs.tabText(index) == "+":
+        if index >= 0 and self.tabs.widget(index) is self._plus_tab:
             self._add_profile_auto()
 
     def _on_close_profile_tab(self, index):
         # "+" darf nicht geschlossen werden
-        if self.tabs.tabText(index) == tr(self.lang, "plus_tab") or self.tabs.tabText(index) == "+":
+        if self.tabs.widget(index) is self._plus_tab:
             return
 
         # mindestens ein Profil behalten
@@ -2403,10 +3299,18 @@ class MainWindow(QWidget):
         if index >= self.tabs.count() - 1:
             new_index = index - 1
 
+        # Tab schließen, das Profil bleibt in der Bibliothek
+        w = self.tabs.widget(index)
+        if isinstance(w, ProfileWidget):
+            self.library.update(w.library_uid, data=w.collect_settings())
+        entry = self.library.get(getattr(w, "library_uid", None))
+        if entry is not None:
+            entry.open = False
+        self._shutdown_profile_tab(index)
         self.tabs.removeTab(index)
 
         # "+"-Tab überspringen
-        if new_index >= 0 and (self.tabs.tabText(new_index) == tr(self.lang, "plus_tab") or self.tabs.tabText(new_index) == "+"):
+        if new_index >= 0 and self.tabs.widget(new_index) is self._plus_tab:
             new_index -= 1
 
         if new_index >= 0:
@@ -2417,6 +3321,13 @@ class MainWindow(QWidget):
 # Main
 # -------------------------------
 if __name__ == "__main__":
+    # Eingabe-Backend (BUTTON_MASHER_BACKEND) vor allen Widgets festlegen
+    try:
+        select_backend()
+    except ValueError as e:
+        print(e)
+        select_backend("pynput")
+
     app = QApplication(sys.argv)
     from PyQt6.QtWidgets import QStyleFactory
     app.setStyle(QStyleFactory.create("Fusion"))
@@ -0,0 +1,294 @@
+"""
+Runner im eigenen Prozess (multiprocessing, ohne Qt).
+
+Die GUI hält eine Befehls-Pipe zum Kindprozess: sie schickt Start/Stop und
+Set-Daten (dieselben Dicts wie SetWidget.to_dict()), der Kindprozess
+kompiliert sie mit seinem eigenen Backend und führt sie auf einer eigenen
+engine.Engine aus. Ein modaler Dialog oder ein langes Neuaufbauen der
+Oberfläche hält dort keinen GIL mehr fest.
+
+Anders als engine.Engine bekommt RemoteEngine.create_runner die Set-Daten
+statt der Pläne; Änderungen schickt die GUI per update_sets/update_set.
+
+Befehle (Tupel, erstes Element = Name):
+    ("start", rid, sets, index, issued_ns)   Runner anlegen/aktualisieren und starten
+    ("update", rid, sets)                    neue Set-Daten, greifen an der Zyklusgrenze
+    ("update_set", rid, index, data)         nur ein Set neu, ebenso an der Zyklusgrenze
+    ("stop", rid, issued_ns)                 Runner stoppen
+    ("seek", rid, index, t_ms, issued_ns)    Makro von Set index ab t_ms abspielen (nur wenn aktiv)
+    ("remove", rid)                          Runner stoppen und verwerfen
+    ("spin", us)                             Spin-Fenster setzen
+    ("stats",)    -> ({rid: (running, skipped, {set: snapshot})}, control_p99_us)
+                     Antwort über eine eigene Pipe: Befehle warten nie auf Statistik;
+                     für noch nicht ausgeführte Start/Stop steht dort der Zustand danach
+    ("quit",)
+
+perf_counter_ns ist auf allen Plattformen eine systemweite monotone Uhr;
+issued_ns aus dem GUI-Prozess ist im Kindprozess also direkt vergleichbar.
+"""
+import itertools
+import multiprocessing
+import time
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from engine import compile_set, compile_sets, set_spin_window_us, Engine, DEFAULT_SPIN_US
+
+START_TIMEOUT_S = 10.0
+REPLY_TIMEOUT_S = 0.5
+
+
+# -------------------------------
+# Child process
+# -------------------------------
+def child_main(conn, stats_conn, backend_name: str, spin_us: int):
+    from inputs import select_backend
+    try:
+        backend = select_backend(backend_name)
+    except ValueError as e:
+        conn.send(("error", str(e)))
+        conn.close()
+        return
+    set_spin_window_us(spin_us)
+    conn.send(("ready",))
+
+    engine = Engine(backend, name="runner:process")
+    runners: Dict[int, object] = {}
+    plans: Dict[int, tuple] = {}
+
+    def ensure(rid: int):
+        if rid not in runners:
+            runners[rid] = engine.create_runner(lambda rid=rid: plans.get(rid, ()))
+        return runners[rid]
+
+    # Start/Stop gepostet, vom Scheduler noch nicht ausgeführt: rid -> (Nr., läuft danach).
+    # Die Statistik meldet diesen Zustand, sonst flackert "running" direkt nach dem Befehl.
+    pending: Dict[int, tuple] = {}
+    pending_lock = Lock()
+    pending_seq = itertools.count()
+
+    def post_control(rid: int, running_after: bool, issued_ns: int, fn, *args):
+        n = next(pending_seq)
+        with pending_lock:
+            pending[rid] = (n, running_after)
+        engine.scheduler.post(issued_ns, applied, rid, n, fn, args)
+
+    def applied(rid: int, n: int, fn, args: tuple):
+        # Scheduler-Thread
+        try:
+            fn(*args)
+        finally:
+            with pending_lock:
+                if pending.get(rid, (None,))[0] == n:
+                    del pending[rid]
+
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            # GUI-Prozess ist weg
+            break
+        cmd = msg[0]
+        if cmd == "start":
+            _, rid, sets, index, issued_ns = msg
+            plans[rid] = compile_sets(sets, backend.resolve_key)
+            post_control(rid, True, issued_ns, ensure(rid).start, index)
+        elif cmd == "update":
+            _, rid, sets = msg
+            plans[rid] = compile_sets(sets, backend.resolve_key)
+        elif cmd == "update_set":
+            _, rid, index, data = msg
+            old = plans.get(rid, ())
+            if 0 <= index < len(old):
+                plans[rid] = old[:index] + (compile_set(data, backend.resolve_key),) + old[index + 1:]
+        elif cmd == "stop":
+            if msg[1] in runners:
+                post_control(msg[1], False, msg[2], runners[msg[1]].stop)
+        elif cmd == "seek":
+            if msg[1] in runners:
+                runners[msg[1]].request_seek(msg[2], msg[3], msg[4])
+        elif cmd == "remove":
+            runner = runners.pop(msg[1], None)
+            plans.pop(msg[1], None)
+            with pending_lock:
+                pending.pop(msg[1], None)
+            if runner is not None:
+                engine.remove_runner(runner)
+        elif cmd == "spin":
+            set_spin_window_us(msg[1])
+        elif cmd == "stats":
+            # erst die offenen Befehle, dann den Runner lesen: was dazwischen
+            # ausgeführt wird, steht danach schon in r.running
+            with pending_lock:
+                after = {rid: state for rid, (_, state) in pending.items()}
+            stats_conn.send(({
+                rid: (after.get(rid, r.running), r.skipped, r.stats_snapshot())
+                for rid, r in runners.items()
+            }, engine.control_latency_us()))
+        elif cmd == "quit":
+            break
+
+    engine.stop_all()
+    backend.close()
+
+
+# -------------------------------
+# GUI side
+# -------------------------------
+class RemoteRunner:
+    """Stellvertreter für engine.ProfileRunner; Zustand aus dem letzten poll()."""
+
+    def __init__(self, engine: "RemoteEngine", rid: int, get_sets: Callable[[], list]):
+        self.engine = engine
+        self.rid = rid
+        self.get_sets = get_sets
+        self.running = False
+        self.skipped = 0
+        self._snapshot: dict = {}
+
+    def request_start(self, index: int = 0, issued_ns: Optional[int] = None):
+        issued_ns = issued_ns or time.perf_counter_ns()
+        if self.engine.send(("start", self.rid, self.get_sets(), index, issued_ns)):
+            self.running = True
+
+    def request_stop(self, issued_ns: Optional[int] = None):
+        # erst senden: ein paralleles poll() liefert danach den gestoppten Zustand
+        self.engine.send(("stop", self.rid, issued_ns or time.perf_counter_ns()))
+        self.running = False
+
+    def request_seek(self, index: int, t_ms: int, issued_ns: Optional[int] = None):
+        self.engine.send(("seek", self.rid, index, t_ms, issued_ns or time.perf_counter_ns()))
+
+    start = request_start
+    stop = request_stop
+
+    def update_sets(self, sets: list):
+        if self.running:
+            self.engine.send(("update", self.rid, sets))
+
+    def update_set(self, index: int, data: dict):
+        if self.running:
+            self.engine.send(("update_set", self.rid, index, data))
+
+    def stats_snapshot(self) -> dict:
+        return self._snapshot
+
+    def total_events(self) -> int:
+        return sum(s[0] for s in self._snapshot.values())
+
+
+class RemoteEngine:
+    """Schnittstelle wie engine.Engine (außer create_runner), ausgeführt im Kindprozess."""
+
+    def __init__(self, backend_name: str, spin_us: int = DEFAULT_SPIN_US):
+        # spawn: kein fork eines Prozesses mit Qt- und pynput-Threads
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child = ctx.Pipe()
+        # Statistik-Antworten getrennt: poll() wartet darauf, ohne den Sende-Lock zu halten
+        self._stats, child_stats = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(
+            target=child_main, args=(child, child_stats, backend_name, spin_us),
+            name="button-masher-runner", daemon=True,
+        )
+        self.process.start()
+        child.close()
+        child_stats.close()
+
+        self._lock = Lock()
+        self._next_id = 0
+        self.runners: list = []
+        self._control_us: Optional[int] = None
+
+        if not self._conn.poll(START_TIMEOUT_S):
+            self._kill()
+            raise RuntimeError("Runner-Prozess antwortet nicht")
+        reply = self._conn.recv()
+        if reply[0] != "ready":
+            self._kill()
+            raise RuntimeError(reply[1])
+
+    def send(self, msg: tuple) -> bool:
+        # Aufrufe kommen aus GUI- und Hotkey-Thread
+        with self._lock:
+            try:
+                self._conn.send(msg)
+                return True
+            except (OSError, ValueError) as e:
+                print("[Runner-Prozess ERROR]", repr(e))
+                return False
+
+    def create_runner(self, get_sets: Callable[[], list]) -> RemoteRunner:
+        # übertragen werden Set-Daten, der Kindprozess kompiliert selbst
+        self._next_id += 1
+        runner = RemoteRunner(self, self._next_id, get_sets)
+        self.runners.append(runner)
+        return runner
+
+    def remove_runner(self, runner: RemoteRunner):
+        runner.running = False
+        self.send(("remove", runner.rid))
+        if runner in self.runners:
+            self.runners.remove(runner)
+
+    def stop_all(self):
+        for r in list(self.runners):
+            r.stop()
+
+    def running_count(self) -> int:
+        return sum(1 for r in self.runners if r.running)
+
+    def total_events(self) -> int:
+        return sum(r.total_events() for r in self.runners)
+
+    def control_latency_us(self) -> Optional[int]:
+        return self._control_us
+
+    def set_spin_window_us(self, us: int):
+        self.send(("spin", us))
+
+    def poll(self):
+        """
+        Statistiken aller Runner abholen (nur GUI-Timer, niedrige Frequenz).
+        Gewartet wird auf der Statistik-Pipe; Start/Stop aus anderen Threads
+        gehen währenddessen ungehindert über send().
+        """
+        if not self.send(("stats",)):
+            self._mark_stopped()
+            return
+        try:
+            if not self._stats.poll(REPLY_TIMEOUT_S):
+                return
+            # verspätete Antworten eines früheren Aufrufs überspringen
+            reply = self._stats.recv()
+            while self._stats.poll(0):
+                reply = self._stats.recv()
+        except (EOFError, OSError, ValueError) as e:
+            print("[Runner-Prozess ERROR]", repr(e))
+            self._mark_stopped()
+            return
+        stats, self._control_us = reply
+        for r in self.runners:
+            running, skipped, snapshot = stats.get(r.rid, (False, 0, {}))
+            r.running = running
+            r.skipped = skipped
+            r._snapshot = snapshot
+
+    def _mark_stopped(self):
+        # Kindprozess nicht erreichbar
+        for r in self.runners:
+            r.running = False
+
+    def close(self):
+        self.send(("quit",))
+        self.process.join(1.0)
+        if self.process.is_alive():
+            self._kill()
+        self._conn.close()
+        self._stats.close()
+
+    def _kill(self):
+        try:
+            self.process.terminate()
+            self.process.join(1.0)
+        except Exception:
+            pass
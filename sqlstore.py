@@ -0,0 +1,258 @@
+"""
+SQLite-Speicher für Profile (optional, ohne Qt-Abhängigkeit).
+
+Wird benutzt, wenn die Profil-Datei auf .db/.sqlite endet. Jedes Profil und
+jedes Set ist eine Zeile; save() vergleicht mit dem zuletzt gelesenen bzw.
+geschriebenen Stand und schreibt nur geänderte Zeilen in einer Transaktion.
+Beim Laden werden zunächst nur die Profil-Metadaten gelesen (Name, Tags,
+offen, Tasten für die Suche), Sets erst beim Öffnen eines Profils.
+
+Konfiguration im selben Format wie die JSON-Datei, mit zwei Abweichungen
+pro Profil: "id" (Zeilen-ID) und "data" = None für nie geladene Profile.
+
+    python sqlstore.py import button_masher_profiles.json profiles.db
+    python sqlstore.py export profiles.db button_masher_profiles.json
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List
+
+from library import profile_keys
+
+DB_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+META_KEYS = ("window_size", "ui", "last_active_profile", "last_file_path")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profiles (
+    id       INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name     TEXT NOT NULL,
+    tags     TEXT NOT NULL DEFAULT '[]',
+    open     INTEGER NOT NULL DEFAULT 1,
+    keys     TEXT NOT NULL DEFAULT '',
+    extra    TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS sets (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position   INTEGER NOT NULL,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (profile_id, position)
+);
+"""
+
+
+def is_db_path(path) -> bool:
+    return Path(path).suffix.lower() in DB_SUFFIXES
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class SqliteStore:
+    """
+    Eine Verbindung, geschützt durch einen Lock: gelesen wird im GUI-Thread
+    (Profil öffnen), geschrieben im Autosave-Thread. WAL hält Lesezugriffe
+    anderer Prozesse während des Schreibens offen.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+
+        # zuletzt gelesener/geschriebener Stand: nur Abweichungen werden geschrieben
+        self._meta: Dict[str, str] = {}
+        self._profiles: Dict[int, tuple] = {}     # id -> (position, name, tags, open)
+        self._content: Dict[int, tuple] = {}      # id -> (keys, extra)
+        self._sets: Dict[int, List[str]] = {}     # id -> Set-JSON je Position
+        # Metadaten sofort lesen: save() in eine bestehende Datei überschreibt sie dann korrekt
+        self._rows = self._read_rows()
+        self._next_id = max(self._profiles, default=0) + 1
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def allocate_id(self) -> int:
+        with self._lock:
+            pid = self._next_id
+            self._next_id += 1
+            return pid
+
+    # Load
+    def _read_rows(self) -> list:
+        self._meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        rows = self._conn.execute(
+            "SELECT id, position, name, tags, open, keys, extra FROM profiles ORDER BY position"
+        ).fetchall()
+        self._profiles = {pid: (pos, name, tags, is_open) for pid, pos, name, tags, is_open, _, _ in rows}
+        self._content = {pid: (keys, extra) for pid, _, _, _, _, keys, extra in rows}
+        return rows
+
+    def load_meta(self) -> dict:
+        """Konfiguration ohne Set-Daten (profiles[i]["data"] = None)."""
+        with self._lock:
+            rows = self._rows if self._rows is not None else self._read_rows()
+            self._rows = None
+            cfg = {key: json.loads(value) for key, value in self._meta.items()}
+            cfg["profiles"] = [
+                {
+                    "id": pid, "name": name, "tags": json.loads(tags),
+                    "open": bool(is_open), "keys": keys.split(), "data": None,
+                }
+                for pid, _, name, tags, is_open, keys, _ in rows
+            ]
+            return cfg
+
+    def load_profile_data(self, pid: int) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT extra FROM profiles WHERE id = ?", (pid,)).fetchone()
+            data = json.loads(row[0]) if row else {}
+            sets = [s for (s,) in self._conn.execute(
+                "SELECT data FROM sets WHERE profile_id = ? ORDER BY position", (pid,)
+            )]
+            self._sets[pid] = sets
+            data["sets"] = [json.loads(s) for s in sets]
+            return data
+
+    # Save
+    def save(self, cfg: dict) -> bool:
+        """Nur geänderte Zeilen schreiben; True, wenn etwas geschrieben wurde."""
+        with self._lock, self._conn:
+            self._rows = None
+            changed = False
+            c = self._conn
+
+            for key in META_KEYS:
+                if key not in cfg:
+                    continue
+                value = _dumps(cfg[key])
+                if self._meta.get(key) != value:
+                    c.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+                    self._meta[key] = value
+                    changed = True
+
+            seen = set()
+            for pos, p in enumerate(cfg.get("profiles", [])):
+                pid = p["id"]
+                seen.add(pid)
+                row = (pos, p.get("name", ""), _dumps(p.get("tags", [])), int(bool(p.get("open", True))))
+                if pid not in self._profiles:
+                    c.execute(
+                        "INSERT INTO profiles (id, position, name, tags, open) VALUES (?, ?, ?, ?, ?)",
+                        (pid,) + row,
+                    )
+                    self._profiles[pid] = row
+                    self._content[pid] = ("", "{}")
+                    self._sets[pid] = []
+                    changed = True
+                elif self._profiles[pid] != row:
+                    c.execute(
+                        "UPDATE profiles SET position = ?, name = ?, tags = ?, open = ? WHERE id = ?",
+                        row + (pid,),
+                    )
+                    self._profiles[pid] = row
+                    changed = True
+
+                data = p.get("data")
+                if data is None:
+                    # nie geöffnet: Sets in der Datenbank sind aktuell
+                    continue
+                changed |= self._save_sets(pid, data)
+
+            for pid in set(self._profiles) - seen:
+                c.execute("DELETE FROM sets WHERE profile_id = ?", (pid,))
+                c.execute("DELETE FROM profiles WHERE id = ?", (pid,))
+                del self._profiles[pid]
+                self._content.pop(pid, None)
+                self._sets.pop(pid, None)
+                changed = True
+
+            self._next_id = max([self._next_id] + [pid + 1 for pid in seen])
+            return changed
+
+    def _save_sets(self, pid: int, data: dict) -> bool:
+        c = self._conn
+        changed = False
+        extra = _dumps({k: v for k, v in data.items() if k != "sets"})
+        keys = " ".join(sorted(profile_keys(data)))
+        if self._content.get(pid) != (keys, extra):
+            c.execute("UPDATE profiles SET keys = ?, extra = ? WHERE id = ?", (keys, extra, pid))
+            self._content[pid] = (keys, extra)
+            changed = True
+
+        sets = data.get("sets", [])
+        new = [_dumps(s) for s in (sets if isinstance(sets, list) else [])]
+        old = self._sets.get(pid)
+        if old is None:
+            # Sets nie gelesen: aktuellen Stand aus der Datenbank holen
+            old = [s for (s,) in c.execute(
+                "SELECT data FROM sets WHERE profile_id = ? ORDER BY position", (pid,)
+            )]
+        for i, s in enumerate(new):
+            if i >= len(old) or old[i] != s:
+                c.execute("INSERT OR REPLACE INTO sets (profile_id, position, data) VALUES (?, ?, ?)", (pid, i, s))
+                changed = True
+        if len(old) > len(new):
+            c.execute("DELETE FROM sets WHERE profile_id = ? AND position >= ?", (pid, len(new)))
+            changed = True
+        self._sets[pid] = new
+        return changed
+
+
+# -------------------------------
+# JSON import/export
+# -------------------------------
+def import_json(cfg: dict, path: Path) -> SqliteStore:
+    store = SqliteStore(path)
+    # Pfad der alten JSON-Datei nicht übernehmen: sonst speichert die GUI wieder dorthin
+    cfg = {k: v for k, v in cfg.items() if k != "last_file_path"}
+    profiles = []
+    for p in cfg.get("profiles", []):
+        if isinstance(p, dict):
+            data = p.get("data")
+            profiles.append(dict(p, id=store.allocate_id(), data=data if isinstance(data, dict) else {}))
+    store.save(dict(cfg, profiles=profiles))
+    return store
+
+
+def export_json(store: SqliteStore) -> dict:
+    cfg = store.load_meta()
+    for p in cfg["profiles"]:
+        p["data"] = store.load_profile_data(p.pop("id"))
+        p.pop("keys", None)
+    return cfg
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 3 or argv[0] not in ("import", "export"):
+        print(__doc__.strip().splitlines()[-2].strip())
+        print(__doc__.strip().splitlines()[-1].strip())
+        return 2
+    cmd, src, dst = argv
+    if cmd == "import":
+        cfg = json.loads(Path(src).read_text(encoding="utf-8"))
+        import_json(cfg if isinstance(cfg, dict) else {}, Path(dst)).close()
+    else:
+        store = SqliteStore(Path(src))
+        Path(dst).write_text(json.dumps(export_json(store), indent=2), encoding="utf-8")
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
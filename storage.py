@@ -0,0 +1,222 @@
+"""
+Speichern der Profil-Datei ohne Qt-Abhängigkeit.
+
+- atomic_write_bytes: Temp-Datei im Zielordner + fsync + os.replace, ein
+  Absturz mitten im Schreiben lässt die alte Datei vollständig stehen
+- AutoSaver: Hintergrund-Thread, der jeweils nur den neuesten Snapshot
+  serialisiert und schreibt; unveränderter Inhalt (Hash) wird übersprungen
+- Pfade auf .db/.sqlite gehen an sqlstore.SqliteStore, der nur geänderte
+  Zeilen schreibt
+- load_config: geprüfte Konfiguration aus einem Binär-Cache neben der
+  JSON-Datei (marshal, Schlüssel Größe/mtime/Hash); geparst und geprüft
+  wird nur, wenn sich die Datei geändert hat
+"""
+import hashlib
+import json
+import marshal
+import os
+import tempfile
+from pathlib import Path
+from threading import Condition, Thread
+from typing import Callable, Dict, Optional, Tuple
+
+from engine import normalize_set
+from sqlstore import SqliteStore, is_db_path
+
+# erhöhen, wenn sich normalize_config ändert
+CACHE_VERSION = 2
+
+
+def dump_config(cfg: dict) -> bytes:
+    return json.dumps(cfg, indent=2).encode("utf-8")
+
+
+def content_hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+    # Umbenennung selbst dauerhaft machen (nur POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dfd = os.open(str(path.parent), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+        except OSError:
+            pass
+
+
+# -------------------------------
+# Parsed-config cache
+# -------------------------------
+def normalize_config(cfg: dict) -> dict:
+    """Profile geprüft und vollständig; ungültige Einträge fallen weg."""
+    cfg = dict(cfg) if isinstance(cfg, dict) else {}
+    profiles = []
+    for p in cfg.get("profiles", []) if isinstance(cfg.get("profiles"), list) else []:
+        if not isinstance(p, dict):
+            continue
+        data = p.get("data") if isinstance(p.get("data"), dict) else {}
+        sets = data.get("sets") if isinstance(data.get("sets"), list) else []
+        tags = p.get("tags") if isinstance(p.get("tags"), list) else []
+        profiles.append(dict(
+            p,
+            name=str(p.get("name", "")),
+            tags=[str(t) for t in tags],
+            open=bool(p.get("open", True)),
+            data=dict(data, sets=[normalize_set(s) for s in sets if isinstance(s, dict)]),
+        ))
+    cfg["profiles"] = profiles
+    return cfg
+
+
+def cache_path(path: Path) -> Path:
+    path = Path(path)
+    return path.with_name(f".{path.name}.cache")
+
+
+def _read_cache(path: Path) -> Optional[tuple]:
+    try:
+        entry = marshal.loads(cache_path(path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, tuple) or len(entry) != 5 or entry[0] != CACHE_VERSION:
+        return None
+    return entry
+
+
+def write_config_cache(path: Path, digest: bytes, cfg: dict):
+    """Cache für den aktuellen Stand von path; Fehler sind egal (nur ein Cache)."""
+    try:
+        st = os.stat(path)
+        data = marshal.dumps((CACHE_VERSION, st.st_size, st.st_mtime_ns, digest, cfg))
+        target = cache_path(path)
+        # ohne fsync: ein kaputter Cache wird beim Laden verworfen
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, target)
+    except (OSError, ValueError):
+        pass
+
+
+def load_config(path: Path) -> Tuple[dict, bytes]:
+    """(geprüfte Konfiguration, Hash des Dateiinhalts) – aus dem Cache, wenn möglich."""
+    path = Path(path)
+    st = os.stat(path)
+    entry = _read_cache(path)
+    # unveränderte Datei: nicht einmal lesen
+    if entry is not None and entry[1] == st.st_size and entry[2] == st.st_mtime_ns:
+        return entry[4], entry[3]
+
+    raw = path.read_bytes()
+    digest = content_hash(raw)
+    if entry is not None and entry[3] == digest:
+        # nur angefasst (kopiert, mtime neu): Inhalt ist derselbe
+        cfg = entry[4]
+    else:
+        cfg = normalize_config(json.loads(raw.decode("utf-8")))
+    write_config_cache(path, digest, cfg)
+    return cfg, digest
+
+
+class AutoSaver:
+    """
+    submit() legt nur den Snapshot ab (GUI-Thread, O(1)); der Writer-Thread
+    serialisiert ihn, vergleicht den Hash mit dem zuletzt geschriebenen bzw.
+    geladenen Stand und schreibt nur bei Änderungen. Kommen mehrere Snapshots,
+    bevor der Thread dran ist, gewinnt der neueste.
+    Fehler gehen an on_error(path, exc) – aus dem Writer-Thread.
+    """
+
+    def __init__(self, on_error: Optional[Callable[[Path, Exception], None]] = None):
+        self.on_error = on_error
+        self._cond = Condition()
+        self._pending: Dict[Path, dict] = {}
+        self._busy = False
+        self._hashes: Dict[Path, bytes] = {}
+        self._stores: Dict[Path, SqliteStore] = {}
+        self._thread: Optional[Thread] = None
+
+    def remember(self, path: Path, digest: bytes):
+        """Hash des Stands, der bereits auf der Platte liegt (siehe load_config)."""
+        with self._cond:
+            self._hashes[Path(path)] = digest
+
+    def store_for(self, path: Path) -> SqliteStore:
+        """Geöffneter SQLite-Speicher für path (einmal pro Pfad)."""
+        path = Path(path)
+        with self._cond:
+            store = self._stores.get(path)
+            if store is None:
+                store = self._stores[path] = SqliteStore(path)
+            return store
+
+    def submit(self, path: Path, cfg: dict):
+        # cfg darf danach nicht mehr verändert werden
+        with self._cond:
+            self._pending[Path(path)] = cfg
+            if self._thread is None:
+                self._thread = Thread(target=self._loop, name="autosave", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def write_now(self, path: Path, cfg: dict) -> bool:
+        """Synchron schreiben (Speichern unter …); False = Inhalt unverändert."""
+        path = Path(path)
+        with self._cond:
+            self._pending.pop(path, None)
+        return self._write(path, cfg)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Warten, bis alles geschrieben ist (closeEvent)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def _write(self, path: Path, cfg: dict) -> bool:
+        if is_db_path(path):
+            return self.store_for(path).save(cfg)
+        data = dump_config(cfg)
+        digest = content_hash(data)
+        with self._cond:
+            if self._hashes.get(path) == digest:
+                return False
+        atomic_write_bytes(path, data)
+        with self._cond:
+            self._hashes[path] = digest
+        # nächster Start liest den eigenen Stand direkt aus dem Cache
+        write_config_cache(path, digest, normalize_config(cfg))
+        return True
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._pending)
+                path = next(iter(self._pending))
+                cfg = self._pending.pop(path)
+                self._busy = True
+            try:
+                self._write(path, cfg)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(path, e)
+                else:
+                    print("[Autosave ERROR]", repr(e))
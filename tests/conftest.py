@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Module liegen im Projektverzeichnis (kein Paket)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
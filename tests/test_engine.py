@@ -0,0 +1,34 @@
+import threading
+import time
+
+from engine import compile_set, Engine
+from inputs import RecordingBackend, EV_KEY
+
+
+def test_profiles_share_one_scheduler_and_keep_their_rates():
+    backend = RecordingBackend()
+    engine = Engine(backend, name="test-engine")
+    # 6 ms bzw. 12 ms pro Durchlauf
+    fast = compile_set({"keys": "a", "inner_us": 1_000, "repeat_us": 5_000}, resolve=backend.resolve_key)
+    slow = compile_set({"keys": "b", "inner_us": 1_000, "repeat_us": 11_000}, resolve=backend.resolve_key)
+    r1 = engine.create_runner(lambda: (fast,))
+    r2 = engine.create_runner(lambda: (slow,))
+    threads = threading.active_count()
+    r1.start()
+    r2.start()
+    assert engine.running_count() == 2
+    assert threading.active_count() == threads + 1
+
+    time.sleep(0.4)
+    engine.remove_runner(r1)
+    assert not r1.running and r2.running
+    assert engine.running_count() == 1
+    n = backend.count
+    time.sleep(0.05)
+    keys = [a for _, kind, a, _ in backend.events() if kind == EV_KEY]
+    engine.close()
+
+    a, b = keys.count(ord("a")), keys.count(ord("b"))
+    assert a >= 30 and 1.5 < a / b < 2.5
+    assert all(k == ord("b") for k in keys[n:])     # nur noch das zweite Profil
+    assert engine.total_events() == r2.total_events()
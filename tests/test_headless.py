@@ -0,0 +1,65 @@
+import json
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import headless
+import inputs
+from inputs import EV_KEY
+
+
+@pytest.fixture
+def profile_file(tmp_path, monkeypatch):
+    # main() setzt Signal-Handler und das aktive Backend: nach dem Test zurücksetzen
+    saved = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+    monkeypatch.setattr(inputs, "_backend", None)
+    path = tmp_path / "profiles.json"
+    path.write_text(json.dumps({
+        "last_active_profile": "Tippen",
+        "profiles": [
+            {"name": "Farm", "data": {"sets": [{"keys": "a", "repeat_us": 5_000}]}},
+            {"name": "Tippen", "data": {"sets": [{"keys": "b", "repeat_us": 5_000}]}},
+            {"name": "Kaputt", "data": {"sets": [{"keys": "hold(a"}]}},
+        ],
+    }), encoding="utf-8")
+    yield path
+    for sig, handler in saved.items():
+        signal.signal(sig, handler)
+
+
+def run(path, *args) -> int:
+    return headless.main(["--file", str(path), "--backend", "recording", "--duration", "0.2", *args])
+
+
+def pressed(backend) -> set:
+    return {chr(a) for _, kind, a, _ in backend.events() if kind == EV_KEY}
+
+
+def test_runs_last_active_profile_by_default(profile_file):
+    assert run(profile_file) == 0
+    assert pressed(inputs.get_backend()) == {"b"}
+
+
+def test_runs_several_profiles_together(profile_file):
+    assert run(profile_file, "--profile", "Farm", "--profile", "Tippen") == 0
+    assert pressed(inputs.get_backend()) == {"a", "b"}
+
+
+def test_errors_exit_before_running(profile_file, tmp_path):
+    assert run(profile_file, "--profile", "Fehlt") == 2
+    assert run(profile_file, "--profile", "Kaputt") == 2
+    assert run(tmp_path / "nicht_da.json") == 1
+
+
+def test_main_run_needs_no_qt(profile_file):
+    # Einstieg über main.py: Qt wird erst nach dem "run"-Zweig importiert
+    main = Path(__file__).resolve().parent.parent / "main.py"
+    args = ["run", "--file", str(profile_file), "--backend", "recording", "--duration", "0.1"]
+    code = ("import runpy, sys; sys.modules['PyQt6'] = None; "
+            f"sys.argv = [{str(main)!r}] + {args!r}; runpy.run_path({str(main)!r}, run_name='__main__')")
+    proc = subprocess.run([sys.executable, "-c", code], cwd=main.parent, capture_output=True, text=True, timeout=30)
+    assert proc.returncode == 0, proc.stderr
+    assert "Tippen" in proc.stdout
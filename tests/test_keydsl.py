@@ -0,0 +1,78 @@
+import pytest
+
+from keydsl import (
+    check, compile_keys, key_names, DslError,
+    OP_TAP, OP_COMBO, OP_DOWN, OP_UP, OP_WAIT, OP_LOOP, OP_NEXT, OP_TYPE, TYPE_CHUNK,
+)
+
+
+def taps(text):
+    prog = compile_keys(text, lambda name: name)
+    code = prog.code
+    assert all(code[i] == OP_TAP for i in range(0, len(code), 2))
+    return [prog.consts[code[i + 1]] for i in range(0, len(code), 2)]
+
+
+# Alte Tasten-Felder (reine Komma-Listen) müssen gültig bleiben
+@pytest.mark.parametrize("text, keys", [
+    ("a,*,b", ["a", "*", "b"]),
+    ("+", ["+"]),
+    ("[", ["["]),
+    ("]", ["]"]),
+    ("(", ["("]),
+    (")", [")"]),
+    ("'", ["'"]),
+    ('"', ['"']),
+    ("a, + , b", ["a", "+", "b"]),
+    ("a,(,),b", ["a", "(", ")", "b"]),
+    ("a b", ["a b"]),
+    ("enter,h,a,l,l,o", ["enter", "h", "a", "l", "l", "o"]),
+    ("a,,b,", ["a", "b"]),
+    ("", []),
+])
+def test_legacy_lists_stay_valid(text, keys):
+    assert check(text) is None
+    assert taps(text) == keys
+
+
+def test_quoted_specials():
+    assert taps("'+',','") == ["+", ","]
+
+
+def test_program_ops():
+    prog = compile_keys("ctrl+c, hold(w, 5), wait(2), [x]*3, type(\"Hi\")", lambda name: name)
+    ops = prog.code[0::2]
+    assert ops == (OP_COMBO, OP_DOWN, OP_WAIT, OP_UP, OP_WAIT, OP_LOOP, OP_TAP, OP_NEXT, OP_TYPE)
+    assert prog.consts[prog.code[1]] == ("ctrl", "c")
+    assert prog.code[5] == 5_000_000
+
+
+def test_type_is_split_into_chunks():
+    text = "x" * (2 * TYPE_CHUNK + 5)
+    prog = compile_keys(f'type("{text}")', lambda name: name)
+    assert prog.code[0] == OP_TYPE
+    chunks, ns = prog.consts[prog.code[1]]
+    assert ns == 0 and [len(c) for c in chunks] == [TYPE_CHUNK, TYPE_CHUNK, 5]
+    # mit Abstand pro Zeichen: ein Zeichen pro Schritt
+    chunks, ns = compile_keys('type("abc", 20)', lambda name: name).consts[0]
+    assert chunks == ("a", "b", "c") and ns == 20_000_000
+
+
+@pytest.mark.parametrize("text, code, pos", [
+    ("[a,b", "expected", 4),
+    ("a*0", "count", 2),
+    ("wait(x)", "duration", 5),
+    ("hold(a)", "expected", 6),
+    ("a,[b", "expected", 4),
+    ('type("abc', "expected", 9),
+])
+def test_errors_report_position(text, code, pos):
+    err = check(text)
+    assert isinstance(err, DslError)
+    assert (err.code, err.pos) == (code, pos)
+    with pytest.raises(DslError):
+        compile_keys(text, lambda name: name)
+
+
+def test_key_names_ignore_text():
+    assert sorted(key_names('a, type("xyz"), hold(shift+b, 1)')) == ["a", "b", "shift"]
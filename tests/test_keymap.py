@@ -0,0 +1,35 @@
+from keymap import ALIASES, X_KEYSYMS, canonical_name, char_keysym
+from inputs import RecordingBackend
+
+
+def test_every_alias_points_to_a_keysym():
+    assert all(name in X_KEYSYMS for name in ALIASES.values())
+    # ein Alias darf keinen kanonischen Namen umbiegen
+    assert all(ALIASES[k] == k for k in set(ALIASES) & set(X_KEYSYMS))
+
+
+def test_aliases_and_spellings_resolve_to_one_name():
+    for text, name in [
+        ("Return", "enter"), (" PgUp ", "page_up"), ("del", "delete"), ("Strg", "ctrl"),
+        ("numpad5", "num_5"), ("KP_Add", "num_add"), ("volumeup", "media_volume_up"),
+        ("F24", "f24"), ("page_down", "page_down"),
+    ]:
+        assert canonical_name(text) == name, text
+
+
+def test_single_characters_and_unicode_codepoints():
+    assert canonical_name("Ä") == "ä"
+    assert canonical_name("u20ac") == "€"
+    assert canonical_name("u00e4") == "ä"
+    for bad in ("", "  ", "foo", "ud800", "u110000", "u20"):
+        assert canonical_name(bad) is None, bad
+    assert char_keysym("a") == 0x61
+    assert char_keysym("€") == 0x010020AC
+
+
+def test_recording_codes_are_stable_per_canonical_name():
+    backend = RecordingBackend(capacity=1)
+    assert backend.resolve_key("return") == backend.resolve_key("enter") < 0
+    assert backend.resolve_key("pgup") == backend.resolve_key("page_up") < 0
+    assert backend.resolve_key("a") == ord("a")
+    assert backend.resolve_key("nope") is None
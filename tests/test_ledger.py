@@ -0,0 +1,63 @@
+from inputs import InjectedLedger, CLICK_TOKEN, MOVE_TOKEN, button_token
+
+
+def ledger() -> InjectedLedger:
+    led = InjectedLedger()
+    led.watch({"a", CLICK_TOKEN})
+    return led
+
+
+def test_injected_click_is_consumed_at_its_position():
+    led = ledger()
+    led.note_click(lambda: (100, 200))
+    assert led.consume(CLICK_TOKEN, (101, 199))
+    assert not led.consume(CLICK_TOKEN, (100, 200))
+
+
+def test_real_click_elsewhere_keeps_injected_entry():
+    # Position erfassen, während der Runner klickt: der echte Klick gehört dem Benutzer
+    led = ledger()
+    led.note_click(lambda: (100, 200))
+    assert not led.consume(CLICK_TOKEN, (640, 480))
+    assert led.consume(CLICK_TOKEN, (100, 200))
+
+
+def test_click_without_position_matches_any():
+    led = ledger()
+
+    def broken():
+        raise OSError("kein Display")
+
+    led.note_click(broken)
+    assert led.consume(CLICK_TOKEN, (5, 5))
+
+
+def test_unwatched_click_is_not_noted():
+    led = InjectedLedger()
+    led.watch({"a"})
+    led.note_click(lambda: (1, 1))
+    assert not led.consume(CLICK_TOKEN, (1, 1))
+
+
+def test_keys_match_by_count():
+    led = ledger()
+    led.note("a")
+    led.note("a")
+    assert led.consume("a") and led.consume("a")
+    assert not led.consume("a")
+
+
+def test_recording_notes_every_key_button_and_move():
+    # Makro-Aufnahme: auch unbeobachtete Tasten, rechte Maustaste und Bewegungen zählen
+    led = ledger()
+    led.watch_all(True)
+    led.note("q")
+    led.note_click(lambda: (7, 8), "right")
+    led.note_move(30, 40)
+    assert led.consume("q")
+    assert led.consume(button_token("right"), (7, 8))
+    assert led.consume(MOVE_TOKEN, (30, 41))
+    led.watch_all(False)
+    led.note("q")
+    led.note_move(30, 40)
+    assert not led.consume("q") and not led.consume(MOVE_TOKEN, (30, 40))
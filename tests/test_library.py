@@ -0,0 +1,52 @@
+from library import ProfileLibrary, fuzzy_score
+
+
+def library() -> ProfileLibrary:
+    lib = ProfileLibrary()
+    lib.add("Farm Nacht", {"sets": [{"keys": "a, pgup"}]}, tags=["MMO"])
+    lib.add("Farm", {"sets": [{"keys": "f5"}]}, tags=["mmo", "afk"])
+    lib.add("Auto Farm", {"sets": [{"keys": "b"}]})
+    lib.add("Fischen", {"sets": [{"keys": "space"}]})
+    return lib
+
+
+def names(entries) -> list:
+    return [e.name for e in entries]
+
+
+def test_fuzzy_ranking_prefix_then_substring_then_subsequence():
+    assert fuzzy_score("farm", "farm") == 0
+    assert 0 < fuzzy_score("farm", "auto farm") < fuzzy_score("frm", "farm")
+    assert fuzzy_score("mraf", "farm") is None
+    assert names(library().search("farm")) == ["Farm Nacht", "Farm", "Auto Farm"]
+    assert names(library().search("fn")) == ["Farm Nacht", "Fischen"]     # kleinere Lücke zuerst
+
+
+def test_tag_and_key_terms_intersect():
+    lib = library()
+    assert names(lib.search("#mmo")) == ["Farm Nacht", "Farm"]
+    assert names(lib.search("#mmo #afk")) == ["Farm"]
+    assert names(lib.search("key:page_up")) == ["Farm Nacht"]
+    assert names(lib.search("key:pgup farm")) == ["Farm Nacht"]     # Alias wie im Set
+    assert lib.search("#mmo key:space") == []
+
+
+def test_update_and_remove_keep_index_in_sync():
+    lib = library()
+    farm = lib.by_name("Farm")
+    lib.update(farm.uid, name="Angeln", data={"sets": [{"keys": "space"}]}, tags=[])
+    assert names(lib.search("key:f5")) == []
+    assert names(lib.search("key:space")) == ["Angeln", "Fischen"]
+    assert lib.by_name("Farm") is None
+    lib.remove(lib.by_name("Fischen").uid)
+    assert names(lib.search("key:space")) == ["Angeln"]
+
+
+def test_unique_name_takes_smallest_free_number():
+    lib = ProfileLibrary()
+    assert lib.unique_name("Profil") == "Profil 1"
+    lib.add("Profil 1")
+    lib.add("Profil 3")
+    assert lib.unique_name("Profil") == "Profil 2"
+    lib.remove(lib.by_name("Profil 1").uid)
+    assert lib.unique_name("Profil") == "Profil 1"
@@ -0,0 +1,59 @@
+import time
+
+from engine import compile_set, Scheduler, ProfileRunner, MS_NS
+from inputs import RecordingBackend, EV_MOVE
+from macro import MacroTrack, MOVE, KEY_DOWN, _TIME_UNIT_NS
+
+
+def roundtrip(track: MacroTrack) -> MacroTrack:
+    return MacroTrack.from_bytes(track.to_bytes())
+
+
+def test_roundtrip_keeps_events():
+    track = MacroTrack()
+    track.append(0, MOVE, 10, 20)
+    track.append(1_500_000, KEY_DOWN, track.name_id("a"), 0)
+    back = roundtrip(track)
+    assert len(back) == 2
+    assert list(back.kind) == list(track.kind)
+    assert list(back.a) == list(track.a) and list(back.b) == list(track.b)
+    assert back.names == track.names
+
+
+def test_no_drift_over_long_macro():
+    # Abstände, die nicht auf die Zeiteinheit fallen: der Rundungsrest darf sich nicht aufsummieren
+    track = MacroTrack()
+    n = 100_000
+    for i in range(n):
+        track.append(i * 1_000_999 + 333, MOVE, i, 0)
+    back = roundtrip(track)
+    assert len(back) == n
+    assert max(abs(a - b) for a, b in zip(track.t_ns, back.t_ns)) < _TIME_UNIT_NS
+
+
+def test_seek_after_switch_to_set_without_macro():
+    # Makro-Set wechselt auf ein Set ohne Makro: seek() darf das alte Makro nicht wieder anwerfen
+    track = MacroTrack()
+    for i in range(5):
+        track.append(i * MS_NS, MOVE, i, 0)
+    macro_set = {"keys": "", "macro": track.to_text(), "macro_loop": False, "repeat_us": 1_000,
+                 "switch": {"enabled": True, "min": 0, "sec": 0, "target": 2}}
+    key_set = {"keys": "a", "inner_us": 1_000, "repeat_us": 100_000}
+    backend = RecordingBackend()
+    plans = (compile_set(macro_set, backend.resolve_key), compile_set(key_set, backend.resolve_key))
+    scheduler = Scheduler(name="test-seek")
+    runner = ProfileRunner(lambda: plans, scheduler, backend)
+
+    runner.start()
+    end = time.perf_counter() + 2.0
+    while runner.index != 1 and time.perf_counter() < end:
+        time.sleep(0.005)
+    assert runner.index == 1
+
+    runner.seek(0, 0)       # altes Set, nicht mehr aktiv
+    runner.seek(1, 0)       # aktives Set ohne Makro
+    time.sleep(0.05)
+    moves = sum(1 for _, kind, _, _ in backend.events() if kind == EV_MOVE)
+    assert moves == len(track)
+    assert runner.running
+    runner.stop()
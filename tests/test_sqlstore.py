@@ -0,0 +1,65 @@
+from sqlstore import SqliteStore, import_json, export_json
+
+
+def config() -> dict:
+    return {
+        "window_size": [800, 600],
+        "last_file_path": "/alt/profiles.json",
+        "profiles": [
+            {"name": "Farm", "tags": ["mmo"], "open": True,
+             "data": {"active_set": 1, "sets": [{"keys": "a"}, {"keys": "f5"}, {"keys": "b"}]}},
+            {"name": "Pause", "open": False, "data": {"sets": [{"keys": "space"}]}},
+        ],
+    }
+
+
+def test_json_roundtrip(tmp_path):
+    cfg = config()
+    import_json(cfg, tmp_path / "p.db").close()
+    store = SqliteStore(tmp_path / "p.db")
+    back = export_json(store)
+    store.close()
+    assert "last_file_path" not in back      # GUI soll nicht zurück in die JSON-Datei speichern
+    assert back["window_size"] == cfg["window_size"]
+    assert [p["name"] for p in back["profiles"]] == ["Farm", "Pause"]
+    assert back["profiles"][0]["tags"] == ["mmo"] and back["profiles"][1]["open"] is False
+    assert [p["data"] for p in back["profiles"]] == [p["data"] for p in cfg["profiles"]]
+
+
+def test_save_writes_only_changed_rows(tmp_path):
+    import_json(config(), tmp_path / "p.db").close()
+    store = SqliteStore(tmp_path / "p.db")
+    cfg = store.load_meta()
+    farm = cfg["profiles"][0]
+    farm["data"] = store.load_profile_data(farm["id"])
+
+    farm["data"]["sets"][1] = {"keys": "f6"}
+    before = store._conn.total_changes
+    assert store.save(cfg)
+    assert store._conn.total_changes - before == 2    # ein Set + Tasten-Index des Profils
+
+    before = store._conn.total_changes
+    assert not store.save(cfg)
+    assert store._conn.total_changes == before
+
+    store.close()
+
+
+def test_unloaded_profile_keeps_sets_and_removed_profile_is_deleted(tmp_path):
+    import_json(config(), tmp_path / "p.db").close()
+    store = SqliteStore(tmp_path / "p.db")
+    cfg = store.load_meta()
+    farm, pause = cfg["profiles"]
+    assert farm["data"] is None and farm["keys"] == ["a", "b", "f5"]
+
+    # nur umbenannt, Sets nie gelesen: Sets in der Datenbank bleiben stehen
+    farm["name"] = "Farm 2"
+    cfg["profiles"] = [farm]
+    assert store.save(cfg)
+    store.close()
+
+    store = SqliteStore(tmp_path / "p.db")
+    assert [p["name"] for p in store.load_meta()["profiles"]] == ["Farm 2"]
+    assert len(store.load_profile_data(farm["id"])["sets"]) == 3
+    assert store.load_profile_data(pause["id"]) == {"sets": []}     # Zeilen gelöscht
+    store.close()
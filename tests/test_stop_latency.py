@@ -0,0 +1,76 @@
+import time
+
+from engine import compile_set, Scheduler, ProfileRunner, US_MAX
+from inputs import RecordingBackend, EV_KEY, EV_KEY_DOWN, EV_KEY_UP
+
+# stop() darf nie auf ein langes Intervall warten
+STOP_BOUND_S = 0.05
+LONG_US = US_MAX   # 9 999 999 ms
+
+
+def start_runner(data: dict):
+    backend = RecordingBackend()
+    plan = compile_set(data, resolve=backend.resolve_key)
+    assert plan.error is None
+    scheduler = Scheduler(name="test-stop")
+    runner = ProfileRunner(lambda: (plan,), scheduler, backend)
+    runner.start()
+    return backend, scheduler, runner
+
+
+def wait_for(cond, timeout_s: float = 1.0):
+    end = time.monotonic() + timeout_s
+    while not cond():
+        assert time.monotonic() < end, "Ereignis kam nicht"
+        time.sleep(0.001)
+
+
+def stop_and_join(scheduler, runner) -> float:
+    t = time.perf_counter()
+    runner.stop()
+    th = scheduler._thread
+    if th is not None:
+        th.join(1.0)
+        assert not th.is_alive()
+    return time.perf_counter() - t
+
+
+def kinds(backend):
+    return [(kind, a) for _, kind, a, _ in backend.events()]
+
+
+def test_stop_during_long_interval():
+    data = {
+        "keys": "a", "inner_us": LONG_US, "repeat_us": LONG_US,
+        "click": {"enabled": True, "interval_enabled": True, "global_interval_us": LONG_US},
+    }
+    backend, scheduler, runner = start_runner(data)
+    wait_for(lambda: backend.count >= 1)
+    assert stop_and_join(scheduler, runner) < STOP_BOUND_S
+    assert not runner.running
+    assert scheduler.pending() == 0
+    assert (EV_KEY, backend.resolve_key("a")) in kinds(backend)
+
+
+def test_stop_releases_held_keys():
+    data = {"keys": "hold(shift+a, 3600000)", "inner_us": LONG_US, "repeat_us": LONG_US}
+    backend, scheduler, runner = start_runner(data)
+    shift, a = backend.resolve_key("shift"), backend.resolve_key("a")
+    wait_for(lambda: backend.count >= 2)
+    assert stop_and_join(scheduler, runner) < STOP_BOUND_S
+    events = kinds(backend)
+    assert events[:2] == [(EV_KEY_DOWN, shift), (EV_KEY_DOWN, a)]
+    assert sorted(events[2:]) == sorted([(EV_KEY_UP, shift), (EV_KEY_UP, a)])
+    assert runner._held == {}
+
+
+def test_repeated_stop_latency():
+    data = {"keys": "a", "inner_us": LONG_US, "repeat_us": LONG_US}
+    backend, scheduler, runner = start_runner(data)
+    worst = 0.0
+    for _ in range(20):
+        wait_for(lambda: runner.running)
+        worst = max(worst, stop_and_join(scheduler, runner))
+        runner.start()
+    stop_and_join(scheduler, runner)
+    assert worst < STOP_BOUND_S
@@ -0,0 +1,109 @@
+import json
+import os
+
+import pytest
+
+import storage
+from engine import compile_sets
+from storage import (
+    AutoSaver, atomic_write_bytes, dump_config, content_hash, load_config, cache_path, normalize_config,
+)
+
+
+def config(n: int) -> dict:
+    return {"profiles": [{"name": f"Profil {n}", "data": {"sets": [{"keys": "a"}]}}]}
+
+
+def test_failed_write_keeps_old_file(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    path.write_bytes(b"alt")
+
+    def broken(src, dst):
+        raise OSError("Platte voll")
+
+    monkeypatch.setattr(storage.os, "replace", broken)
+    with pytest.raises(OSError):
+        atomic_write_bytes(path, b"neu")
+    assert path.read_bytes() == b"alt"
+    assert os.listdir(tmp_path) == ["profiles.json"]    # keine Temp-Reste
+
+
+def test_autosaver_writes_only_newest_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    writes = []
+    real = storage.atomic_write_bytes
+    monkeypatch.setattr(storage, "atomic_write_bytes", lambda p, data: (writes.append(data), real(p, data)))
+
+    saver = AutoSaver()
+    # Lock halten: der Writer-Thread kommt erst nach allen Snapshots dran
+    with saver._cond:
+        for n in range(10):
+            saver.submit(path, config(n))
+    assert saver.flush(timeout=5.0)
+    assert writes == [dump_config(config(9))]
+    assert path.read_bytes() == dump_config(config(9))
+
+
+def test_autosaver_skips_unchanged_content(tmp_path):
+    path = tmp_path / "profiles.json"
+    data = dump_config(config(1))
+    path.write_bytes(data)
+    saver = AutoSaver()
+    saver.remember(path, content_hash(data))
+    assert not saver.write_now(path, config(1))    # Stand von der Platte
+    assert saver.write_now(path, config(2))
+    assert not saver.write_now(path, config(2))
+    assert path.read_bytes() == dump_config(config(2))
+
+
+def write_config(path, cfg: dict, mtime_ns: int):
+    path.write_bytes(dump_config(cfg))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_config_cache_follows_size_and_mtime(tmp_path):
+    path = tmp_path / "profiles.json"
+    write_config(path, config(1), 1_000_000_000)
+    cfg, digest = load_config(path)
+    assert cache_path(path).exists()
+    assert load_config(path) == (cfg, digest)
+
+    # gleiche Größe, neue mtime, anderer Inhalt: neu parsen
+    write_config(path, config(2), 2_000_000_000)
+    cfg, digest = load_config(path)
+    assert cfg["profiles"][0]["name"] == "Profil 2"
+    assert digest == content_hash(dump_config(config(2)))
+
+
+def test_touched_file_reuses_cache_by_hash(tmp_path, monkeypatch):
+    path = tmp_path / "profiles.json"
+    write_config(path, config(1), 1_000_000_000)
+    cfg, _ = load_config(path)
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+
+    def parse_again(cfg):
+        raise AssertionError("Inhalt unverändert, Cache hätte gereicht")
+
+    monkeypatch.setattr(storage, "normalize_config", parse_again)
+    assert load_config(path)[0] == cfg
+
+
+def test_broken_cache_is_ignored(tmp_path):
+    path = tmp_path / "profiles.json"
+    write_config(path, config(1), 1_000_000_000)
+    cache_path(path).write_bytes(b"kaputt")
+    cfg, _ = load_config(path)
+    assert cfg["profiles"][0]["name"] == "Profil 1"
+
+
+def test_unopened_tabs_save_their_data_unchanged():
+    # Platzhalter-Tabs schreiben die geladenen Daten zurück und kompilieren ohne Widgets
+    cfg = {"profiles": [{"name": "Alt", "data": {"sets": [
+        {"keys": "a, f5", "inner_ms": 30, "switch": {"enabled": True, "sec": 2}},
+        {"keys": "b", "click": {"enabled": True, "positions": [[10, 20]]}},
+    ]}}]}
+    loaded = normalize_config(cfg)
+    assert normalize_config(loaded) == loaded
+    assert dump_config(normalize_config(json.loads(dump_config(loaded)))) == dump_config(loaded)
+    plans = compile_sets(loaded["profiles"][0]["data"]["sets"], lambda name: name)
+    assert len(plans) == 2 and all(p.error is None for p in plans)
@@ -0,0 +1,127 @@
+import threading
+import time
+
+from engine import compile_set, DeadlineTimer, LatencyHistogram, Scheduler, ProfileRunner, sleep_until, MS_NS
+from inputs import RecordingBackend, EV_KEY
+
+# Toleranzen großzügig für ausgelastete CI-Rechner; Drift würde trotzdem auffallen
+TOLERANCE_NS = 2 * MS_NS
+QUANTILE = 0.9
+
+
+def grid_run(interval: int, n: int) -> bool:
+    timer = DeadlineTimer()
+    start = timer.next_ns
+    for k in range(1, n + 1):
+        deadline = timer.advance(interval)
+        # Arbeit + Sleep-Überschwinger verschieben das Raster nicht
+        sleep_until(deadline)
+        time.sleep(0.0005)
+        if timer.skipped:
+            return False   # Hänger des Rechners: Lauf nicht aussagekräftig
+        assert deadline == start + k * interval
+    return True
+
+
+def test_deadline_timer_stays_on_absolute_grid():
+    assert any(grid_run(5 * MS_NS, 40) for _ in range(3))
+
+
+def test_deadline_timer_skips_missed_slots_on_grid():
+    interval = 2 * MS_NS
+    timer = DeadlineTimer()
+    start = timer.next_ns
+    time.sleep(4.5 * interval / 1e9)   # Hänger über mehrere Slots
+    # Zeit vor advance(): eine Unterbrechung danach macht den Test nicht falsch
+    before = time.perf_counter_ns()
+    deadline = timer.advance(interval)
+    assert timer.skipped >= 3
+    assert (deadline - start) % interval == 0
+    assert deadline >= before - interval
+
+
+def run_keys(inner: int, repeat: int, duration_s: float):
+    backend = RecordingBackend()
+    plan = compile_set({"keys": "a,b", "inner_us": inner // 1000, "repeat_us": repeat // 1000},
+                       resolve=backend.resolve_key)
+    runner = ProfileRunner(lambda: (plan,), Scheduler(name="test-timing"), backend)
+    runner.start()
+    time.sleep(duration_s)
+    runner.stop()
+    return [t for t, kind, _, _ in backend.events() if kind == EV_KEY], runner.skipped
+
+
+def test_runner_events_follow_absolute_deadlines():
+    # 2 Tasten, 2 ms Abstand, 6 ms Pause -> 10 ms pro Durchlauf
+    inner, repeat, keys = 2 * MS_NS, 6 * MS_NS, 2
+    # ein Hänger des Rechners richtet das Raster neu aus (skipped > 0): dann neu
+    # messen; kurze Läufe, damit auch auf ausgelasteten Maschinen einer sauber bleibt
+    for _ in range(8):
+        stamps, skipped = run_keys(inner, repeat, 0.45)
+        if not skipped:
+            break
+    assert skipped == 0
+
+    cycle = keys * inner + repeat
+    cycles = len(stamps) // keys
+    assert cycles >= 40
+    t0 = stamps[0]
+    errors = []
+    for j, t in enumerate(stamps[:cycles * keys]):
+        c, i = divmod(j, keys)
+        errors.append(t - (t0 + c * cycle + i * inner))
+
+    # jedes Event nahe seiner absoluten Deadline …
+    late = sorted(abs(e) for e in errors)
+    assert late[int(QUANTILE * (len(late) - 1))] < TOLERANCE_NS
+    # … und keine Drift: die letzten Durchläufe liegen so genau wie die ersten
+    tail = sorted(errors[-10:])
+    assert abs(tail[len(tail) // 2]) < TOLERANCE_NS
+
+
+def test_slow_flush_does_not_block_posting():
+    # Backend-flush (X11-Round-Trip) läuft ohne Scheduler-Lock: post/call_at kehren sofort zurück
+    scheduler = Scheduler(name="test-flush")
+    flushing = threading.Event()
+
+    def slow_flush():
+        flushing.set()
+        time.sleep(0.2)
+
+    scheduler.add_flusher(slow_flush)
+    scheduler.call_at(time.perf_counter_ns(), None, lambda deadline: None)
+    assert flushing.wait(1.0)
+    t = time.perf_counter()
+    scheduler.post(time.perf_counter_ns(), lambda: None)
+    scheduler.call_at(time.perf_counter_ns() + MS_NS, None, lambda deadline: None)
+    assert time.perf_counter() - t < 0.05
+
+
+def test_type_text_arrives_complete_and_in_order():
+    text = "".join(chr(ord("a") + i % 26) for i in range(300))
+    backend = RecordingBackend()
+    plan = compile_set({"keys": f'type("{text}")', "repeat_us": 10_000_000}, resolve=backend.resolve_key)
+    runner = ProfileRunner(lambda: (plan,), Scheduler(name="test-type"), backend)
+    runner.start()
+    end = time.perf_counter() + 2.0
+    while backend.count < len(text) and time.perf_counter() < end:
+        time.sleep(0.005)
+    runner.stop()
+    typed = "".join(chr(a) for _, kind, a, _ in backend.events() if kind == EV_KEY)
+    assert typed == text
+
+
+def test_histogram_percentiles_within_bucket_resolution():
+    hist = LatencyHistogram()
+    assert hist.percentile(0.99) == 0
+    for us in range(1, 10_001):
+        hist.record(us * 1000)
+    for q in (0.5, 0.9, 0.99):
+        assert abs(hist.percentile(q) - q * 10_000) <= 0.07 * q * 10_000
+    assert hist.percentile(1.0) <= hist.max_us == 10_000
+
+    small = LatencyHistogram()
+    for us in (0, 3, 3, 7):
+        small.record(us * 1000)
+    small.record(-5000)      # zu früh zählt wie pünktlich
+    assert [small.percentile(q) for q in (0.2, 0.6, 1.0)] == [0, 3, 7]